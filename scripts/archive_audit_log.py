@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Audit Log Archival Utility
+
+This script applies the audit log retention policy. Monthly audit_log
+partitions older than the retention window are detached, exported to gzipped
+CSV files and then dropped. It also creates the partitions for the coming
+months, so running it from cron once a day keeps audit_log maintained.
+
+Detached partitions are only dropped after their export has been written and
+its row count checked; a partition left detached by an interrupted run is
+picked up again by the next one.
+
+Usage:
+    python3 scripts/archive_audit_log.py --keep-months 12 --output-dir /var/backups/medisys/audit
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import sys
+from datetime import date
+
+import psycopg2
+from psycopg2 import sql
+
+
+def cutoff_date(keep_months, today=None):
+    """First day of the oldest month that is kept."""
+    today = today or date.today()
+    month_index = today.year * 12 + (today.month - 1) - keep_months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def detached_partitions(cursor):
+    """Monthly audit tables that are no longer attached to audit_log."""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_class c
+        WHERE c.relkind = 'r'
+          AND c.relname ~ '^audit_log_p[0-9]{4}_[0-9]{2}$'
+          AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+        ORDER BY c.relname
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def export_partition(cursor, table_name, output_dir):
+    """Write a detached partition to <output_dir>/<table_name>.csv.gz and return its row count."""
+    path = os.path.join(output_dir, f"{table_name}.csv.gz")
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as output:
+        cursor.copy_expert(
+            sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER)").format(sql.Identifier(table_name)),
+            output)
+    cursor.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(sql.Identifier(table_name)))
+    expected = cursor.fetchone()[0]
+    with gzip.open(path + ".tmp", "rt", encoding="utf-8") as exported:
+        # The header line is not a row; CSV fields may contain newlines, so count records with the csv module
+        exported_rows = sum(1 for _ in csv.reader(exported)) - 1
+    if exported_rows != expected:
+        raise RuntimeError(f"{table_name}: exported {exported_rows} rows, expected {expected}")
+    os.replace(path + ".tmp", path)
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detach, export and drop old audit_log partitions")
+    parser.add_argument("--keep-months", type=int, default=12, help="Months of audit history kept online")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Future monthly partitions to create")
+    parser.add_argument("--output-dir", default="audit_archive", help="Directory for the exported partitions")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be archived")
+    args = parser.parse_args()
+
+    cutoff = cutoff_date(args.keep_months)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    try:
+        conn = psycopg2.connect(
+            dbname=os.environ.get("DB_NAME", "medisys"),
+            user=os.environ.get("DB_USER", "postgres"),
+            password=os.environ.get("DB_PASS", "secret"),
+            host=os.environ.get("DB_HOST", "localhost")
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT audit_log_ensure_partitions(%s)", (args.months_ahead,))
+
+        if args.dry_run:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = 'audit_log'::regclass
+                      AND c.relname ~ '^audit_log_p[0-9]{4}_[0-9]{2}$'
+                      AND (to_date(substr(c.relname, 12), 'YYYY_MM') + INTERVAL '1 month')::DATE <= %s
+                    ORDER BY c.relname
+                """, (cutoff,))
+                names = [row[0] for row in cursor.fetchall()] + detached_partitions(cursor)
+            print(f"Would archive partitions before {cutoff}: {', '.join(names) or 'none'}")
+            return 0
+
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT audit_log_detach_before(%s)", (cutoff,))
+                for (table_name,) in cursor.fetchall():
+                    print(f"Detached {table_name}")
+
+        with conn.cursor() as cursor:
+            tables = detached_partitions(cursor)
+        for table_name in tables:
+            with conn:
+                with conn.cursor() as cursor:
+                    rows = export_partition(cursor, table_name, args.output_dir)
+                    cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(table_name)))
+            print(f"Archived {table_name}: {rows} rows")
+        if not tables:
+            print(f"No audit partitions older than {cutoff}")
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,40 +4,256 @@
  * This file implements the Python bindings for the MediSys C++ backend using pybind11.
  * It exposes core functionality like database management, authentication, and patient
  * services to the Python frontend, allowing seamless integration between components.
+ * Every call that waits on PostgreSQL releases the GIL so the Qt event loop and
+ * other Python threads keep running while the backend is busy.
  *
  * Author: Mazharuddin Mohammed
  */
 
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
+#include "../core/database/audit_writer.h"
 #include "../core/database/db_manager.h"
+#include "../core/services/audit_service.h"
 #include "../core/services/auth_service.h"
+#include "../core/services/billing_service.h"
 #include "../core/services/patient_service.h"
 #include "../core/models/patient.h"
 
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <ctime>
+#include <iomanip>
+#include <optional>
+#include <sstream>
+
 namespace py = pybind11;
 
+namespace {
+
+// Read an optional text field from a dict-like row; None and NaN (empty pandas cells) become ""
+std::string rowText(const py::handle& row, const char* key) {
+    if (!py::bool_(row.attr("__contains__")(key))) {
+        return "";
+    }
+    py::object value = row[key];
+    if (value.is_none()) {
+        return "";
+    }
+    if (py::isinstance<py::float_>(value) && std::isnan(value.cast<double>())) {
+        return "";
+    }
+    return py::str(value);
+}
+
+// Accepts a UNIX timestamp or anything whose str() starts with YYYY-MM-DD (str, date, Timestamp)
+std::time_t rowDate(const py::handle& row, const char* key) {
+    py::object value = row[key];
+    if (py::isinstance<py::int_>(value)) {
+        return value.cast<std::time_t>();
+    }
+    if (py::isinstance<py::float_>(value)) {
+        double timestamp = value.cast<double>();
+        if (std::isnan(timestamp)) {
+            throw std::invalid_argument("Missing date of birth");
+        }
+        return static_cast<std::time_t>(timestamp);
+    }
+    std::string date_str = py::str(value);
+    std::tm tm = {};
+    std::stringstream ss(date_str.substr(0, 10));
+    ss >> std::get_time(&tm, "%Y-%m-%d");
+    if (ss.fail()) {
+        throw std::invalid_argument("Invalid date of birth: " + date_str);
+    }
+    tm.tm_isdst = -1;
+    return std::mktime(&tm);
+}
+
+Patient patientFromRow(const py::handle& row) {
+    if (py::isinstance<Patient>(row)) {
+        return row.cast<Patient>();
+    }
+    Patient patient{};
+    patient.id = 0;
+    patient.first_name = rowText(row, "first_name");
+    patient.last_name = rowText(row, "last_name");
+    patient.dob = rowDate(row, "dob");
+    patient.gender = rowText(row, "gender");
+    patient.address = rowText(row, "address");
+    patient.mobile = rowText(row, "mobile");
+    patient.email = rowText(row, "email");
+    patient.emergency_contact_name = rowText(row, "emergency_contact_name");
+    patient.emergency_contact_mobile = rowText(row, "emergency_contact_mobile");
+    return patient;
+}
+
+// Hands a buffer to NumPy without copying it; the array keeps the vector alive
+template <typename T>
+py::array bufferArray(std::vector<T>&& values, const char* dtype) {
+    auto* owner = new std::vector<T>(std::move(values));
+    py::capsule base(owner, [](void* owned) { delete static_cast<std::vector<T>*>(owned); });
+    return py::array(py::dtype(dtype), {owner->size()}, {sizeof(T)}, owner->data(), base);
+}
+
+// Column name -> array; text columns are (int32 codes, list of distinct values)
+py::dict columnarToPython(ColumnarResult&& result) {
+    py::dict columns;
+    for (auto& column : result.columns) {
+        py::str name(column.name);
+        switch (column.type) {
+        case ColumnType::Int64:
+            columns[name] = bufferArray(std::move(column.ints), "int64");
+            break;
+        case ColumnType::Float64:
+            columns[name] = bufferArray(std::move(column.floats), "float64");
+            break;
+        case ColumnType::Bool:
+            columns[name] = bufferArray(std::move(column.bools), "bool");
+            break;
+        case ColumnType::Date:
+            columns[name] = bufferArray(std::move(column.ints), "datetime64[s]");
+            break;
+        case ColumnType::Timestamp:
+            columns[name] = bufferArray(std::move(column.ints), "datetime64[us]");
+            break;
+        case ColumnType::Text:
+            columns[name] = py::make_tuple(bufferArray(std::move(column.codes), "int32"),
+                                           py::cast(column.dictionary));
+            break;
+        }
+    }
+    return columns;
+}
+
+} // namespace
+
 PYBIND11_MODULE(medisys_bindings, m) {
     py::class_<DBManager, std::shared_ptr<DBManager>>(m, "DBManager")
-        .def(py::init<const std::string&>())
-        .def("initialize_schema", &DBManager::initializeSchema)
-        .def("set_audit_context", &DBManager::setAuditContext, py::arg("user_id"), py::arg("ip_address"), py::arg("session_id"))
+        .def(py::init([](const std::string& conn_str, std::size_t min_pool_size,
+                         std::size_t max_pool_size, int checkout_timeout_ms) {
+                 PoolOptions options;
+                 options.min_size = min_pool_size;
+                 options.max_size = max_pool_size;
+                 options.checkout_timeout = std::chrono::milliseconds(checkout_timeout_ms);
+                 py::gil_scoped_release release;
+                 return std::make_shared<DBManager>(conn_str, options);
+             }),
+             py::arg("conn_str"), py::arg("min_pool_size") = 1, py::arg("max_pool_size") = 8,
+             py::arg("checkout_timeout_ms") = 5000)
+        .def("initialize_schema", &DBManager::initializeSchema, py::call_guard<py::gil_scoped_release>())
+        .def("set_audit_context",
+             py::overload_cast<int, const std::string&, const std::string&>(&DBManager::setAuditContext),
+             py::arg("user_id"), py::arg("ip_address"), py::arg("session_id"),
+             py::call_guard<py::gil_scoped_release>())
         .def("get_connection", [](DBManager& self) -> pqxx::connection& { return self.getConnection(); },
-             py::return_value_policy::reference);
+             py::return_value_policy::reference)
+        .def("query_columns", [](DBManager& self, const std::string& query, const py::iterable& params) {
+            std::vector<std::optional<std::string>> values;
+            for (const auto& param : params) {
+                if (param.is_none()) {
+                    values.emplace_back();
+                } else if (py::isinstance<py::bool_>(param)) {
+                    values.emplace_back(param.cast<bool>() ? "true" : "false");
+                } else {
+                    // Dates, Timestamps and numbers print in a form PostgreSQL parses
+                    values.emplace_back(py::str(param).cast<std::string>());
+                }
+            }
+            ColumnarResult result;
+            {
+                py::gil_scoped_release release;
+                result = self.queryColumns(query, values);
+            }
+            return columnarToPython(std::move(result));
+        }, py::arg("query"), py::arg("params") = py::tuple())
+        .def("pool_stats", [](DBManager& self) {
+            PoolStats stats = self.poolStats();
+            py::dict result;
+            result["size"] = stats.size;
+            result["idle"] = stats.idle;
+            result["in_use"] = stats.in_use;
+            result["min_size"] = stats.min_size;
+            result["max_size"] = stats.max_size;
+            result["waits"] = stats.waits;
+            result["timeouts"] = stats.timeouts;
+            result["replaced"] = stats.replaced;
+            return result;
+        });
+
+    py::class_<AuditWriter, std::shared_ptr<AuditWriter>>(m, "AuditWriter")
+        .def(py::init([](std::shared_ptr<DBManager> db, std::size_t batch_size, int flush_interval_ms,
+                         std::size_t max_queue) {
+                 AuditWriterOptions options;
+                 options.batch_size = batch_size;
+                 options.flush_interval = std::chrono::milliseconds(flush_interval_ms);
+                 options.max_queue = max_queue;
+                 py::gil_scoped_release release;
+                 return std::make_shared<AuditWriter>(db, options);
+             }),
+             py::arg("db"), py::arg("batch_size") = 500, py::arg("flush_interval_ms") = 1000,
+             py::arg("max_queue") = 100000)
+        .def("log", [](AuditWriter& self, std::optional<int> user_id, const std::string& action,
+                       const std::string& entity_type, int entity_id, const py::object& details,
+                       const std::string& ip_address, const std::string& session_id) {
+            AuditEvent event;
+            event.user_id = user_id;
+            event.action = action;
+            event.entity_type = entity_type;
+            event.entity_id = entity_id;
+            if (details.is_none()) {
+                event.details = "{}";
+            } else if (py::isinstance<py::str>(details)) {
+                event.details = details.cast<std::string>();
+            } else {
+                // Dates and other non-JSON values in the details are written as strings
+                event.details = py::module_::import("json").attr("dumps")(
+                    details, py::arg("default") = py::module_::import("builtins").attr("str")).cast<std::string>();
+            }
+            event.ip_address = ip_address;
+            event.session_id = session_id;
+            py::gil_scoped_release release;
+            self.log(std::move(event));
+        }, py::arg("user_id"), py::arg("action"), py::arg("entity_type"), py::arg("entity_id") = 0,
+           py::arg("details") = py::none(), py::arg("ip_address") = "unknown", py::arg("session_id") = "unknown")
+        .def("flush", &AuditWriter::flush, py::call_guard<py::gil_scoped_release>())
+        .def("close", &AuditWriter::close, py::call_guard<py::gil_scoped_release>())
+        .def("stats", [](AuditWriter& self) {
+            AuditWriterStats stats = self.stats();
+            py::dict result;
+            result["queued"] = stats.queued;
+            result["written"] = stats.written;
+            result["batches"] = stats.batches;
+            result["failures"] = stats.failures;
+            result["rejected"] = stats.rejected;
+            return result;
+        })
+        .def("__enter__", [](AuditWriter& self) -> AuditWriter& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__exit__", [](AuditWriter& self, const py::args&) {
+            py::gil_scoped_release release;
+            self.close();
+        });
 
     py::class_<AuthService, std::shared_ptr<AuthService>>(m, "AuthService")
-        .def(py::init<std::shared_ptr<DBManager>>())
+        .def(py::init<std::shared_ptr<DBManager>, std::shared_ptr<AuditWriter>>(),
+             py::arg("db"), py::arg("audit_writer") = py::none(),
+             py::call_guard<py::gil_scoped_release>())
         .def("authenticate", [](AuthService& self, const std::string& username, const std::string& password) {
             if (username.empty() || password.empty()) {
                 throw py::value_error("Username and password cannot be empty");
             }
             try {
+                py::gil_scoped_release release;
                 return self.authenticate(username, password);
             } catch (const std::exception& e) {
                 throw py::value_error(std::string("Authentication failed: ") + e.what());
                 return -1; // This line will never be reached
             }
-        });
+        })
+        .def("invalidate_system_user_cache", &AuthService::invalidateSystemUserCache);
 
     py::class_<Patient>(m, "Patient")
         .def(py::init<>())
@@ -52,10 +268,220 @@ PYBIND11_MODULE(medisys_bindings, m) {
         .def_readwrite("emergency_contact_name", &Patient::emergency_contact_name)
         .def_readwrite("emergency_contact_mobile", &Patient::emergency_contact_mobile);
 
+    py::class_<PatientImportError>(m, "PatientImportError")
+        .def_readonly("index", &PatientImportError::index)
+        .def_readonly("message", &PatientImportError::message)
+        .def("__repr__", [](const PatientImportError& self) {
+            return "<PatientImportError index=" + std::to_string(self.index) + " message='" + self.message + "'>";
+        });
+
+    py::class_<PatientImportResult>(m, "PatientImportResult")
+        .def_readonly("inserted", &PatientImportResult::inserted)
+        .def_readonly("errors", &PatientImportResult::errors)
+        .def("__repr__", [](const PatientImportResult& self) {
+            return "<PatientImportResult inserted=" + std::to_string(self.inserted) +
+                   " errors=" + std::to_string(self.errors.size()) + ">";
+        });
+
+    py::class_<PatientBatch>(m, "PatientBatch")
+        .def_readonly("patients", &PatientBatch::patients)
+        .def_readonly("missing_ids", &PatientBatch::missing_ids);
+
+    py::class_<PatientCursor>(m, "PatientCursor")
+        .def("__iter__", [](PatientCursor& self) -> PatientCursor& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__next__", [](PatientCursor& self) {
+            std::vector<Patient> batch;
+            {
+                py::gil_scoped_release release;
+                batch = self.next();
+            }
+            if (batch.empty()) {
+                throw py::stop_iteration();
+            }
+            return batch;
+        })
+        .def("__enter__", [](PatientCursor& self) -> PatientCursor& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__exit__", [](PatientCursor& self, const py::args&) {
+            py::gil_scoped_release release;
+            self.close();
+        })
+        .def("close", &PatientCursor::close, py::call_guard<py::gil_scoped_release>());
+
     py::class_<PatientService, std::shared_ptr<PatientService>>(m, "PatientService")
-        .def(py::init<std::shared_ptr<DBManager>>())
+        .def(py::init<std::shared_ptr<DBManager>>(), py::call_guard<py::gil_scoped_release>())
         .def("create_patient", &PatientService::createPatient,
-             py::arg("patient"), py::arg("user_id"), py::arg("ip"), py::arg("session"))
+             py::arg("patient"), py::arg("user_id"), py::arg("ip"), py::arg("session"),
+             py::call_guard<py::gil_scoped_release>())
+        .def("create_patients_bulk", [](PatientService& self, py::object rows, int user_id,
+                                         const std::string& ip, const std::string& session,
+                                         std::size_t batch_size) {
+            // A DataFrame iterates over its column names, so walk its records instead
+            if (py::hasattr(rows, "to_dict") && py::hasattr(rows, "columns")) {
+                rows = rows.attr("to_dict")("records");
+            }
+
+            std::vector<Patient> patients;
+            std::vector<std::size_t> source_index;
+            std::vector<PatientImportError> conversion_errors;
+            std::size_t index = 0;
+            for (py::handle row : rows) {
+                try {
+                    patients.push_back(patientFromRow(row));
+                    source_index.push_back(index);
+                } catch (const py::error_already_set& e) {
+                    conversion_errors.push_back({index, e.what()});
+                } catch (const std::exception& e) {
+                    conversion_errors.push_back({index, e.what()});
+                }
+                ++index;
+            }
+
+            PatientImportResult result;
+            {
+                py::gil_scoped_release release;
+                result = self.createPatientsBulk(patients, user_id, ip, session, batch_size);
+            }
+            for (auto& error : result.errors) {
+                error.index = source_index[error.index];
+            }
+            result.errors.insert(result.errors.end(), conversion_errors.begin(), conversion_errors.end());
+            std::sort(result.errors.begin(), result.errors.end(),
+                      [](const PatientImportError& a, const PatientImportError& b) { return a.index < b.index; });
+            return result;
+        }, py::arg("rows"), py::arg("user_id"), py::arg("ip"), py::arg("session"), py::arg("batch_size") = 10000)
         .def("get_patient", &PatientService::getPatient,
-             py::arg("patient_id"), py::arg("user_id"), py::arg("ip"), py::arg("session"));
+             py::arg("patient_id"), py::arg("user_id"), py::arg("ip"), py::arg("session"),
+             py::call_guard<py::gil_scoped_release>())
+        .def("get_patients", &PatientService::getPatients,
+             py::arg("patient_ids"), py::arg("user_id"), py::arg("ip"), py::arg("session"),
+             py::call_guard<py::gil_scoped_release>())
+        .def("list_patients", &PatientService::listPatients,
+             py::arg("after_id") = 0, py::arg("limit") = 100, py::arg("sort") = "id", py::arg("user_id") = 0,
+             py::arg("ip") = "unknown", py::arg("session") = "unknown",
+             py::call_guard<py::gil_scoped_release>())
+        .def("search", &PatientService::search,
+             py::arg("query"), py::arg("limit") = 50, py::arg("user_id") = 0,
+             py::arg("ip") = "unknown", py::arg("session") = "unknown",
+             py::call_guard<py::gil_scoped_release>())
+        .def("iter_patients", &PatientService::iterPatients,
+             py::arg("name_filter") = "", py::arg("batch_size") = 1000, py::arg("user_id") = 0,
+             py::arg("ip") = "unknown", py::arg("session") = "unknown",
+             py::call_guard<py::gil_scoped_release>());
+
+    py::class_<AuditEntry>(m, "AuditEntry")
+        .def_readonly("username", &AuditEntry::username)
+        .def_readonly("action", &AuditEntry::action)
+        .def_readonly("entity_type", &AuditEntry::entity_type)
+        .def_readonly("entity_id", &AuditEntry::entity_id)
+        .def_readonly("details", &AuditEntry::details)
+        .def_readonly("ip_address", &AuditEntry::ip_address)
+        .def_readonly("session_id", &AuditEntry::session_id)
+        .def_readonly("created_at", &AuditEntry::created_at);
+
+    py::class_<AuditCursor>(m, "AuditCursor")
+        .def("__iter__", [](AuditCursor& self) -> AuditCursor& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__next__", [](AuditCursor& self) {
+            std::vector<AuditEntry> batch;
+            {
+                py::gil_scoped_release release;
+                batch = self.next();
+            }
+            if (batch.empty()) {
+                throw py::stop_iteration();
+            }
+            return batch;
+        })
+        .def("__enter__", [](AuditCursor& self) -> AuditCursor& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__exit__", [](AuditCursor& self, const py::args&) {
+            py::gil_scoped_release release;
+            self.close();
+        })
+        .def("close", &AuditCursor::close, py::call_guard<py::gil_scoped_release>());
+
+    py::class_<AuditService, std::shared_ptr<AuditService>>(m, "AuditService")
+        .def(py::init<std::shared_ptr<DBManager>>())
+        .def("iter_audit_log", [](AuditService& self, const std::string& start_date, const std::string& end_date,
+                                  std::optional<int> user_id, std::optional<std::string> entity_type,
+                                  std::size_t batch_size, int admin_user_id, const std::string& ip_address,
+                                  const std::string& session_id) {
+            AuditLogFilter filter;
+            filter.start_date = start_date;
+            filter.end_date = end_date;
+            filter.user_id = user_id.value_or(0);
+            filter.entity_type = entity_type.value_or("");
+            py::gil_scoped_release release;
+            return self.iterAuditLog(filter, batch_size, admin_user_id, ip_address, session_id);
+        }, py::arg("start_date"), py::arg("end_date"), py::arg("user_id") = py::none(),
+           py::arg("entity_type") = py::none(), py::arg("batch_size") = 5000, py::arg("admin_user_id") = 0,
+           py::arg("ip_address") = "unknown", py::arg("session_id") = "unknown")
+        .def("count_audit_log", [](AuditService& self, const std::string& start_date, const std::string& end_date,
+                                   std::optional<int> user_id, std::optional<std::string> entity_type,
+                                   int admin_user_id, const std::string& ip_address, const std::string& session_id) {
+            AuditLogFilter filter;
+            filter.start_date = start_date;
+            filter.end_date = end_date;
+            filter.user_id = user_id.value_or(0);
+            filter.entity_type = entity_type.value_or("");
+            py::gil_scoped_release release;
+            return self.countAuditLog(filter, admin_user_id, ip_address, session_id);
+        }, py::arg("start_date"), py::arg("end_date"), py::arg("user_id") = py::none(),
+           py::arg("entity_type") = py::none(), py::arg("admin_user_id") = 0,
+           py::arg("ip_address") = "unknown", py::arg("session_id") = "unknown");
+
+    py::class_<BillableTransaction>(m, "BillableTransaction")
+        .def_readonly("transaction_id", &BillableTransaction::transaction_id)
+        .def_readonly("patient_id", &BillableTransaction::patient_id)
+        .def_readonly("patient_name", &BillableTransaction::patient_name)
+        .def_readonly("amount", &BillableTransaction::amount)
+        .def_readonly("description", &BillableTransaction::description)
+        .def_readonly("payment_method", &BillableTransaction::payment_method)
+        .def_readonly("created_at", &BillableTransaction::created_at);
+
+    py::class_<BillingCursor>(m, "BillingCursor")
+        .def("__iter__", [](BillingCursor& self) -> BillingCursor& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__next__", [](BillingCursor& self) {
+            std::vector<BillableTransaction> batch;
+            {
+                py::gil_scoped_release release;
+                batch = self.next();
+            }
+            if (batch.empty()) {
+                throw py::stop_iteration();
+            }
+            return batch;
+        })
+        .def("__enter__", [](BillingCursor& self) -> BillingCursor& { return self; },
+             py::return_value_policy::reference_internal)
+        .def("__exit__", [](BillingCursor& self, const py::args&) {
+            py::gil_scoped_release release;
+            self.close();
+        })
+        .def("close", &BillingCursor::close, py::call_guard<py::gil_scoped_release>());
+
+    py::class_<BillingService, std::shared_ptr<BillingService>>(m, "BillingService")
+        .def(py::init<std::shared_ptr<DBManager>>())
+        .def("iter_unbilled", [](BillingService& self, const std::string& start_date, const std::string& end_date,
+                                 std::size_t batch_size, int user_id, const std::string& ip_address,
+                                 const std::string& session_id) {
+            BillingPeriod period{start_date, end_date};
+            py::gil_scoped_release release;
+            return self.iterUnbilled(period, batch_size, user_id, ip_address, session_id);
+        }, py::arg("start_date"), py::arg("end_date"), py::arg("batch_size") = 5000, py::arg("user_id") = 0,
+           py::arg("ip_address") = "unknown", py::arg("session_id") = "unknown")
+        .def("count_unbilled", [](BillingService& self, const std::string& start_date, const std::string& end_date,
+                                  int user_id, const std::string& ip_address, const std::string& session_id) {
+            BillingPeriod period{start_date, end_date};
+            py::gil_scoped_release release;
+            return self.countUnbilled(period, user_id, ip_address, session_id);
+        }, py::arg("start_date"), py::arg("end_date"), py::arg("user_id") = 0,
+           py::arg("ip_address") = "unknown", py::arg("session_id") = "unknown")
+        .def("mark_invoiced", &BillingService::markInvoiced,
+             py::arg("transaction_ids"), py::arg("billing_run"), py::arg("user_id") = 0,
+             py::arg("ip_address") = "unknown", py::arg("session_id") = "unknown",
+             py::call_guard<py::gil_scoped_release>());
 }
\ No newline at end of file
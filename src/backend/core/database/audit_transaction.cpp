@@ -0,0 +1,20 @@
+/**
+ * MediSys Hospital Management System - Scoped Audit Transaction Implementation
+ *
+ * This file implements the ScopedAuditTransaction class. The audit context is
+ * applied through the set_local_audit_context prepared statement registered
+ * by DBManager, so it costs one statement inside the transaction rather than
+ * a separate transaction and commit.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "audit_transaction.h"
+
+ScopedAuditTransaction::ScopedAuditTransaction(pqxx::connection& conn, int user_id,
+                                               const std::string& ip_address, const std::string& session_id)
+    : txn(conn) {
+    // No acting user is recorded as NULL; audit_log.user_id references users(id), so 0 would be rejected
+    txn.exec_prepared("set_local_audit_context", user_id > 0 ? std::to_string(user_id) : std::string(),
+                      ip_address, session_id);
+}
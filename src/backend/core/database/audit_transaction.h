@@ -0,0 +1,29 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Scoped Audit Transaction Header
+ *
+ * This file defines the ScopedAuditTransaction class, a pqxx::work that sets
+ * the medisys.* audit settings with set_config(..., true) as its first
+ * statement. The settings are local to the transaction, so the audit context
+ * travels with the business transaction instead of needing one of its own.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <string>
+#include <pqxx/pqxx>
+
+class ScopedAuditTransaction {
+public:
+    // user_id 0 means no acting user; audit rows written in the transaction get a NULL user_id
+    ScopedAuditTransaction(pqxx::connection& conn, int user_id,
+                           const std::string& ip_address, const std::string& session_id);
+
+    pqxx::work& work() { return txn; }
+    pqxx::work* operator->() { return &txn; }
+    void commit() { txn.commit(); }
+
+private:
+    pqxx::work txn;
+};
@@ -0,0 +1,201 @@
+/**
+ * MediSys Hospital Management System - Audit Writer Implementation
+ *
+ * This file implements the AuditWriter class. Each batch is copied into
+ * audit_log with COPY on a pooled connection in its own transaction. A batch
+ * that fails is retried after the flush interval; if the database rejects the
+ * data itself, the events are written one by one so a single bad event cannot
+ * hold back the rest.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "audit_writer.h"
+#include <algorithm>
+#include <cstdio>
+#include <ctime>
+#include <iostream>
+#include <stdexcept>
+#include <utility>
+
+namespace {
+
+// Format a timestamp the way PostgreSQL prints TIMESTAMP values, in local time
+std::string formatTimestamp(std::chrono::system_clock::time_point time) {
+    std::time_t seconds = std::chrono::system_clock::to_time_t(time);
+    auto micros = std::chrono::duration_cast<std::chrono::microseconds>(
+        time.time_since_epoch()).count() % 1000000;
+    std::tm tm_buf = {};
+    localtime_r(&seconds, &tm_buf);
+    char buffer[32];
+    std::size_t length = std::strftime(buffer, sizeof(buffer), "%Y-%m-%d %H:%M:%S", &tm_buf);
+    std::snprintf(buffer + length, sizeof(buffer) - length, ".%06lld", static_cast<long long>(micros));
+    return std::string(buffer);
+}
+
+} // namespace
+
+AuditWriter::AuditWriter(std::shared_ptr<DBManager> db, const AuditWriterOptions& options)
+    : db_manager(db), options(options) {
+    if (options.batch_size == 0 || options.max_queue < options.batch_size) {
+        throw std::invalid_argument("Invalid audit writer batch or queue size");
+    }
+    worker = std::thread(&AuditWriter::run, this);
+}
+
+AuditWriter::~AuditWriter() {
+    close();
+}
+
+void AuditWriter::log(AuditEvent event) {
+    std::unique_lock<std::mutex> lock(mutex);
+    progress.wait(lock, [&] { return stopping || queue.size() < options.max_queue; });
+    if (stopping) {
+        throw std::runtime_error("Audit writer is closed");
+    }
+    queue.push_back(std::move(event));
+    ++accepted;
+    if (queue.size() >= options.batch_size) {
+        wake.notify_one();
+    }
+}
+
+void AuditWriter::flush() {
+    std::unique_lock<std::mutex> lock(mutex);
+    std::uint64_t target = accepted;
+    std::uint64_t failures_before = counters.failures;
+    if (processed >= target) {
+        return;
+    }
+    flush_requested = true;
+    wake.notify_one();
+    progress.wait(lock, [&] { return processed >= target || counters.failures != failures_before; });
+    if (processed < target) {
+        throw std::runtime_error("Failed to flush audit events: " + last_error);
+    }
+}
+
+void AuditWriter::close() {
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (stopping) {
+            return;
+        }
+        stopping = true;
+    }
+    wake.notify_one();
+    progress.notify_all();
+    if (worker.joinable()) {
+        worker.join();
+    }
+}
+
+AuditWriterStats AuditWriter::stats() const {
+    std::lock_guard<std::mutex> lock(mutex);
+    AuditWriterStats result = counters;
+    result.queued = queue.size();
+    return result;
+}
+
+void AuditWriter::run() {
+    std::unique_lock<std::mutex> lock(mutex);
+    while (true) {
+        wake.wait_for(lock, options.flush_interval, [&] {
+            return stopping || flush_requested || queue.size() >= options.batch_size;
+        });
+        if (queue.empty()) {
+            flush_requested = false;
+            if (stopping) {
+                break;
+            }
+            continue;
+        }
+
+        std::size_t count = std::min(queue.size(), options.batch_size);
+        std::vector<AuditEvent> batch(std::make_move_iterator(queue.begin()),
+                                      std::make_move_iterator(queue.begin() + count));
+        queue.erase(queue.begin(), queue.begin() + count);
+        lock.unlock();
+
+        std::string error;
+        std::size_t rejected = 0;
+        try {
+            rejected = writeBatch(batch);
+        } catch (const std::exception& e) {
+            error = e.what();
+        }
+
+        lock.lock();
+        if (error.empty()) {
+            processed += batch.size();
+            counters.written += batch.size() - rejected;
+            counters.rejected += rejected;
+            ++counters.batches;
+            if (queue.empty()) {
+                flush_requested = false;
+            }
+            progress.notify_all();
+            continue;
+        }
+
+        std::cerr << "Audit writer failed to write " << batch.size() << " events: " << error << std::endl;
+        ++counters.failures;
+        last_error = error;
+        flush_requested = false;
+        if (stopping) {
+            // Nothing will retry after shutdown; count what is lost so it shows up in the log
+            std::cerr << "Audit writer dropping " << batch.size() + queue.size()
+                      << " events at shutdown" << std::endl;
+            processed += batch.size() + queue.size();
+            queue.clear();
+            progress.notify_all();
+            break;
+        }
+        // Put the batch back in front and wait before retrying
+        queue.insert(queue.begin(), std::make_move_iterator(batch.begin()), std::make_move_iterator(batch.end()));
+        progress.notify_all();
+        wake.wait_for(lock, options.flush_interval, [&] { return stopping; });
+    }
+}
+
+std::size_t AuditWriter::writeBatch(const std::vector<AuditEvent>& batch) {
+    auto conn = db_manager->acquireConnection();
+    try {
+        pqxx::work txn(*conn);
+        auto stream = pqxx::stream_to::table(txn, {"audit_log"},
+            {"user_id", "action", "entity_type", "entity_id", "details", "ip_address", "session_id", "created_at"});
+        for (const auto& event : batch) {
+            stream.write_values(event.user_id, event.action, event.entity_type, event.entity_id,
+                                event.details, event.ip_address, event.session_id,
+                                formatTimestamp(event.created_at));
+        }
+        stream.complete();
+        txn.commit();
+        return 0;
+    } catch (const pqxx::data_exception&) {
+        return writeIndividually(*conn, batch);
+    } catch (const pqxx::integrity_constraint_violation&) {
+        return writeIndividually(*conn, batch);
+    }
+}
+
+std::size_t AuditWriter::writeIndividually(pqxx::connection& conn, const std::vector<AuditEvent>& batch) {
+    std::size_t rejected = 0;
+    for (const auto& event : batch) {
+        try {
+            pqxx::work txn(conn);
+            txn.exec_params(
+                "INSERT INTO audit_log (user_id, action, entity_type, entity_id, details, ip_address, "
+                "session_id, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)",
+                event.user_id, event.action, event.entity_type, event.entity_id, event.details,
+                event.ip_address, event.session_id, formatTimestamp(event.created_at));
+            txn.commit();
+        } catch (const pqxx::broken_connection&) {
+            throw;
+        } catch (const std::exception& e) {
+            std::cerr << "Audit writer rejected " << event.action << " event: " << e.what() << std::endl;
+            ++rejected;
+        }
+    }
+    return rejected;
+}
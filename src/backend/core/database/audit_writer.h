@@ -0,0 +1,90 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Audit Writer Header
+ *
+ * This file defines the AuditWriter class which buffers audit events in memory
+ * and writes them to audit_log in batches from a background thread. Callers
+ * only pay for a queue push; the writer flushes when a batch fills up, when
+ * the flush interval elapses, when flush() is called, and at shutdown.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <string>
+#include <thread>
+#include <vector>
+#include "db_manager.h"
+
+struct AuditEvent {
+    std::optional<int> user_id;  // Empty for events not tied to a user
+    std::string action;
+    std::string entity_type;
+    int entity_id = 0;
+    std::string details = "{}";  // JSON text
+    std::string ip_address = "unknown";
+    std::string session_id = "unknown";
+    std::chrono::system_clock::time_point created_at = std::chrono::system_clock::now();
+};
+
+struct AuditWriterOptions {
+    std::size_t batch_size = 500;
+    std::chrono::milliseconds flush_interval{1000};
+    // log() blocks once this many events are waiting, rather than dropping audit records
+    std::size_t max_queue = 100000;
+};
+
+struct AuditWriterStats {
+    std::uint64_t queued = 0;    // Events waiting to be written
+    std::uint64_t written = 0;
+    std::uint64_t batches = 0;
+    std::uint64_t failures = 0;  // Batch attempts that failed and were retried
+    std::uint64_t rejected = 0;  // Events the database refused individually; reported and dropped
+};
+
+class AuditWriter {
+public:
+    AuditWriter(std::shared_ptr<DBManager> db, const AuditWriterOptions& options = AuditWriterOptions());
+    ~AuditWriter();
+
+    AuditWriter(const AuditWriter&) = delete;
+    AuditWriter& operator=(const AuditWriter&) = delete;
+
+    // Queue an event; returns without waiting for the database
+    void log(AuditEvent event);
+    // Block until every event queued before the call has been written
+    void flush();
+    // Write what is left and stop the background thread; later log() calls throw
+    void close();
+
+    AuditWriterStats stats() const;
+
+private:
+    void run();
+    // Both return the number of events the database rejected
+    std::size_t writeBatch(const std::vector<AuditEvent>& batch);
+    std::size_t writeIndividually(pqxx::connection& conn, const std::vector<AuditEvent>& batch);
+
+    std::shared_ptr<DBManager> db_manager;
+    AuditWriterOptions options;
+
+    mutable std::mutex mutex;
+    std::condition_variable wake;     // Signals the writer thread
+    std::condition_variable progress; // Signals producers and flush() waiters
+    std::deque<AuditEvent> queue;
+    std::uint64_t accepted = 0;       // Events ever queued
+    std::uint64_t processed = 0;      // Events written or rejected
+    AuditWriterStats counters;
+    std::string last_error;
+    bool flush_requested = false;
+    bool stopping = false;
+    std::thread worker;
+};
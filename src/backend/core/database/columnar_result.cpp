@@ -0,0 +1,271 @@
+/**
+ * MediSys Hospital Management System - Columnar Result Implementation
+ *
+ * This file implements the conversion of a pqxx::result into ColumnarResult.
+ * Column types are picked from the PostgreSQL type OID of each column. Integer
+ * and boolean columns that contain NULLs become float64 with NaN, as pandas
+ * does, dates and timestamps use NaT, and text uses the code -1.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "columnar_result.h"
+#include <cctype>
+#include <charconv>
+#include <cstdlib>
+#include <stdexcept>
+#include <string_view>
+#include <unordered_map>
+
+namespace {
+
+// PostgreSQL type OIDs, from pg_type.dat
+constexpr pqxx::oid kBoolOid = 16;
+constexpr pqxx::oid kInt8Oid = 20;
+constexpr pqxx::oid kInt2Oid = 21;
+constexpr pqxx::oid kInt4Oid = 23;
+constexpr pqxx::oid kOidOid = 26;
+constexpr pqxx::oid kFloat4Oid = 700;
+constexpr pqxx::oid kFloat8Oid = 701;
+constexpr pqxx::oid kDateOid = 1082;
+constexpr pqxx::oid kTimestampOid = 1114;
+constexpr pqxx::oid kTimestampTzOid = 1184;
+constexpr pqxx::oid kNumericOid = 1700;
+
+constexpr double kNaN = std::numeric_limits<double>::quiet_NaN();
+
+ColumnType columnType(pqxx::oid type) {
+    switch (type) {
+    case kInt8Oid:
+    case kInt2Oid:
+    case kInt4Oid:
+    case kOidOid:
+        return ColumnType::Int64;
+    case kFloat4Oid:
+    case kFloat8Oid:
+    case kNumericOid:
+        return ColumnType::Float64;
+    case kBoolOid:
+        return ColumnType::Bool;
+    case kDateOid:
+        return ColumnType::Date;
+    case kTimestampOid:
+    case kTimestampTzOid:
+        return ColumnType::Timestamp;
+    default:
+        return ColumnType::Text;
+    }
+}
+
+std::string_view fieldText(const pqxx::field& field) {
+    return std::string_view(field.c_str(), field.size());
+}
+
+// Days from 1970-01-01 to a proleptic Gregorian date (H. Hinnant's days_from_civil)
+std::int64_t daysFromCivil(std::int64_t year, unsigned month, unsigned day) {
+    year -= month <= 2;
+    const std::int64_t era = (year >= 0 ? year : year - 399) / 400;
+    const unsigned year_of_era = static_cast<unsigned>(year - era * 400);
+    const unsigned day_of_year = (153 * (month > 2 ? month - 3 : month + 9) + 2) / 5 + day - 1;
+    const unsigned day_of_era = year_of_era * 365 + year_of_era / 4 - year_of_era / 100 + day_of_year;
+    return era * 146097 + static_cast<std::int64_t>(day_of_era) - 719468;
+}
+
+// Reads an unsigned number and the separator after it; false if either is missing
+bool readPart(const char*& p, const char* end, unsigned& value, char separator) {
+    auto parsed = std::from_chars(p, end, value);
+    if (parsed.ec != std::errc() || (separator && (parsed.ptr == end || *parsed.ptr != separator))) {
+        return false;
+    }
+    p = separator ? parsed.ptr + 1 : parsed.ptr;
+    return true;
+}
+
+// Parses the YYYY-MM-DD prefix of a date or timestamp (ISO DateStyle); infinity and BC dates fail
+bool parseDate(const char*& p, const char* end, std::int64_t& days) {
+    unsigned year = 0, month = 0, day = 0;
+    if (!readPart(p, end, year, '-') || !readPart(p, end, month, '-') || !readPart(p, end, day, 0)) {
+        return false;
+    }
+    if (month < 1 || month > 12 || day < 1 || day > 31) {
+        return false;
+    }
+    days = daysFromCivil(year, month, day);
+    return true;
+}
+
+bool parseDate(std::string_view text, std::int64_t& seconds) {
+    const char* p = text.data();
+    const char* end = p + text.size();
+    std::int64_t days = 0;
+    if (!parseDate(p, end, days) || p != end) {
+        return false;
+    }
+    seconds = days * 86400;
+    return true;
+}
+
+// Parses "YYYY-MM-DD HH:MM:SS[.ffffff][+HH[:MM[:SS]]]" into microseconds since the epoch in UTC
+bool parseTimestamp(std::string_view text, std::int64_t& micros) {
+    const char* p = text.data();
+    const char* end = p + text.size();
+    std::int64_t days = 0;
+    if (!parseDate(p, end, days) || p == end || *p != ' ') {
+        return false;
+    }
+    ++p;
+    unsigned hour = 0, minute = 0, second = 0;
+    if (!readPart(p, end, hour, ':') || !readPart(p, end, minute, ':') || !readPart(p, end, second, 0)) {
+        return false;
+    }
+
+    std::int64_t fraction = 0;
+    if (p != end && *p == '.') {
+        int digits = 0;
+        for (++p; p != end && std::isdigit(static_cast<unsigned char>(*p)); ++p) {
+            if (digits < 6) {
+                fraction = fraction * 10 + (*p - '0');
+                ++digits;
+            }
+        }
+        for (; digits < 6; ++digits) {
+            fraction *= 10;
+        }
+    }
+
+    // timestamptz values carry the session's UTC offset
+    std::int64_t offset = 0;
+    if (p != end && (*p == '+' || *p == '-')) {
+        const int sign = *p == '-' ? -1 : 1;
+        unsigned offset_hours = 0, offset_minutes = 0, offset_seconds = 0;
+        ++p;
+        if (!readPart(p, end, offset_hours, 0)) {
+            return false;
+        }
+        if (p != end && *p == ':' && !readPart(++p, end, offset_minutes, 0)) {
+            return false;
+        }
+        if (p != end && *p == ':' && !readPart(++p, end, offset_seconds, 0)) {
+            return false;
+        }
+        offset = sign * static_cast<std::int64_t>(offset_hours * 3600 + offset_minutes * 60 + offset_seconds);
+    }
+    if (p != end) {
+        return false;
+    }
+
+    const std::int64_t seconds = days * 86400 + hour * 3600 + minute * 60 + second - offset;
+    micros = seconds * 1000000 + fraction;
+    return true;
+}
+
+// Integer and boolean columns with NULLs are handed over as float64 with NaN
+template <typename T>
+void toFloats(Column& column, const std::vector<T>& values, const pqxx::result& result, pqxx::row::size_type c) {
+    column.floats.resize(values.size());
+    for (std::size_t r = 0; r < values.size(); ++r) {
+        column.floats[r] = result[r][c].is_null() ? kNaN : static_cast<double>(values[r]);
+    }
+    column.type = ColumnType::Float64;
+}
+
+void fillColumn(Column& column, const pqxx::result& result, pqxx::row::size_type c) {
+    const std::size_t rows = result.size();
+    bool has_nulls = false;
+
+    switch (column.type) {
+    case ColumnType::Int64:
+        column.ints.resize(rows);
+        for (std::size_t r = 0; r < rows; ++r) {
+            const auto field = result[r][c];
+            if (field.is_null()) {
+                has_nulls = true;
+                continue;
+            }
+            auto text = fieldText(field);
+            auto parsed = std::from_chars(text.data(), text.data() + text.size(), column.ints[r]);
+            if (parsed.ec != std::errc()) {
+                throw std::runtime_error("Invalid integer in column " + column.name + ": " + std::string(text));
+            }
+        }
+        if (has_nulls) {
+            toFloats(column, column.ints, result, c);
+            std::vector<std::int64_t>().swap(column.ints);
+        }
+        break;
+    case ColumnType::Float64:
+        column.floats.resize(rows);
+        for (std::size_t r = 0; r < rows; ++r) {
+            const auto field = result[r][c];
+            // strtod understands NaN and Infinity as PostgreSQL prints them
+            column.floats[r] = field.is_null() ? kNaN : std::strtod(field.c_str(), nullptr);
+        }
+        break;
+    case ColumnType::Bool:
+        column.bools.resize(rows);
+        for (std::size_t r = 0; r < rows; ++r) {
+            const auto field = result[r][c];
+            if (field.is_null()) {
+                has_nulls = true;
+                continue;
+            }
+            column.bools[r] = field.c_str()[0] == 't';
+        }
+        if (has_nulls) {
+            toFloats(column, column.bools, result, c);
+            std::vector<std::uint8_t>().swap(column.bools);
+        }
+        break;
+    case ColumnType::Date:
+    case ColumnType::Timestamp:
+        column.ints.resize(rows);
+        for (std::size_t r = 0; r < rows; ++r) {
+            const auto field = result[r][c];
+            std::int64_t value = kNaT;
+            if (!field.is_null()) {
+                auto text = fieldText(field);
+                bool parsed = column.type == ColumnType::Date ? parseDate(text, value) : parseTimestamp(text, value);
+                // infinity and BC values have no datetime64 equivalent
+                if (!parsed) {
+                    value = kNaT;
+                }
+            }
+            column.ints[r] = value;
+        }
+        break;
+    case ColumnType::Text: {
+        // Views point into the result, which outlives the map
+        std::unordered_map<std::string_view, std::int32_t> positions;
+        column.codes.resize(rows);
+        for (std::size_t r = 0; r < rows; ++r) {
+            const auto field = result[r][c];
+            if (field.is_null()) {
+                column.codes[r] = -1;
+                continue;
+            }
+            auto text = fieldText(field);
+            auto [it, inserted] = positions.emplace(text, static_cast<std::int32_t>(column.dictionary.size()));
+            if (inserted) {
+                column.dictionary.emplace_back(text);
+            }
+            column.codes[r] = it->second;
+        }
+        break;
+    }
+    }
+}
+
+} // namespace
+
+ColumnarResult toColumnar(const pqxx::result& result) {
+    ColumnarResult columnar;
+    columnar.rows = result.size();
+    columnar.columns.resize(result.columns());
+    for (pqxx::row::size_type c = 0; c < result.columns(); ++c) {
+        Column& column = columnar.columns[c];
+        column.name = result.column_name(c);
+        column.type = columnType(result.column_type(c));
+        fillColumn(column, result, c);
+    }
+    return columnar;
+}
@@ -0,0 +1,43 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Columnar Result Header
+ *
+ * This file defines ColumnarResult, a query result laid out column by column
+ * in typed buffers. Numbers, dates and timestamps are parsed straight from
+ * libpqxx's text fields, and text columns are dictionary encoded, so the
+ * buffers can be handed to NumPy without building a Python object per cell.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <cstddef>
+#include <cstdint>
+#include <limits>
+#include <string>
+#include <vector>
+#include <pqxx/pqxx>
+
+enum class ColumnType { Int64, Float64, Bool, Date, Timestamp, Text };
+
+// NumPy reads this value as NaT in datetime64 arrays
+constexpr std::int64_t kNaT = std::numeric_limits<std::int64_t>::min();
+
+// One result column; only the buffer that belongs to its type is filled
+struct Column {
+    std::string name;
+    ColumnType type = ColumnType::Text;
+    std::vector<std::int64_t> ints;       // Int64; Date as seconds and Timestamp as microseconds since the epoch (UTC)
+    std::vector<double> floats;           // Float64, including integer and boolean columns that contain NULLs
+    std::vector<std::uint8_t> bools;      // Bool
+    std::vector<std::int32_t> codes;      // Text: position in dictionary, -1 for NULL
+    std::vector<std::string> dictionary;  // Text: distinct values in order of first appearance
+};
+
+struct ColumnarResult {
+    std::size_t rows = 0;
+    std::vector<Column> columns;
+};
+
+// Converts a result to columns; types other than numbers, booleans, dates and timestamps are kept as text
+ColumnarResult toColumnar(const pqxx::result& result);
@@ -0,0 +1,211 @@
+/**
+ * MediSys Hospital Management System - Connection Pool Implementation
+ *
+ * This file implements the ConnectionPool class. Connections are opened on
+ * demand up to the configured maximum, idle connections are pinged before
+ * reuse when they have been idle for a while, and registered prepared
+ * statements are prepared on each connection the first time it is checked out
+ * after the registration. The registry lives in process, so registering costs
+ * no round trip; a checkout that has statements to catch up on prepares all of
+ * them in one batch.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "connection_pool.h"
+#include <iostream>
+#include <stdexcept>
+#include <utility>
+#include <vector>
+
+PooledConnection::PooledConnection(std::shared_ptr<ConnectionPool> pool, std::unique_ptr<PooledSlot> slot)
+    : pool(std::move(pool)), slot(std::move(slot)) {}
+
+PooledConnection& PooledConnection::operator=(PooledConnection&& other) noexcept {
+    if (this != &other) {
+        release();
+        pool = std::move(other.pool);
+        slot = std::move(other.slot);
+    }
+    return *this;
+}
+
+PooledConnection::~PooledConnection() {
+    release();
+}
+
+void PooledConnection::release() {
+    if (pool && slot) {
+        pool->giveBack(std::move(slot));
+    }
+    pool.reset();
+}
+
+std::shared_ptr<ConnectionPool> ConnectionPool::create(const std::string& conn_str, const PoolOptions& options) {
+    return std::shared_ptr<ConnectionPool>(new ConnectionPool(conn_str, options));
+}
+
+ConnectionPool::ConnectionPool(const std::string& conn_str, const PoolOptions& options)
+    : conn_str(conn_str), options(options) {
+    if (options.max_size == 0) {
+        throw std::invalid_argument("Connection pool max size must be at least 1");
+    }
+    if (options.min_size > options.max_size) {
+        throw std::invalid_argument("Connection pool min size cannot exceed max size");
+    }
+    for (std::size_t i = 0; i < options.min_size; ++i) {
+        idle.push_back(openSlot());
+        ++open_count;
+    }
+}
+
+std::unique_ptr<PooledSlot> ConnectionPool::openSlot() const {
+    auto slot = std::make_unique<PooledSlot>();
+    slot->conn = std::make_unique<pqxx::connection>(conn_str);
+    if (!slot->conn->is_open()) {
+        throw std::runtime_error("Failed to connect to database");
+    }
+    slot->last_used = std::chrono::steady_clock::now();
+    return slot;
+}
+
+bool ConnectionPool::isHealthy(PooledSlot& slot) const {
+    if (!slot.conn || !slot.conn->is_open()) {
+        return false;
+    }
+    if (std::chrono::steady_clock::now() - slot.last_used < options.health_check_interval) {
+        return true;
+    }
+    try {
+        pqxx::nontransaction ping(*slot.conn);
+        ping.exec("SELECT 1");
+        return true;
+    } catch (const std::exception& e) {
+        std::cerr << "Pooled connection failed health check: " << e.what() << std::endl;
+        return false;
+    }
+}
+
+PooledConnection ConnectionPool::acquire() {
+    return acquire(options.checkout_timeout);
+}
+
+PooledConnection ConnectionPool::acquire(std::chrono::milliseconds timeout) {
+    std::unique_ptr<PooledSlot> slot;
+    std::vector<std::pair<std::string, std::string>> missing;
+    {
+        std::unique_lock<std::mutex> lock(mutex);
+        auto deadline = std::chrono::steady_clock::now() + timeout;
+        bool waited = false;
+        while (idle.empty() && open_count >= options.max_size) {
+            if (!waited) {
+                waited = true;
+                ++waits;
+            }
+            if (available.wait_until(lock, deadline) == std::cv_status::timeout &&
+                idle.empty() && open_count >= options.max_size) {
+                ++timeouts;
+                throw std::runtime_error("Timed out waiting for a free database connection");
+            }
+        }
+
+        if (!idle.empty()) {
+            slot = std::move(idle.front());
+            idle.pop_front();
+        } else {
+            // Reserve the seat now and open the connection outside the lock
+            ++open_count;
+        }
+    }
+
+    try {
+        if (!slot) {
+            slot = openSlot();
+        } else if (!isHealthy(*slot)) {
+            slot = openSlot();
+            std::lock_guard<std::mutex> lock(mutex);
+            ++replaced;
+        }
+    } catch (...) {
+        std::lock_guard<std::mutex> lock(mutex);
+        --open_count;
+        available.notify_one();
+        throw;
+    }
+
+    std::size_t version;
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        version = statements_version;
+        if (slot->statements_version != version) {
+            for (const auto& [name, query] : statements) {
+                auto prepared = slot->prepared.find(name);
+                if (prepared == slot->prepared.end() || prepared->second != query) {
+                    missing.emplace_back(name, query);
+                }
+            }
+        }
+    }
+
+    PooledConnection handle(shared_from_this(), std::move(slot));
+    if (!missing.empty()) {
+        // One simple-query round trip; SQL PREPARE shares a namespace with exec_prepared
+        std::string batch;
+        for (const auto& [name, query] : missing) {
+            if (handle.slot->prepared.count(name) > 0) {
+                // The statement was redefined since this connection prepared it
+                batch += "DEALLOCATE " + handle->quote_name(name) + "; ";
+            }
+            batch += "PREPARE " + handle->quote_name(name) + " AS " + query + "; ";
+        }
+        try {
+            pqxx::nontransaction txn(*handle);
+            txn.exec(batch);
+        } catch (...) {
+            // We no longer know which statements this connection has; drop it rather than guess
+            handle->close();
+            throw;
+        }
+        for (const auto& [name, query] : missing) {
+            handle.slot->prepared[name] = query;
+        }
+    }
+    handle.slot->statements_version = version;
+    handle.slot->last_used = std::chrono::steady_clock::now();
+    return handle;
+}
+
+void ConnectionPool::registerStatement(const std::string& name, const std::string& query) {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto existing = statements.find(name);
+    if (existing != statements.end() && existing->second == query) {
+        return;
+    }
+    statements[name] = query;
+    ++statements_version;
+}
+
+void ConnectionPool::giveBack(std::unique_ptr<PooledSlot> slot) {
+    std::lock_guard<std::mutex> lock(mutex);
+    if (slot->conn && slot->conn->is_open()) {
+        slot->last_used = std::chrono::steady_clock::now();
+        idle.push_back(std::move(slot));
+    } else {
+        --open_count;
+    }
+    available.notify_one();
+}
+
+PoolStats ConnectionPool::stats() const {
+    std::lock_guard<std::mutex> lock(mutex);
+    PoolStats result;
+    result.size = open_count;
+    result.idle = idle.size();
+    result.in_use = open_count - idle.size();
+    result.min_size = options.min_size;
+    result.max_size = options.max_size;
+    result.waits = waits;
+    result.timeouts = timeouts;
+    result.replaced = replaced;
+    return result;
+}
@@ -0,0 +1,112 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Connection Pool Header
+ *
+ * This file defines the ConnectionPool class which keeps a bounded set of
+ * libpqxx connections that services and worker threads can check out
+ * concurrently. Connections are health checked before they are handed out and
+ * every connection tracks which registered prepared statements it already has.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <deque>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <pqxx/pqxx>
+
+struct PoolOptions {
+    std::size_t min_size = 1;
+    std::size_t max_size = 8;
+    std::chrono::milliseconds checkout_timeout{5000};
+    // Idle connections older than this are pinged before being handed out
+    std::chrono::milliseconds health_check_interval{30000};
+};
+
+struct PoolStats {
+    std::size_t size = 0;      // Open connections, idle or checked out
+    std::size_t idle = 0;
+    std::size_t in_use = 0;
+    std::size_t min_size = 0;
+    std::size_t max_size = 0;
+    std::size_t waits = 0;     // Checkouts that had to wait for a connection
+    std::size_t timeouts = 0;  // Checkouts that gave up waiting
+    std::size_t replaced = 0;  // Connections replaced after a failed health check
+};
+
+// A pooled connection together with the prepared statements it already knows
+struct PooledSlot {
+    std::unique_ptr<pqxx::connection> conn;
+    std::map<std::string, std::string> prepared;  // Statement name -> query it was prepared with
+    std::size_t statements_version = 0;           // Registry version the slot was last synced to
+    std::chrono::steady_clock::time_point last_used;
+};
+
+class ConnectionPool;
+
+// RAII handle for a checked out connection; returns it to the pool when destroyed
+class PooledConnection {
+public:
+    PooledConnection() = default;
+    PooledConnection(PooledConnection&& other) noexcept = default;
+    PooledConnection& operator=(PooledConnection&& other) noexcept;
+    PooledConnection(const PooledConnection&) = delete;
+    PooledConnection& operator=(const PooledConnection&) = delete;
+    ~PooledConnection();
+
+    pqxx::connection& operator*() const { return *slot->conn; }
+    pqxx::connection* operator->() const { return slot->conn.get(); }
+    explicit operator bool() const { return slot != nullptr; }
+
+    // Give the connection back before the handle goes out of scope
+    void release();
+
+private:
+    friend class ConnectionPool;
+    PooledConnection(std::shared_ptr<ConnectionPool> pool, std::unique_ptr<PooledSlot> slot);
+
+    std::shared_ptr<ConnectionPool> pool;
+    std::unique_ptr<PooledSlot> slot;
+};
+
+class ConnectionPool : public std::enable_shared_from_this<ConnectionPool> {
+public:
+    static std::shared_ptr<ConnectionPool> create(const std::string& conn_str, const PoolOptions& options);
+
+    // Check out a connection, waiting up to the configured checkout timeout
+    PooledConnection acquire();
+    PooledConnection acquire(std::chrono::milliseconds timeout);
+
+    // Register a statement that every pooled connection should have prepared; no round trip,
+    // connections prepare it on their next checkout
+    void registerStatement(const std::string& name, const std::string& query);
+
+    PoolStats stats() const;
+
+private:
+    friend class PooledConnection;
+    ConnectionPool(const std::string& conn_str, const PoolOptions& options);
+
+    std::unique_ptr<PooledSlot> openSlot() const;
+    bool isHealthy(PooledSlot& slot) const;
+    void giveBack(std::unique_ptr<PooledSlot> slot);
+
+    std::string conn_str;
+    PoolOptions options;
+
+    mutable std::mutex mutex;
+    std::condition_variable available;
+    std::deque<std::unique_ptr<PooledSlot>> idle;
+    std::size_t open_count = 0;  // Includes connections that are still being opened
+    std::map<std::string, std::string> statements;
+    std::size_t statements_version = 0;
+    std::size_t waits = 0;
+    std::size_t timeouts = 0;
+    std::size_t replaced = 0;
+};
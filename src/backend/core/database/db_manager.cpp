@@ -4,20 +4,26 @@
  * This file implements the DBManager class which handles database connections,
  * schema initialization, and provides a common interface for database operations.
  * It includes methods for setting up the database schema, preparing statements,
- * and managing audit context for tracking user actions.
+ * and managing audit context for tracking user actions. Prepared statements are
+ * tracked in process and prepared on a connection only when it first needs them.
  *
  * Author: Mazharuddin Mohammed
  */
 
 #include "db_manager.h"
+#include <algorithm>
+#include <filesystem>
 #include <fstream>
+#include <set>
 #include <sstream>
+#include <vector>
 
-DBManager::DBManager(const std::string& conn_str) {
+DBManager::DBManager(const std::string& conn_str, const PoolOptions& pool_options) {
     conn = std::make_unique<pqxx::connection>(conn_str + " sslmode=disable");
     if (!conn->is_open()) {
         throw std::runtime_error("Failed to connect to database");
     }
+    pool = ConnectionPool::create(conn_str + " sslmode=disable", pool_options);
     // Create the custom variables if they don't exist
     pqxx::work txn(*conn);
     txn.exec("DO $$\n"
@@ -46,6 +52,10 @@ DBManager::DBManager(const std::string& conn_str) {
     safelyPrepare("set_user_context", "SELECT set_config('medisys.user_id', $1::text, false), "
                                     "set_config('medisys.ip_address', $2, false), "
                                     "set_config('medisys.session_id', $3, false)");
+    // Transaction-local variant used by ScopedAuditTransaction
+    safelyPrepare("set_local_audit_context", "SELECT set_config('medisys.user_id', $1::text, true), "
+                                           "set_config('medisys.ip_address', $2, true), "
+                                           "set_config('medisys.session_id', $3, true)");
     safelyPrepare("insert_patient",
         "INSERT INTO patients (first_name, last_name, dob, address) VALUES ($1, $2, $3, $4) RETURNING id");
     safelyPrepare("log_audit",
@@ -57,6 +67,8 @@ DBManager::~DBManager() {
 }
 
 void DBManager::initializeSchema() {
+    std::lock_guard<std::mutex> lock(conn_mutex);
+
     // Check if the schema already exists
     pqxx::work check_txn(*conn);
     auto result = check_txn.exec("SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'users')");
@@ -147,37 +159,136 @@ void DBManager::initializeSchema() {
 
         txn.commit();
     }
+
+    applyMigrations();
+
+    // Create the coming months' audit_log partitions (migration 004) so inserts rarely hit the default partition
+    pqxx::work partition_txn(*conn);
+    if (partition_txn.exec("SELECT to_regproc('audit_log_ensure_partitions') IS NOT NULL")[0][0].as<bool>()) {
+        partition_txn.exec("SELECT audit_log_ensure_partitions(3)");
+    }
+    partition_txn.commit();
+}
+
+void DBManager::applyMigrations() {
+    namespace fs = std::filesystem;
+    const fs::path migrations_dir("src/backend/core/database/migrations");
+    if (!fs::is_directory(migrations_dir)) {
+        std::cerr << "Migrations directory not found, skipping migrations" << std::endl;
+        return;
+    }
+
+    // Migrations are applied in file name order: NNN_description.sql
+    std::vector<fs::path> migration_files;
+    for (const auto& entry : fs::directory_iterator(migrations_dir)) {
+        if (entry.is_regular_file() && entry.path().extension() == ".sql") {
+            migration_files.push_back(entry.path());
+        }
+    }
+    std::sort(migration_files.begin(), migration_files.end());
+
+    std::set<std::string> applied;
+    {
+        pqxx::work txn(*conn);
+        txn.exec("CREATE TABLE IF NOT EXISTS schema_migrations ("
+                 "version VARCHAR(255) PRIMARY KEY, "
+                 "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)");
+        for (const auto& row : txn.exec("SELECT version FROM schema_migrations")) {
+            applied.insert(row[0].as<std::string>());
+        }
+        txn.commit();
+    }
+
+    for (const auto& path : migration_files) {
+        std::string version = path.stem().string();
+        if (applied.count(version) > 0) {
+            continue;
+        }
+        std::ifstream migration_file(path);
+        if (!migration_file.is_open()) {
+            throw std::runtime_error("Failed to open migration " + path.string());
+        }
+        std::stringstream buffer;
+        buffer << migration_file.rdbuf();
+
+        pqxx::work txn(*conn);
+        txn.exec(buffer.str());
+        txn.exec_params("INSERT INTO schema_migrations (version) VALUES ($1)", version);
+        txn.commit();
+        std::cout << "Applied migration " << version << std::endl;
+    }
 }
 
 void DBManager::setAuditContext(int user_id, const std::string& ip_address, const std::string& session_id) {
-    pqxx::work txn(*conn);
+    std::lock_guard<std::mutex> lock(conn_mutex);
+    // The settings are session-level on the primary connection, so an unchanged context needs no round-trip
+    if (audit_context_set && user_id == audit_user_id && ip_address == audit_ip_address &&
+        session_id == audit_session_id) {
+        return;
+    }
+    preparePrimary("set_user_context");
+    setAuditContext(*conn, user_id, ip_address, session_id);
+    audit_context_set = true;
+    audit_user_id = user_id;
+    audit_ip_address = ip_address;
+    audit_session_id = session_id;
+}
+
+void DBManager::setAuditContext(pqxx::connection& connection, int user_id,
+                                const std::string& ip_address, const std::string& session_id) {
+    pqxx::work txn(connection);
     txn.exec_prepared("set_user_context", std::to_string(user_id), ip_address, session_id);
     txn.commit();
 }
 
 bool DBManager::preparedStatementExists(const std::string& name) {
-    try {
-        pqxx::work txn(*conn);
-        auto result = txn.exec("SELECT COUNT(*) FROM pg_prepared_statements WHERE name = '" + name + "'");
-        txn.commit();
-        return result[0][0].as<int>() > 0;
-    } catch (const std::exception& e) {
-        // If there's an error, assume the statement doesn't exist
-        std::cerr << "Error checking for prepared statement: " << e.what() << std::endl;
-        return false;
-    }
+    std::lock_guard<std::mutex> lock(conn_mutex);
+    return statements.count(name) > 0;
 }
 
 void DBManager::safelyPrepare(const std::string& name, const std::string& query) {
-    if (!preparedStatementExists(name)) {
-        try {
-            conn->prepare(name, query);
-        } catch (const std::exception& e) {
-            std::cerr << "Error preparing statement '" << name << "': " << e.what() << std::endl;
-            // If the error is that the statement already exists, we can ignore it
-            if (std::string(e.what()).find("already exists") == std::string::npos) {
-                throw; // Re-throw if it's not an 'already exists' error
-            }
+    // Pooled connections prepare registered statements when they are checked out
+    pool->registerStatement(name, query);
+
+    std::lock_guard<std::mutex> lock(conn_mutex);
+    statements[name] = query;
+}
+
+ColumnarResult DBManager::queryColumns(const std::string& query,
+                                       const std::vector<std::optional<std::string>>& params) {
+    pqxx::params values;
+    for (const auto& param : params) {
+        if (param) {
+            values.append(*param);
+        } else {
+            values.append();
         }
     }
-}
\ No newline at end of file
+
+    pqxx::result result;
+    {
+        auto connection = acquireConnection();
+        pqxx::read_transaction txn(*connection);
+        // Parameters are bound server-side, so their text is never spliced into the SQL
+        result = txn.exec_params(query, values);
+        txn.commit();
+    }
+    // The result owns its data; the connection is back in the pool while it is converted
+    return toColumnar(result);
+}
+
+void DBManager::preparePrimary(const std::string& name) {
+    auto registered = statements.find(name);
+    if (registered == statements.end()) {
+        throw std::invalid_argument("Unknown prepared statement: " + name);
+    }
+    auto prepared = primary_prepared.find(name);
+    if (prepared != primary_prepared.end() && prepared->second == registered->second) {
+        return;
+    }
+    if (prepared != primary_prepared.end()) {
+        conn->unprepare(name);
+    }
+    conn->prepare(name, registered->second);
+    primary_prepared[name] = registered->second;
+}
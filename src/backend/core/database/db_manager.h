@@ -6,6 +6,8 @@
  * This file defines the DBManager class which handles database connections,
  * schema initialization, and provides a common interface for database operations.
  * It uses libpqxx for PostgreSQL connectivity and manages audit context for tracking.
+ * Besides the primary connection it owns a ConnectionPool that services use so
+ * that several threads can talk to the database at the same time.
  *
  * Author: Mazharuddin Mohammed
  */
@@ -13,22 +15,56 @@
 #include <string>
 #include <memory>
 #include <iostream>
+#include <map>
+#include <mutex>
+#include <optional>
+#include <vector>
 #include <pqxx/pqxx>
+#include "audit_transaction.h"
+#include "columnar_result.h"
+#include "connection_pool.h"
 
 class DBManager {
 public:
-    DBManager(const std::string& conn_str);
+    DBManager(const std::string& conn_str, const PoolOptions& pool_options = PoolOptions());
     ~DBManager();
     pqxx::connection& getConnection() { return *conn; }
     void initializeSchema();
     void setAuditContext(int user_id, const std::string& ip_address, const std::string& session_id);
+    void setAuditContext(pqxx::connection& connection, int user_id,
+                         const std::string& ip_address, const std::string& session_id);
 
-    // Safely prepare a statement if it doesn't already exist
+    // Check out a pooled connection; it goes back to the pool when the handle is destroyed
+    PooledConnection acquireConnection() { return pool->acquire(); }
+    PooledConnection acquireConnection(std::chrono::milliseconds timeout) { return pool->acquire(timeout); }
+    PoolStats poolStats() const { return pool->stats(); }
+
+    // Register a prepared statement; it is prepared on each connection when first needed there
     void safelyPrepare(const std::string& name, const std::string& query);
 
-    // Check if a prepared statement exists
+    // Check if a prepared statement has been registered
     bool preparedStatementExists(const std::string& name);
 
+    // Runs a read-only query with $1, $2, ... parameters (nullopt is NULL) on a pooled
+    // connection and returns the result column by column
+    ColumnarResult queryColumns(const std::string& query, const std::vector<std::optional<std::string>>& params);
+
 private:
+    // Applies pending files from migrations/ in order; caller holds conn_mutex
+    void applyMigrations();
+    // Prepares a registered statement on the primary connection if needed; caller holds conn_mutex
+    void preparePrimary(const std::string& name);
+
     std::unique_ptr<pqxx::connection> conn;
+    // Guards the primary connection; bindings call into it without holding the GIL
+    std::mutex conn_mutex;
+    // Registered statements, and the ones the primary connection has prepared so far
+    std::map<std::string, std::string> statements;
+    std::map<std::string, std::string> primary_prepared;
+    // Last audit context sent on the primary connection
+    bool audit_context_set = false;
+    int audit_user_id = 0;
+    std::string audit_ip_address;
+    std::string audit_session_id;
+    std::shared_ptr<ConnectionPool> pool;
 };
\ No newline at end of file
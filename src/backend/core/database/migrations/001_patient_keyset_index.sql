@@ -0,0 +1,2 @@
+-- Keyset pagination of the patient list by name (PatientService::listPatients)
+CREATE INDEX IF NOT EXISTS idx_patients_name_keyset ON patients (last_name, first_name, id);
@@ -0,0 +1,8 @@
+-- Trigram indexes for ranked patient search (PatientService::search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Name search matches "first last", so index the same expression the query uses
+CREATE INDEX IF NOT EXISTS idx_patients_full_name_trgm
+    ON patients USING GIN ((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_patients_mobile_trgm ON patients USING GIN (mobile gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_patients_email_trgm ON patients USING GIN (email gin_trgm_ops);
@@ -0,0 +1,89 @@
+-- Statement-level audit triggers
+-- Replaces the FOR EACH ROW audit trigger with one trigger per operation that
+-- reads the statement's transition tables, so a bulk change writes all of its
+-- audit rows with a single INSERT ... SELECT instead of a function call and an
+-- INSERT per row. UPDATE entries only record the columns that changed, leaving
+-- out updated_at.
+
+CREATE OR REPLACE FUNCTION audit_insert_statement() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_log (user_id, action, entity_type, entity_id, details, ip_address, session_id, created_at)
+    SELECT NULLIF(current_setting('medisys.user_id', TRUE), '')::INTEGER,
+           'create_' || TG_TABLE_NAME, TG_TABLE_NAME, n.id,
+           jsonb_build_object('new', to_jsonb(n)),
+           current_setting('medisys.ip_address', TRUE),
+           current_setting('medisys.session_id', TRUE),
+           CURRENT_TIMESTAMP
+    FROM new_rows n;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION audit_update_statement() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_log (user_id, action, entity_type, entity_id, details, ip_address, session_id, created_at)
+    SELECT NULLIF(current_setting('medisys.user_id', TRUE), '')::INTEGER,
+           'update_' || TG_TABLE_NAME, TG_TABLE_NAME, n.id,
+           jsonb_build_object('old', diff.old_values, 'new', diff.new_values),
+           current_setting('medisys.ip_address', TRUE),
+           current_setting('medisys.session_id', TRUE),
+           CURRENT_TIMESTAMP
+    FROM old_rows o
+    JOIN new_rows n ON n.id = o.id
+    CROSS JOIN LATERAL (SELECT to_jsonb(o) AS old_row, to_jsonb(n) AS new_row) r
+    CROSS JOIN LATERAL (
+        SELECT jsonb_object_agg(e.key, r.old_row -> e.key) AS old_values,
+               jsonb_object_agg(e.key, e.value) AS new_values
+        FROM jsonb_each(r.new_row) e
+        -- update_timestamp sets updated_at on every row the statement touches
+        WHERE e.key <> 'updated_at' AND r.old_row -> e.key IS DISTINCT FROM e.value
+    ) diff
+    -- Rows the statement touched without changing anything are not audited
+    WHERE diff.new_values IS NOT NULL;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION audit_delete_statement() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_log (user_id, action, entity_type, entity_id, details, ip_address, session_id, created_at)
+    SELECT NULLIF(current_setting('medisys.user_id', TRUE), '')::INTEGER,
+           'delete_' || TG_TABLE_NAME, TG_TABLE_NAME, o.id,
+           jsonb_build_object('old', to_jsonb(o)),
+           current_setting('medisys.ip_address', TRUE),
+           current_setting('medisys.session_id', TRUE),
+           CURRENT_TIMESTAMP
+    FROM old_rows o;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DO $$
+DECLARE
+    audited_table TEXT;
+BEGIN
+    FOREACH audited_table IN ARRAY ARRAY[
+        'users', 'departments', 'doctors', 'patients', 'visits',
+        'consultations', 'diagnostics', 'prescriptions', 'medical_analytics',
+        'doctor_kpi', 'department_kpi', 'transactions', 'hospital_account', 'doctor_expenses'
+    ] LOOP
+        CONTINUE WHEN to_regclass(audited_table) IS NULL;
+        EXECUTE format('DROP TRIGGER IF EXISTS audit_%s_trigger ON %I', audited_table, audited_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS audit_%s_insert ON %I', audited_table, audited_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS audit_%s_update ON %I', audited_table, audited_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS audit_%s_delete ON %I', audited_table, audited_table);
+        EXECUTE format('CREATE TRIGGER audit_%s_insert AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION audit_insert_statement()',
+                       audited_table, audited_table);
+        EXECUTE format('CREATE TRIGGER audit_%s_update AFTER UPDATE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION audit_update_statement()',
+                       audited_table, audited_table);
+        EXECUTE format('CREATE TRIGGER audit_%s_delete AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION audit_delete_statement()',
+                       audited_table, audited_table);
+    END LOOP;
+END $$;
@@ -0,0 +1,134 @@
+-- Monthly range partitioning for audit_log
+-- audit_log becomes a table partitioned by created_at with one partition per
+-- month (audit_log_pYYYY_MM) plus a default partition. Range scans only touch
+-- the months they cover, time lookups inside a partition use a BRIN index, and
+-- old months can be detached and archived without rewriting the table.
+
+-- Creates the partition for the month containing p_month, moving any rows for
+-- that month out of the default partition first
+CREATE OR REPLACE FUNCTION audit_log_ensure_partition(p_month DATE) RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'audit_log_p' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE audit_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format('WITH moved AS (DELETE FROM audit_log_default WHERE created_at >= %L AND created_at < %L '
+                   'RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                   month_start, month_end, partition_name);
+    EXECUTE format('ALTER TABLE audit_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, month_start, month_end);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Makes sure partitions exist from the current month through p_months_ahead months ahead
+CREATE OR REPLACE FUNCTION audit_log_ensure_partitions(p_months_ahead INTEGER DEFAULT 3) RETURNS VOID AS $$
+DECLARE
+    month_offset INTEGER;
+BEGIN
+    FOR month_offset IN 0..p_months_ahead LOOP
+        PERFORM audit_log_ensure_partition((CURRENT_DATE + make_interval(months => month_offset))::DATE);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detaches every monthly partition that ends on or before p_cutoff and returns
+-- their names; the detached tables keep their data until they are archived and dropped
+CREATE OR REPLACE FUNCTION audit_log_detach_before(p_cutoff DATE) RETURNS SETOF TEXT AS $$
+DECLARE
+    partition_name TEXT;
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'audit_log'::regclass
+          AND c.relname ~ '^audit_log_p[0-9]{4}_[0-9]{2}$'
+          AND (to_date(substr(c.relname, 12), 'YYYY_MM') + INTERVAL '1 month')::DATE <= p_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE audit_log DETACH PARTITION %I', partition_name);
+        RETURN NEXT partition_name;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    legacy_month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_log')) THEN
+        RETURN;
+    END IF;
+
+    -- The view depends on the table; it is recreated unchanged below
+    DROP VIEW IF EXISTS audit_summary;
+    ALTER TABLE audit_log RENAME TO audit_log_legacy;
+    ALTER INDEX IF EXISTS idx_audit_log_user_id RENAME TO idx_audit_log_legacy_user_id;
+    ALTER INDEX IF EXISTS idx_audit_log_entity_type RENAME TO idx_audit_log_legacy_entity_type;
+    ALTER INDEX IF EXISTS idx_audit_log_entity_id RENAME TO idx_audit_log_legacy_entity_id;
+    ALTER INDEX IF EXISTS idx_audit_log_created_at RENAME TO idx_audit_log_legacy_created_at;
+
+    -- The primary key has to include the partition key; ids still come from the old sequence
+    CREATE TABLE audit_log (
+        id INTEGER NOT NULL DEFAULT nextval('audit_log_id_seq'),
+        user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+        action VARCHAR(100) NOT NULL,
+        entity_type VARCHAR(50) NOT NULL,
+        entity_id INTEGER NOT NULL,
+        details JSONB,
+        ip_address VARCHAR(45),
+        session_id VARCHAR(100),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+    ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id;
+
+    CREATE INDEX idx_audit_log_user_id ON audit_log (user_id);
+    CREATE INDEX idx_audit_log_entity_type ON audit_log (entity_type);
+    CREATE INDEX idx_audit_log_entity_id ON audit_log (entity_id);
+    -- Rows arrive in time order, so a BRIN index is a tiny fraction of a B-tree's size
+    CREATE INDEX idx_audit_log_created_at ON audit_log USING BRIN (created_at);
+
+    CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT;
+
+    FOR legacy_month IN
+        SELECT DISTINCT date_trunc('month', created_at)::DATE FROM audit_log_legacy WHERE created_at IS NOT NULL
+    LOOP
+        PERFORM audit_log_ensure_partition(legacy_month);
+    END LOOP;
+    PERFORM audit_log_ensure_partitions(3);
+
+    INSERT INTO audit_log (id, user_id, action, entity_type, entity_id, details, ip_address, session_id, created_at)
+    SELECT id, user_id, action, entity_type, entity_id, details, ip_address, session_id,
+           COALESCE(created_at, CURRENT_TIMESTAMP)
+    FROM audit_log_legacy;
+    DROP TABLE audit_log_legacy;
+
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'admin_role') THEN
+        GRANT SELECT ON audit_log TO admin_role;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'doctor_role')
+       AND EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'finance_role') THEN
+        REVOKE ALL ON audit_log FROM doctor_role, finance_role;
+    END IF;
+END $$;
+
+-- Audit summary view
+CREATE OR REPLACE VIEW audit_summary AS
+SELECT
+    u.username,
+    al.action,
+    al.entity_type,
+    al.entity_id,
+    al.details,
+    al.ip_address,
+    al.session_id,
+    al.created_at
+FROM audit_log al
+LEFT JOIN users u ON al.user_id = u.id
+ORDER BY al.created_at DESC;
@@ -0,0 +1,29 @@
+-- Indexes for the analytics and RLS access paths
+-- The KPI and medical metric charts filter on (entity id, date range) and sort
+-- by date; the covering INCLUDE columns let those reads be index-only scans.
+-- The remaining indexes cover the foreign keys that dashboards, billing and the
+-- patients RLS policy join or filter on.
+
+CREATE INDEX IF NOT EXISTS idx_doctor_kpi_doctor_date
+    ON doctor_kpi (doctor_id, metric_date) INCLUDE (metric_name, metric_value);
+CREATE INDEX IF NOT EXISTS idx_doctor_kpi_department_date ON doctor_kpi (department_id, metric_date);
+CREATE INDEX IF NOT EXISTS idx_department_kpi_department_date
+    ON department_kpi (department_id, metric_date) INCLUDE (metric_name, metric_value);
+CREATE INDEX IF NOT EXISTS idx_medical_analytics_patient_date
+    ON medical_analytics (patient_id, metric_date) INCLUDE (metric_name, metric_value, trend);
+
+-- visits: the RLS policy looks up a doctor's patients; patient history is read by date
+CREATE INDEX IF NOT EXISTS idx_visits_doctor_patient ON visits (doctor_id, patient_id);
+CREATE INDEX IF NOT EXISTS idx_visits_patient_date ON visits (patient_id, visit_date);
+
+CREATE INDEX IF NOT EXISTS idx_consultations_doctor_date ON consultations (doctor_id, scheduled_date);
+CREATE INDEX IF NOT EXISTS idx_consultations_department_date ON consultations (department_id, scheduled_date);
+CREATE INDEX IF NOT EXISTS idx_consultations_patient ON consultations (patient_id);
+
+CREATE INDEX IF NOT EXISTS idx_prescriptions_visit ON prescriptions (visit_id);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_patient ON prescriptions (patient_id);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_doctor ON prescriptions (doctor_id);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_patient_date ON transactions (patient_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_transactions_visit ON transactions (visit_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_consultation ON transactions (consultation_id);
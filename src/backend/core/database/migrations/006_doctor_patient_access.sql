@@ -0,0 +1,132 @@
+-- Doctor -> patient access mapping for the patients RLS policy
+-- The old doctor_access policy ran a correlated IN (SELECT ... FROM visits)
+-- for every candidate patient row. doctor_patient keeps one row per doctor and
+-- patient pair that share at least one visit, maintained by statement-level
+-- triggers on visits, so the policy becomes a primary key probe.
+
+CREATE TABLE IF NOT EXISTS doctor_patient (
+    doctor_id INTEGER NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (doctor_id, patient_id)
+);
+CREATE INDEX IF NOT EXISTS idx_doctor_patient_patient ON doctor_patient (patient_id);
+
+-- Pairs gained by a statement are added (or their visit count raised); pairs lost
+-- are decremented and removed once no visit links them any more. Both functions
+-- are SECURITY DEFINER so doctors changing visits do not need to write
+-- doctor_patient themselves.
+CREATE OR REPLACE FUNCTION doctor_patient_apply(p_added JSONB, p_removed JSONB) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO doctor_patient (doctor_id, patient_id, visit_count)
+    SELECT (pair ->> 'doctor_id')::INTEGER, (pair ->> 'patient_id')::INTEGER, (pair ->> 'visits')::INTEGER
+    FROM jsonb_array_elements(p_added) pair
+    ON CONFLICT (doctor_id, patient_id)
+    DO UPDATE SET visit_count = doctor_patient.visit_count + EXCLUDED.visit_count;
+
+    WITH removed AS (
+        SELECT (pair ->> 'doctor_id')::INTEGER AS doctor_id, (pair ->> 'patient_id')::INTEGER AS patient_id,
+               (pair ->> 'visits')::INTEGER AS visits
+        FROM jsonb_array_elements(p_removed) pair
+    ), dropped AS (
+        DELETE FROM doctor_patient dp
+        USING removed r
+        WHERE dp.doctor_id = r.doctor_id AND dp.patient_id = r.patient_id AND dp.visit_count <= r.visits
+    )
+    UPDATE doctor_patient dp
+    SET visit_count = dp.visit_count - r.visits
+    FROM removed r
+    WHERE dp.doctor_id = r.doctor_id AND dp.patient_id = r.patient_id AND dp.visit_count > r.visits;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Only the trigger may change the mapping
+REVOKE EXECUTE ON FUNCTION doctor_patient_apply(JSONB, JSONB) FROM PUBLIC;
+
+-- Statement-level trigger on visits; each event only reaches the branch whose
+-- transition tables it declares
+CREATE OR REPLACE FUNCTION doctor_patient_sync() RETURNS TRIGGER AS $$
+DECLARE
+    added JSONB := '[]';
+    removed JSONB := '[]';
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT COALESCE(jsonb_agg(pairs), '[]') INTO added FROM (
+            SELECT doctor_id, patient_id, COUNT(*) AS visits FROM new_rows
+            WHERE doctor_id IS NOT NULL AND patient_id IS NOT NULL
+            GROUP BY doctor_id, patient_id) pairs;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT COALESCE(jsonb_agg(pairs), '[]') INTO removed FROM (
+            SELECT doctor_id, patient_id, COUNT(*) AS visits FROM old_rows
+            WHERE doctor_id IS NOT NULL AND patient_id IS NOT NULL
+            GROUP BY doctor_id, patient_id) pairs;
+    ELSE
+        -- Only visits whose doctor or patient changed move between pairs
+        SELECT COALESCE(jsonb_agg(pairs), '[]') INTO added FROM (
+            SELECT n.doctor_id, n.patient_id, COUNT(*) AS visits
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.doctor_id, o.patient_id) IS DISTINCT FROM (n.doctor_id, n.patient_id)
+              AND n.doctor_id IS NOT NULL AND n.patient_id IS NOT NULL
+            GROUP BY n.doctor_id, n.patient_id) pairs;
+        SELECT COALESCE(jsonb_agg(pairs), '[]') INTO removed FROM (
+            SELECT o.doctor_id, o.patient_id, COUNT(*) AS visits
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.doctor_id, o.patient_id) IS DISTINCT FROM (n.doctor_id, n.patient_id)
+              AND o.doctor_id IS NOT NULL AND o.patient_id IS NOT NULL
+            GROUP BY o.doctor_id, o.patient_id) pairs;
+    END IF;
+    PERFORM doctor_patient_apply(added, removed);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS doctor_patient_sync_insert ON visits;
+DROP TRIGGER IF EXISTS doctor_patient_sync_update ON visits;
+DROP TRIGGER IF EXISTS doctor_patient_sync_delete ON visits;
+CREATE TRIGGER doctor_patient_sync_insert AFTER INSERT ON visits
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION doctor_patient_sync();
+CREATE TRIGGER doctor_patient_sync_update AFTER UPDATE ON visits
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION doctor_patient_sync();
+CREATE TRIGGER doctor_patient_sync_delete AFTER DELETE ON visits
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION doctor_patient_sync();
+
+-- Backfill from the visits recorded so far
+INSERT INTO doctor_patient (doctor_id, patient_id, visit_count)
+SELECT doctor_id, patient_id, COUNT(*)
+FROM visits
+WHERE doctor_id IS NOT NULL AND patient_id IS NOT NULL
+GROUP BY doctor_id, patient_id
+ON CONFLICT (doctor_id, patient_id) DO UPDATE SET visit_count = EXCLUDED.visit_count;
+
+-- Doctor id of the connected role (roles are named after the doctor's user id), resolved once
+-- per statement; SECURITY DEFINER so doctor roles do not need access to doctors
+CREATE OR REPLACE FUNCTION current_doctor_id() RETURNS INTEGER AS $$
+    SELECT id FROM doctors
+    WHERE current_user::TEXT ~ '^[0-9]+$' AND user_id = current_user::TEXT::INTEGER;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+-- Doctors read the mapping through the patients policy, and only their own pairs
+ALTER TABLE doctor_patient ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'doctor_role') THEN
+        DROP POLICY IF EXISTS doctor_access ON patients;
+        CREATE POLICY doctor_access ON patients
+            FOR ALL
+            TO doctor_role
+            USING (EXISTS (
+                SELECT 1 FROM doctor_patient dp
+                WHERE dp.doctor_id = current_doctor_id() AND dp.patient_id = patients.id
+            ));
+        DROP POLICY IF EXISTS doctor_own_patients ON doctor_patient;
+        CREATE POLICY doctor_own_patients ON doctor_patient
+            FOR SELECT
+            TO doctor_role
+            USING (doctor_id = current_doctor_id());
+        GRANT SELECT ON doctor_patient TO doctor_role;
+    END IF;
+END $$;
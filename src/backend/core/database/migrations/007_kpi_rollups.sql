@@ -0,0 +1,136 @@
+-- Weekly, monthly and quarterly KPI rollups
+-- doctor_kpi_rollup and department_kpi_rollup hold the sum and count of the
+-- non-null metric values per entity, metric and period. Statement-level
+-- triggers apply each INSERT/UPDATE/DELETE on the raw tables as a delta, so
+-- the rollups stay current without rescanning history, and long-range charts
+-- read one row per period instead of one per day.
+
+CREATE TABLE IF NOT EXISTS doctor_kpi_rollup (
+    doctor_id INTEGER NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    metric_name VARCHAR(100) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month', 'quarter')),
+    period_start DATE NOT NULL,
+    value_sum DECIMAL(20,2) NOT NULL,
+    value_count INTEGER NOT NULL,
+    PRIMARY KEY (doctor_id, granularity, period_start, metric_name)
+);
+
+CREATE TABLE IF NOT EXISTS department_kpi_rollup (
+    department_id INTEGER NOT NULL REFERENCES departments(id) ON DELETE CASCADE,
+    metric_name VARCHAR(100) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month', 'quarter')),
+    period_start DATE NOT NULL,
+    value_sum DECIMAL(20,2) NOT NULL,
+    value_count INTEGER NOT NULL,
+    PRIMARY KEY (department_id, granularity, period_start, metric_name)
+);
+
+CREATE OR REPLACE FUNCTION doctor_kpi_rollup_sync() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO doctor_kpi_rollup AS r (doctor_id, metric_name, granularity, period_start, value_sum, value_count)
+        SELECT n.doctor_id, n.metric_name, g.granularity, date_trunc(g.granularity, n.metric_date::TIMESTAMP)::DATE,
+               SUM(n.metric_value), COUNT(*)
+        FROM new_rows n
+        CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) g (granularity)
+        WHERE n.doctor_id IS NOT NULL AND n.metric_value IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (doctor_id, granularity, period_start, metric_name)
+        DO UPDATE SET value_sum = r.value_sum + EXCLUDED.value_sum, value_count = r.value_count + EXCLUDED.value_count;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE doctor_kpi_rollup r
+        SET value_sum = r.value_sum - removed.value_sum, value_count = r.value_count - removed.value_count
+        FROM (
+            SELECT o.doctor_id, o.metric_name, g.granularity, date_trunc(g.granularity, o.metric_date::TIMESTAMP)::DATE AS period_start,
+                   SUM(o.metric_value) AS value_sum, COUNT(*) AS value_count
+            FROM old_rows o
+            CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) g (granularity)
+            WHERE o.doctor_id IS NOT NULL AND o.metric_value IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ) removed
+        WHERE r.doctor_id = removed.doctor_id AND r.granularity = removed.granularity
+          AND r.period_start = removed.period_start AND r.metric_name = removed.metric_name;
+        DELETE FROM doctor_kpi_rollup r
+        USING (SELECT DISTINCT doctor_id FROM old_rows) o
+        WHERE r.doctor_id = o.doctor_id AND r.value_count <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION department_kpi_rollup_sync() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO department_kpi_rollup AS r (department_id, metric_name, granularity, period_start, value_sum, value_count)
+        SELECT n.department_id, n.metric_name, g.granularity, date_trunc(g.granularity, n.metric_date::TIMESTAMP)::DATE,
+               SUM(n.metric_value), COUNT(*)
+        FROM new_rows n
+        CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) g (granularity)
+        WHERE n.department_id IS NOT NULL AND n.metric_value IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (department_id, granularity, period_start, metric_name)
+        DO UPDATE SET value_sum = r.value_sum + EXCLUDED.value_sum, value_count = r.value_count + EXCLUDED.value_count;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE department_kpi_rollup r
+        SET value_sum = r.value_sum - removed.value_sum, value_count = r.value_count - removed.value_count
+        FROM (
+            SELECT o.department_id, o.metric_name, g.granularity, date_trunc(g.granularity, o.metric_date::TIMESTAMP)::DATE AS period_start,
+                   SUM(o.metric_value) AS value_sum, COUNT(*) AS value_count
+            FROM old_rows o
+            CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) g (granularity)
+            WHERE o.department_id IS NOT NULL AND o.metric_value IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ) removed
+        WHERE r.department_id = removed.department_id AND r.granularity = removed.granularity
+          AND r.period_start = removed.period_start AND r.metric_name = removed.metric_name;
+        DELETE FROM department_kpi_rollup r
+        USING (SELECT DISTINCT department_id FROM old_rows) o
+        WHERE r.department_id = o.department_id AND r.value_count <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DO $$
+DECLARE
+    kpi_table TEXT;
+BEGIN
+    FOREACH kpi_table IN ARRAY ARRAY['doctor_kpi', 'department_kpi'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %s_rollup_insert ON %I', kpi_table, kpi_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %s_rollup_update ON %I', kpi_table, kpi_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %s_rollup_delete ON %I', kpi_table, kpi_table);
+        EXECUTE format('CREATE TRIGGER %s_rollup_insert AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION %s_rollup_sync()', kpi_table, kpi_table, kpi_table);
+        EXECUTE format('CREATE TRIGGER %s_rollup_update AFTER UPDATE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION %s_rollup_sync()', kpi_table, kpi_table, kpi_table);
+        EXECUTE format('CREATE TRIGGER %s_rollup_delete AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION %s_rollup_sync()', kpi_table, kpi_table, kpi_table);
+    END LOOP;
+END $$;
+
+-- Backfill from the KPI rows loaded so far; rerunning recomputes the same totals
+INSERT INTO doctor_kpi_rollup (doctor_id, metric_name, granularity, period_start, value_sum, value_count)
+SELECT k.doctor_id, k.metric_name, g.granularity, date_trunc(g.granularity, k.metric_date::TIMESTAMP)::DATE,
+       SUM(k.metric_value), COUNT(*)
+FROM doctor_kpi k
+CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) g (granularity)
+WHERE k.doctor_id IS NOT NULL AND k.metric_value IS NOT NULL
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (doctor_id, granularity, period_start, metric_name)
+DO UPDATE SET value_sum = EXCLUDED.value_sum, value_count = EXCLUDED.value_count;
+
+INSERT INTO department_kpi_rollup (department_id, metric_name, granularity, period_start, value_sum, value_count)
+SELECT k.department_id, k.metric_name, g.granularity, date_trunc(g.granularity, k.metric_date::TIMESTAMP)::DATE,
+       SUM(k.metric_value), COUNT(*)
+FROM department_kpi k
+CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) g (granularity)
+WHERE k.department_id IS NOT NULL AND k.metric_value IS NOT NULL
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (department_id, granularity, period_start, metric_name)
+DO UPDATE SET value_sum = EXCLUDED.value_sum, value_count = EXCLUDED.value_count;
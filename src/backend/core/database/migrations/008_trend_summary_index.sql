@@ -0,0 +1,10 @@
+-- Latest trend per patient and metric
+-- MedicalAnalytics.get_trend_summary picks each metric's most recent non-null
+-- trend with DISTINCT ON (patient_id, metric_name). This partial index is in
+-- that sort order, so the query reads one short run of index entries per
+-- metric instead of sorting every row the patient has in the range.
+
+CREATE INDEX IF NOT EXISTS idx_medical_analytics_latest_trend
+    ON medical_analytics (patient_id, metric_name, metric_date DESC, id DESC)
+    INCLUDE (trend)
+    WHERE trend IS NOT NULL;
@@ -0,0 +1,36 @@
+-- Invoices issued by billing runs
+-- A payment transaction is billed once it has a row here; month-end runs read
+-- the payments that do not, so a run that stops part way can simply be started
+-- again. The partial index keeps that anti-join to the payment rows of the
+-- billing period, in id order for the cursor.
+
+CREATE TABLE IF NOT EXISTS invoices (
+    id SERIAL PRIMARY KEY,
+    transaction_id INTEGER NOT NULL UNIQUE REFERENCES transactions(id) ON DELETE RESTRICT,
+    billing_run VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_invoices_billing_run ON invoices (billing_run);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_payment_created
+    ON transactions (created_at, id)
+    WHERE transaction_type = 'payment';
+
+-- Same statement-level audit triggers as the other tables (migration 003)
+DROP TRIGGER IF EXISTS audit_invoices_insert ON invoices;
+DROP TRIGGER IF EXISTS audit_invoices_delete ON invoices;
+CREATE TRIGGER audit_invoices_insert AFTER INSERT ON invoices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_insert_statement();
+CREATE TRIGGER audit_invoices_delete AFTER DELETE ON invoices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_delete_statement();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'finance_role') THEN
+        GRANT SELECT, INSERT ON invoices TO finance_role;
+        GRANT USAGE ON SEQUENCE invoices_id_seq TO finance_role;
+    END IF;
+END $$;
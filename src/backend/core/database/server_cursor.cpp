@@ -0,0 +1,60 @@
+/**
+ * MediSys Hospital Management System - Server Cursor Implementation
+ *
+ * This file implements the ServerCursor class. The cursor is declared inside
+ * a ScopedAuditTransaction so reads are attributed to the requesting user, and
+ * the transaction is finished and the connection returned to the pool as soon
+ * as the last batch has been fetched.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "server_cursor.h"
+#include <stdexcept>
+
+namespace {
+const char* const kCursorName = "medisys_scan";
+}
+
+ServerCursor::ServerCursor(PooledConnection connection, const std::string& query, std::size_t batch_size,
+                           int user_id, const std::string& ip_address, const std::string& session_id)
+    : conn(std::move(connection)), batch_size(batch_size) {
+    if (batch_size == 0) {
+        throw std::invalid_argument("Invalid batch size");
+    }
+    txn = std::make_unique<ScopedAuditTransaction>(*conn, user_id, ip_address, session_id);
+    // The connection is ours alone while the cursor is open, so a fixed cursor name is enough
+    txn->work().exec(std::string("DECLARE ") + kCursorName + " NO SCROLL CURSOR FOR " + query);
+}
+
+ServerCursor::~ServerCursor() {
+    try {
+        close();
+    } catch (const std::exception&) {
+        // Nothing sensible to do while unwinding; the pool discards broken connections
+    }
+}
+
+pqxx::result ServerCursor::fetch() {
+    if (done) {
+        return pqxx::result();
+    }
+    auto result = txn->work().exec("FETCH FORWARD " + std::to_string(batch_size) + " FROM " + kCursorName);
+    if (result.size() < batch_size) {
+        close();
+    }
+    return result;
+}
+
+void ServerCursor::close() {
+    if (done) {
+        return;
+    }
+    done = true;
+    if (txn) {
+        // Read-only scan; committing just ends the transaction and drops the cursor with it
+        txn->commit();
+        txn.reset();
+    }
+    conn.release();
+}
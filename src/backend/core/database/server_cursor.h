@@ -0,0 +1,38 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Server Cursor Header
+ *
+ * This file defines the ServerCursor class which walks a query through a
+ * server-side cursor (DECLARE / FETCH) on a pooled connection. Only one batch
+ * of rows is held in memory at a time, so large tables can be scanned with
+ * bounded memory. The connection stays checked out until the cursor is
+ * exhausted or closed.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <cstddef>
+#include <memory>
+#include <string>
+#include <pqxx/pqxx>
+#include "audit_transaction.h"
+#include "connection_pool.h"
+
+class ServerCursor {
+public:
+    ServerCursor(PooledConnection connection, const std::string& query, std::size_t batch_size,
+                 int user_id, const std::string& ip_address, const std::string& session_id);
+    ~ServerCursor();
+
+    // Returns the next batch of at most batch_size rows; an empty result means the scan is over
+    pqxx::result fetch();
+    bool exhausted() const { return done; }
+    void close();
+
+private:
+    PooledConnection conn;  // Declared first so the transaction is destroyed before it
+    std::unique_ptr<ScopedAuditTransaction> txn;
+    std::size_t batch_size;
+    bool done = false;
+};
@@ -0,0 +1,24 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Audit Entry Model
+ *
+ * This file defines the AuditEntry structure which represents one row of the
+ * audit log joined with the acting user's name, as used by audit reports and
+ * exports.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <string>
+
+struct AuditEntry {
+    std::string username;   // Empty when the acting user no longer exists
+    std::string action;
+    std::string entity_type;
+    int entity_id;
+    std::string details;    // JSON text
+    std::string ip_address;
+    std::string session_id;
+    std::string created_at; // YYYY-MM-DD HH:MM:SS
+};
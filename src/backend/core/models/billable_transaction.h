@@ -0,0 +1,23 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Billable Transaction Model
+ *
+ * This file defines the BillableTransaction structure which represents one
+ * payment transaction that has not been invoiced yet, joined with the name of
+ * the patient it is billed to, as read by billing runs.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include <string>
+
+struct BillableTransaction {
+    int transaction_id;
+    int patient_id;
+    std::string patient_name;   // "first last"
+    std::string amount;         // Decimal text, e.g. "125.50", so no cents are lost to rounding
+    std::string description;
+    std::string payment_method;
+    std::string created_at;     // YYYY-MM-DD HH:MM:SS
+};
@@ -21,4 +21,20 @@ bool PatientModel::isValidEmail(const std::string& email) {
     if (email.empty()) return true; // Email is optional
     return email.length() <= 100 &&
            std::regex_match(email, std::regex("^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}$"));
+}
+
+std::string PatientModel::validate(const Patient& patient) {
+    if (!isValidName(patient.first_name) || !isValidName(patient.last_name)) {
+        return "Invalid name";
+    }
+    if (!isValidGender(patient.gender)) {
+        return "Invalid gender";
+    }
+    if (!isValidMobile(patient.mobile)) {
+        return "Invalid mobile";
+    }
+    if (!isValidEmail(patient.email)) {
+        return "Invalid email";
+    }
+    return "";
 }
\ No newline at end of file
@@ -32,4 +32,7 @@ public:
     static bool isValidGender(const std::string& gender);
     static bool isValidMobile(const std::string& mobile);
     static bool isValidEmail(const std::string& email);
+
+    // Returns an empty string when the patient is valid, otherwise the first problem found
+    static std::string validate(const Patient& patient);
 };
\ No newline at end of file
@@ -0,0 +1,75 @@
+/**
+ * MediSys Hospital Management System - Audit Service Implementation
+ *
+ * This file implements the AuditService class which reads the audit log for
+ * reports and nightly exports. Filters mirror the ones offered by the audit
+ * report generator: date range, acting user and entity type.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "audit_service.h"
+#include <stdexcept>
+
+AuditService::AuditService(std::shared_ptr<DBManager> db) : db_manager(db) {}
+
+std::vector<AuditEntry> AuditCursor::next() {
+    std::vector<AuditEntry> entries;
+    auto result = cursor->fetch();
+    entries.reserve(result.size());
+    for (const auto& row : result) {
+        AuditEntry entry;
+        entry.username = row[0].as<std::string>(std::string());
+        entry.action = row[1].as<std::string>();
+        entry.entity_type = row[2].as<std::string>();
+        entry.entity_id = row[3].as<int>();
+        entry.details = row[4].as<std::string>(std::string());
+        entry.ip_address = row[5].as<std::string>(std::string());
+        entry.session_id = row[6].as<std::string>(std::string());
+        entry.created_at = row[7].as<std::string>(std::string());
+        entries.push_back(std::move(entry));
+    }
+    return entries;
+}
+
+std::string AuditService::filterClause(const AuditLogFilter& filter, pqxx::connection& conn) {
+    if (filter.start_date.empty() || filter.end_date.empty()) {
+        throw std::invalid_argument("Start and end date are required");
+    }
+
+    std::string clause =
+        " WHERE al.created_at BETWEEN " + conn.quote(filter.start_date) + " AND " + conn.quote(filter.end_date);
+    if (filter.user_id > 0) {
+        clause += " AND al.user_id = " + std::to_string(filter.user_id);
+    }
+    if (!filter.entity_type.empty()) {
+        clause += " AND al.entity_type = " + conn.quote(filter.entity_type);
+    }
+    return clause;
+}
+
+std::unique_ptr<AuditCursor> AuditService::iterAuditLog(const AuditLogFilter& filter, std::size_t batch_size,
+                                                        int user_id, const std::string& ip,
+                                                        const std::string& session) {
+    auto conn = db_manager->acquireConnection();
+    std::string query =
+        "SELECT u.username, al.action, al.entity_type, al.entity_id, "
+        "al.details::text, al.ip_address, al.session_id, "
+        "to_char(al.created_at, 'YYYY-MM-DD HH24:MI:SS') "
+        "FROM audit_log al "
+        "LEFT JOIN users u ON al.user_id = u.id" + filterClause(filter, *conn) +
+        " ORDER BY al.created_at DESC";
+
+    return std::make_unique<AuditCursor>(
+        std::make_unique<ServerCursor>(std::move(conn), query, batch_size, user_id, ip, session));
+}
+
+std::size_t AuditService::countAuditLog(const AuditLogFilter& filter, int user_id, const std::string& ip,
+                                        const std::string& session) {
+    auto conn = db_manager->acquireConnection();
+    std::string query = "SELECT count(*) FROM audit_log al" + filterClause(filter, *conn);
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    pqxx::result result = txn->exec(query);
+    txn.commit();
+    return result[0][0].as<std::size_t>();
+}
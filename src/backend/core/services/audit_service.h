@@ -0,0 +1,55 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Audit Service Header
+ *
+ * This file defines the AuditService class which gives read access to the
+ * audit log for reports and exports. Large scans are streamed in batches
+ * through a server-side cursor instead of being materialized at once.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "../database/db_manager.h"
+#include "../database/server_cursor.h"
+#include "../models/audit_entry.h"
+#include <cstddef>
+#include <memory>
+#include <string>
+#include <vector>
+
+struct AuditLogFilter {
+    std::string start_date;  // YYYY-MM-DD
+    std::string end_date;    // YYYY-MM-DD
+    int user_id = 0;         // 0 means all users
+    std::string entity_type; // Empty means all entity types
+};
+
+// Batches of audit entries read through a server-side cursor
+class AuditCursor {
+public:
+    explicit AuditCursor(std::unique_ptr<ServerCursor> cursor) : cursor(std::move(cursor)) {}
+    // Returns an empty vector once every matching entry has been read
+    std::vector<AuditEntry> next();
+    void close() { cursor->close(); }
+
+private:
+    std::unique_ptr<ServerCursor> cursor;
+};
+
+class AuditService {
+public:
+    AuditService(std::shared_ptr<DBManager> db);
+    // Streams matching entries, newest first
+    std::unique_ptr<AuditCursor> iterAuditLog(const AuditLogFilter& filter, std::size_t batch_size,
+                                              int user_id, const std::string& ip, const std::string& session);
+    // Number of entries iterAuditLog would return for the same filter
+    std::size_t countAuditLog(const AuditLogFilter& filter, int user_id, const std::string& ip,
+                              const std::string& session);
+
+private:
+    // WHERE clause shared by iterAuditLog and countAuditLog
+    static std::string filterClause(const AuditLogFilter& filter, pqxx::connection& conn);
+
+    std::shared_ptr<DBManager> db_manager;
+};
@@ -14,10 +14,98 @@
 #include <sstream>
 #include <openssl/sha.h>
 
-AuthService::AuthService(std::shared_ptr<DBManager> db) : db_manager(db) {
+AuthService::AuthService(std::shared_ptr<DBManager> db) : AuthService(db, nullptr) {}
+
+AuthService::AuthService(std::shared_ptr<DBManager> db, std::shared_ptr<AuditWriter> audit_writer)
+    : db_manager(db), audit_writer(audit_writer) {
     // Use the DBManager's safelyPrepare method to avoid duplicate prepared statements
     db_manager->safelyPrepare("select_user", "SELECT id, password_hash FROM users WHERE username = $1");
     db_manager->safelyPrepare("log_audit", "SELECT log_audit_action($1, $2, $3, $4, $5, $6, $7)");
+    // Look up the system user, creating it if missing, in a single round trip
+    db_manager->safelyPrepare("ensure_system_user",
+        "WITH existing AS (SELECT id FROM users WHERE username = 'system'), "
+        "created AS ("
+        "INSERT INTO users (username, password_hash, email, role, first_name, last_name) "
+        "SELECT 'system', 'not_for_login', 'system@medisys.com', 'admin', 'System', 'User' "
+        "WHERE NOT EXISTS (SELECT 1 FROM existing) "
+        "ON CONFLICT (username) DO NOTHING RETURNING id) "
+        "SELECT id FROM existing UNION ALL SELECT id FROM created");
+}
+
+void AuthService::invalidateSystemUserCache() {
+    std::lock_guard<std::mutex> lock(system_user_mutex);
+    system_user_id.reset();
+}
+
+std::optional<int> AuthService::systemUserId(pqxx::work& txn, bool& resolved) {
+    {
+        std::lock_guard<std::mutex> lock(system_user_mutex);
+        if (system_user_id) {
+            return *system_user_id;
+        }
+    }
+    auto result = txn.exec_prepared("ensure_system_user");
+    if (result.empty()) {
+        // Another session created it between our SELECT and INSERT; it is visible on the next
+        // attempt, so log this one without a user
+        return std::nullopt;
+    }
+    resolved = true;
+    return result[0][0].as<int>();
+}
+
+void AuthService::logFailedLogin(pqxx::work& txn, int entity_id, const std::string& details) {
+    bool resolved = false;
+    std::optional<int> audit_user_id = systemUserId(txn, resolved);
+    try {
+        if (!audit_writer) {
+            // Use system user ID for audit logging
+            txn.exec_prepared("log_audit",
+                audit_user_id, "failed_login", "user", entity_id,
+                details,
+                "unknown", "unknown");
+        }
+        txn.commit();
+    } catch (const pqxx::foreign_key_violation&) {
+        // The cached system user was deleted; resolve it again on the next attempt
+        invalidateSystemUserCache();
+        throw;
+    }
+    // Only cache an id once the transaction that may have created it is committed
+    if (resolved) {
+        std::lock_guard<std::mutex> lock(system_user_mutex);
+        system_user_id = audit_user_id;
+    }
+    if (audit_writer) {
+        AuditEvent event;
+        event.user_id = audit_user_id;
+        event.action = "failed_login";
+        event.entity_type = "user";
+        event.entity_id = entity_id;
+        event.details = details;
+        audit_writer->log(std::move(event));
+    }
+}
+
+void AuthService::logSuccessfulLogin(pqxx::work& txn, int user_id, const std::string& details) {
+    if (!audit_writer) {
+        // Use the actual user ID for successful login
+        txn.exec_prepared("log_audit",
+            user_id, "successful_login", "user", user_id,
+            details,
+            "unknown", "unknown");
+        txn.commit();
+        return;
+    }
+    // Nothing was written; commit only ends the read transaction
+    txn.commit();
+    AuditEvent event;
+    event.user_id = user_id;
+    event.action = "successful_login";
+    event.entity_type = "user";
+    event.entity_id = user_id;
+    event.details = details;
+    audit_writer->log(std::move(event));
 }
 
 int AuthService::authenticate(const std::string& username, const std::string& password) {
@@ -25,36 +113,14 @@ int AuthService::authenticate(const std::string& username, const std::string& pa
         throw std::invalid_argument("Invalid username");
     }
 
-    pqxx::work txn(db_manager->getConnection());
-
-    // First, check if we have a system user for audit logging
-    auto system_user_result = txn.exec("SELECT id FROM users WHERE username = 'system' LIMIT 1");
-    int system_user_id = 0;
-
-    // If system user doesn't exist, create it
-    if (system_user_result.empty()) {
-        auto new_system_user = txn.exec(
-            "INSERT INTO users (username, password_hash, email, role, first_name, last_name) "
-            "VALUES ('system', 'not_for_login', 'system@medisys.com', 'admin', 'System', 'User') "
-            "RETURNING id"
-        );
-        if (!new_system_user.empty()) {
-            system_user_id = new_system_user[0][0].as<int>();
-        }
-    } else {
-        system_user_id = system_user_result[0][0].as<int>();
-    }
+    auto conn = db_manager->acquireConnection();
+    pqxx::work txn(*conn);
 
-    // Now proceed with authentication
+    // Look up the user being authenticated
     auto result = txn.exec_prepared("select_user", username);
     if (result.empty()) {
         std::string json = "{\"username\":\"" + username + "\", \"reason\":\"user not found\"}";
-        // Use system user ID for audit logging
-        txn.exec_prepared("log_audit",
-            system_user_id, "failed_login", "user", 0,
-            json,
-            "unknown", "unknown");
-        txn.commit();
+        logFailedLogin(txn, 0, json);
         throw std::runtime_error("Invalid credentials");
     }
 
@@ -64,22 +130,12 @@ int AuthService::authenticate(const std::string& username, const std::string& pa
 
     if (!verifyPassword(password, stored_hash)) {
         std::string json = "{\"username\":\"" + username + "\", \"reason\":\"incorrect password\"}";
-        // Use system user ID for audit logging
-        txn.exec_prepared("log_audit",
-            system_user_id, "failed_login", "user", user_id,
-            json,
-            "unknown", "unknown");
-        txn.commit();
+        logFailedLogin(txn, user_id, json);
         throw std::runtime_error("Invalid credentials");
     }
 
     std::string json = "{\"username\":\"" + username + "\"}";
-    // Use the actual user ID for successful login
-    txn.exec_prepared("log_audit",
-        user_id, "successful_login", "user", user_id,
-        json,
-        "unknown", "unknown");
-    txn.commit();
+    logSuccessfulLogin(txn, user_id, json);
     return user_id;
 }
 
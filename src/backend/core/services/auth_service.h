@@ -10,17 +10,32 @@
  * Author: Mazharuddin Mohammed
  */
 
+#include "../database/audit_writer.h"
 #include "../database/db_manager.h"
 #include <memory>
+#include <mutex>
+#include <optional>
 #include <string>
 
 class AuthService {
 public:
     AuthService(std::shared_ptr<DBManager> db);
+    // Login events go through the writer instead of a synchronous insert per attempt
+    AuthService(std::shared_ptr<DBManager> db, std::shared_ptr<AuditWriter> audit_writer);
     int authenticate(const std::string& username, const std::string& password);
 
+    // Forget the cached system user id so the next failed login looks it up again
+    void invalidateSystemUserCache();
+
 private:
     std::shared_ptr<DBManager> db_manager;
+    std::shared_ptr<AuditWriter> audit_writer;
+    // Id of the 'system' user that failed logins are audited under, resolved on first use
+    std::optional<int> system_user_id;
+    std::mutex system_user_mutex;
+    std::optional<int> systemUserId(pqxx::work& txn, bool& resolved);
+    void logFailedLogin(pqxx::work& txn, int entity_id, const std::string& details);
+    void logSuccessfulLogin(pqxx::work& txn, int user_id, const std::string& details);
     std::string hashPassword(const std::string& password) const;
     bool verifyPassword(const std::string& password, const std::string& hash) const;
 };
\ No newline at end of file
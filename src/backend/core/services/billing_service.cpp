@@ -0,0 +1,101 @@
+/**
+ * MediSys Hospital Management System - Billing Service Implementation
+ *
+ * This file implements the BillingService class which reads unbilled payment
+ * transactions for invoice billing runs and records the invoices issued for
+ * them. The invoices table is created by migration 009.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "billing_service.h"
+#include <stdexcept>
+
+BillingService::BillingService(std::shared_ptr<DBManager> db) : db_manager(db) {
+    // Already-invoiced ids are skipped, so a rerun after a partial failure is harmless
+    db_manager->safelyPrepare("insert_invoices",
+        "INSERT INTO invoices (transaction_id, billing_run) "
+        "SELECT unnest($1::int[]), $2 "
+        "ON CONFLICT (transaction_id) DO NOTHING");
+}
+
+std::vector<BillableTransaction> BillingCursor::next() {
+    std::vector<BillableTransaction> transactions;
+    auto result = cursor->fetch();
+    transactions.reserve(result.size());
+    for (const auto& row : result) {
+        BillableTransaction transaction;
+        transaction.transaction_id = row[0].as<int>();
+        transaction.patient_id = row[1].as<int>();
+        transaction.patient_name = row[2].as<std::string>();
+        transaction.amount = row[3].as<std::string>();
+        transaction.description = row[4].as<std::string>(std::string());
+        transaction.payment_method = row[5].as<std::string>(std::string());
+        transaction.created_at = row[6].as<std::string>(std::string());
+        transactions.push_back(std::move(transaction));
+    }
+    return transactions;
+}
+
+std::string BillingService::unbilledClause(const BillingPeriod& period, pqxx::connection& conn) {
+    if (period.start_date.empty() || period.end_date.empty()) {
+        throw std::invalid_argument("Start and end date are required");
+    }
+
+    // Range and type match the partial index from migration 009
+    return " FROM transactions t"
+           " JOIN patients p ON p.id = t.patient_id"
+           " WHERE t.transaction_type = 'payment'"
+           " AND t.created_at >= " + conn.quote(period.start_date) +
+           " AND t.created_at < " + conn.quote(period.end_date) +
+           " AND NOT EXISTS (SELECT 1 FROM invoices i WHERE i.transaction_id = t.id)";
+}
+
+std::unique_ptr<BillingCursor> BillingService::iterUnbilled(const BillingPeriod& period, std::size_t batch_size,
+                                                            int user_id, const std::string& ip,
+                                                            const std::string& session) {
+    auto conn = db_manager->acquireConnection();
+    std::string query =
+        "SELECT t.id, t.patient_id, p.first_name || ' ' || p.last_name, t.amount::text, "
+        "t.description, t.payment_method, to_char(t.created_at, 'YYYY-MM-DD HH24:MI:SS')" +
+        unbilledClause(period, *conn) +
+        " ORDER BY t.created_at, t.id";
+
+    return std::make_unique<BillingCursor>(
+        std::make_unique<ServerCursor>(std::move(conn), query, batch_size, user_id, ip, session));
+}
+
+std::size_t BillingService::countUnbilled(const BillingPeriod& period, int user_id, const std::string& ip,
+                                          const std::string& session) {
+    auto conn = db_manager->acquireConnection();
+    std::string query = "SELECT count(*)" + unbilledClause(period, *conn);
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    pqxx::result result = txn->exec(query);
+    txn.commit();
+    return result[0][0].as<std::size_t>();
+}
+
+std::size_t BillingService::markInvoiced(const std::vector<int>& transaction_ids, const std::string& billing_run,
+                                         int user_id, const std::string& ip, const std::string& session) {
+    if (billing_run.empty()) {
+        throw std::invalid_argument("Billing run name is required");
+    }
+    if (transaction_ids.empty()) {
+        return 0;
+    }
+
+    std::string id_array = "{";
+    for (int transaction_id : transaction_ids) {
+        if (id_array.size() > 1) {
+            id_array += ",";
+        }
+        id_array += std::to_string(transaction_id);
+    }
+    id_array += "}";
+
+    auto conn = db_manager->acquireConnection();
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    pqxx::result result = txn->exec_prepared("insert_invoices", id_array, billing_run);
+    txn.commit();
+    return static_cast<std::size_t>(result.affected_rows());
+}
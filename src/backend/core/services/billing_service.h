@@ -0,0 +1,58 @@
+#pragma once
+
+/**
+ * MediSys Hospital Management System - Billing Service Header
+ *
+ * This file defines the BillingService class which feeds invoice billing
+ * runs. Unbilled payments are streamed in batches through a server-side
+ * cursor, and transactions are marked as invoiced once their invoices have
+ * been written.
+ *
+ * Author: Mazharuddin Mohammed
+ */
+
+#include "../database/db_manager.h"
+#include "../database/server_cursor.h"
+#include "../models/billable_transaction.h"
+#include <cstddef>
+#include <memory>
+#include <string>
+#include <vector>
+
+struct BillingPeriod {
+    std::string start_date;  // YYYY-MM-DD, inclusive
+    std::string end_date;    // YYYY-MM-DD, exclusive
+};
+
+// Batches of unbilled transactions read through a server-side cursor
+class BillingCursor {
+public:
+    explicit BillingCursor(std::unique_ptr<ServerCursor> cursor) : cursor(std::move(cursor)) {}
+    // Returns an empty vector once every unbilled transaction has been read
+    std::vector<BillableTransaction> next();
+    void close() { cursor->close(); }
+
+private:
+    std::unique_ptr<ServerCursor> cursor;
+};
+
+class BillingService {
+public:
+    BillingService(std::shared_ptr<DBManager> db);
+    // Streams the period's payments that have no invoice yet, oldest first
+    std::unique_ptr<BillingCursor> iterUnbilled(const BillingPeriod& period, std::size_t batch_size,
+                                                int user_id, const std::string& ip, const std::string& session);
+    // Number of transactions iterUnbilled would return for the same period
+    std::size_t countUnbilled(const BillingPeriod& period, int user_id, const std::string& ip,
+                              const std::string& session);
+    // Records invoices for the given transactions in one statement; ids that already
+    // have one are skipped. Returns the number of invoices recorded.
+    std::size_t markInvoiced(const std::vector<int>& transaction_ids, const std::string& billing_run,
+                             int user_id, const std::string& ip, const std::string& session);
+
+private:
+    // FROM and WHERE clauses shared by iterUnbilled and countUnbilled
+    static std::string unbilledClause(const BillingPeriod& period, pqxx::connection& conn);
+
+    std::shared_ptr<DBManager> db_manager;
+};
@@ -12,6 +12,49 @@
 #include "../models/patient.h"
 #include <sstream>
 #include <iomanip>
+#include <algorithm>
+#include <cctype>
+#include <unordered_map>
+
+namespace {
+
+// Convert time_t to a YYYY-MM-DD date string
+std::string formatDate(std::time_t timestamp) {
+    // localtime_r rather than localtime: several threads may be creating patients at once
+    std::tm tm_buf = {};
+    localtime_r(&timestamp, &tm_buf);
+    char date_buffer[11]; // YYYY-MM-DD + null terminator
+    std::strftime(date_buffer, sizeof(date_buffer), "%Y-%m-%d", &tm_buf);
+    return std::string(date_buffer);
+}
+
+const char* const kPatientColumns =
+    "id, first_name, last_name, dob, gender, address, mobile, email, "
+    "emergency_contact_name, emergency_contact_mobile";
+
+// Map a row selected with kPatientColumns
+Patient patientFromRow(const pqxx::row& row) {
+    Patient patient;
+    patient.id = row[0].as<int>();
+    patient.first_name = row[1].as<std::string>();
+    patient.last_name = row[2].as<std::string>();
+    // Convert date string to time_t
+    std::tm tm = {};
+    std::string date_str = row[3].as<std::string>();
+    std::stringstream ss(date_str);
+    ss >> std::get_time(&tm, "%Y-%m-%d");
+    patient.dob = std::mktime(&tm);
+    // Everything past the date of birth is nullable in the schema
+    patient.gender = row[4].as<std::string>(std::string());
+    patient.address = row[5].as<std::string>(std::string());
+    patient.mobile = row[6].as<std::string>(std::string());
+    patient.email = row[7].as<std::string>(std::string());
+    patient.emergency_contact_name = row[8].as<std::string>(std::string());
+    patient.emergency_contact_mobile = row[9].as<std::string>(std::string());
+    return patient;
+}
+
+} // namespace
 
 PatientService::PatientService(std::shared_ptr<DBManager> db) : db_manager(db) {
     // Use the DBManager's safelyPrepare method to avoid duplicate prepared statements
@@ -23,33 +66,48 @@ PatientService::PatientService(std::shared_ptr<DBManager> db) : db_manager(db) {
         "SELECT id, first_name, last_name, dob, gender, address, mobile, email, "
         "emergency_contact_name, emergency_contact_mobile "
         "FROM patients WHERE id = $1");
+    db_manager->safelyPrepare("select_patients",
+        "SELECT id, first_name, last_name, dob, gender, address, mobile, email, "
+        "emergency_contact_name, emergency_contact_mobile "
+        "FROM patients WHERE id = ANY($1::int[])");
+    db_manager->safelyPrepare("list_patients_by_id",
+        std::string("SELECT ") + kPatientColumns + " FROM patients WHERE id > $1 ORDER BY id LIMIT $2");
+    db_manager->safelyPrepare("list_patients_by_name_first",
+        std::string("SELECT ") + kPatientColumns + " FROM patients "
+        "ORDER BY last_name, first_name, id LIMIT $1");
+    // Substring matches use the trigram indexes from migration 002; fuzzy name matches use %
+    db_manager->safelyPrepare("search_patients",
+        std::string("SELECT ") + kPatientColumns + ", "
+        "GREATEST(similarity(first_name || ' ' || last_name, $1), "
+        "similarity(COALESCE(mobile, ''), $1), similarity(COALESCE(email, ''), $1)) AS score "
+        "FROM patients "
+        "WHERE id = $2 "
+        "OR (first_name || ' ' || last_name) ILIKE $3 "
+        "OR mobile ILIKE $3 "
+        "OR email ILIKE $3 "
+        "OR (first_name || ' ' || last_name) % $1 "
+        "ORDER BY (id = $2) DESC, score DESC, id "
+        "LIMIT $4");
+    // Resolve the sort key of the last row seen so the scan can seek on idx_patients_name_keyset
+    db_manager->safelyPrepare("list_patients_by_name_after",
+        std::string("SELECT ") + kPatientColumns + " FROM patients "
+        "WHERE (last_name, first_name, id) > "
+        "(SELECT last_name, first_name, id FROM patients WHERE id = $1) "
+        "ORDER BY last_name, first_name, id LIMIT $2");
 }
 
 int PatientService::createPatient(const Patient& patient, int user_id, const std::string& ip, const std::string& session) {
-    if (!PatientModel::isValidName(patient.first_name) || !PatientModel::isValidName(patient.last_name)) {
-        throw std::invalid_argument("Invalid name");
-    }
-    if (!PatientModel::isValidGender(patient.gender)) {
-        throw std::invalid_argument("Invalid gender");
-    }
-    if (!PatientModel::isValidMobile(patient.mobile)) {
-        throw std::invalid_argument("Invalid mobile");
+    std::string error = PatientModel::validate(patient);
+    if (!error.empty()) {
+        throw std::invalid_argument(error);
     }
-    if (!PatientModel::isValidEmail(patient.email)) {
-        throw std::invalid_argument("Invalid email");
-    }
-
-    db_manager->setAuditContext(user_id, ip, session);
-    pqxx::work txn(db_manager->getConnection());
-    // Convert time_t to formatted date string
-    std::tm* tm_ptr = std::localtime(&patient.dob);
-    char date_buffer[11]; // YYYY-MM-DD + null terminator
-    std::strftime(date_buffer, sizeof(date_buffer), "%Y-%m-%d", tm_ptr);
 
-    auto result = txn.exec_prepared("insert_patient",
+    auto conn = db_manager->acquireConnection();
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    auto result = txn->exec_prepared("insert_patient",
         patient.first_name,
         patient.last_name,
-        std::string(date_buffer), // Formatted date string
+        formatDate(patient.dob),
         patient.gender,
         patient.address,
         patient.mobile,
@@ -61,34 +119,203 @@ int PatientService::createPatient(const Patient& patient, int user_id, const std
     return result[0][0].as<int>();
 }
 
+PatientImportResult PatientService::createPatientsBulk(const std::vector<Patient>& patients, int user_id,
+                                                       const std::string& ip, const std::string& session,
+                                                       std::size_t batch_size) {
+    if (batch_size == 0) {
+        throw std::invalid_argument("Invalid batch size");
+    }
+
+    PatientImportResult import_result;
+    std::vector<std::size_t> valid_rows;
+    valid_rows.reserve(patients.size());
+    for (std::size_t i = 0; i < patients.size(); ++i) {
+        std::string error = PatientModel::validate(patients[i]);
+        if (error.empty()) {
+            valid_rows.push_back(i);
+        } else {
+            import_result.errors.push_back({i, error});
+        }
+    }
+    if (valid_rows.empty()) {
+        return import_result;
+    }
+
+    auto conn = db_manager->acquireConnection();
+    for (std::size_t start = 0; start < valid_rows.size(); start += batch_size) {
+        std::size_t end = std::min(start + batch_size, valid_rows.size());
+        try {
+            ScopedAuditTransaction txn(*conn, user_id, ip, session);
+            auto stream = pqxx::stream_to::table(txn.work(), {"patients"},
+                {"first_name", "last_name", "dob", "gender", "address", "mobile", "email",
+                 "emergency_contact_name", "emergency_contact_mobile"});
+            for (std::size_t row = start; row < end; ++row) {
+                const Patient& patient = patients[valid_rows[row]];
+                stream.write_values(
+                    patient.first_name,
+                    patient.last_name,
+                    formatDate(patient.dob),
+                    patient.gender,
+                    patient.address,
+                    patient.mobile,
+                    patient.email,
+                    patient.emergency_contact_name,
+                    patient.emergency_contact_mobile
+                );
+            }
+            stream.complete();
+            txn.commit();
+            import_result.inserted += end - start;
+        } catch (const pqxx::broken_connection&) {
+            throw;
+        } catch (const std::exception& e) {
+            // The whole batch was rolled back; report every row in it and carry on with the next one
+            for (std::size_t row = start; row < end; ++row) {
+                import_result.errors.push_back({valid_rows[row], std::string("Batch rejected: ") + e.what()});
+            }
+        }
+    }
+
+    std::sort(import_result.errors.begin(), import_result.errors.end(),
+              [](const PatientImportError& a, const PatientImportError& b) { return a.index < b.index; });
+    return import_result;
+}
+
 Patient PatientService::getPatient(int patient_id, int user_id, const std::string& ip, const std::string& session) {
     if (patient_id <= 0) {
         throw std::invalid_argument("Invalid patient ID");
     }
 
-    db_manager->setAuditContext(user_id, ip, session);
-    pqxx::work txn(db_manager->getConnection());
-    auto result = txn.exec_prepared("select_patient", patient_id);
+    auto conn = db_manager->acquireConnection();
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    auto result = txn->exec_prepared("select_patient", patient_id);
     if (result.empty()) {
         throw std::runtime_error("Patient not found");
     }
 
-    auto row = result[0];
-    Patient patient;
-    patient.id = row[0].as<int>();
-    patient.first_name = row[1].as<std::string>();
-    patient.last_name = row[2].as<std::string>();
-    // Convert date string to time_t
-    std::tm tm = {};
-    std::string date_str = row[3].as<std::string>();
-    std::stringstream ss(date_str);
-    ss >> std::get_time(&tm, "%Y-%m-%d");
-    patient.dob = std::mktime(&tm);
-    patient.gender = row[4].as<std::string>();
-    patient.address = row[5].as<std::string>();
-    patient.mobile = row[6].as<std::string>();
-    patient.email = row[7].as<std::string>();
-    patient.emergency_contact_name = row[8].as<std::string>();
-    patient.emergency_contact_mobile = row[9].as<std::string>();
-    return patient;
-}
\ No newline at end of file
+    return patientFromRow(result[0]);
+}
+
+PatientBatch PatientService::getPatients(const std::vector<int>& patient_ids, int user_id,
+                                         const std::string& ip, const std::string& session) {
+    PatientBatch batch;
+    std::string id_array = "{";
+    for (int patient_id : patient_ids) {
+        if (patient_id <= 0) {
+            continue;
+        }
+        if (id_array.size() > 1) {
+            id_array += ",";
+        }
+        id_array += std::to_string(patient_id);
+    }
+    id_array += "}";
+
+    std::unordered_map<int, Patient> found;
+    if (id_array.size() > 2) {
+        auto conn = db_manager->acquireConnection();
+        ScopedAuditTransaction txn(*conn, user_id, ip, session);
+        auto result = txn->exec_prepared("select_patients", id_array);
+        found.reserve(result.size());
+        for (const auto& row : result) {
+            Patient patient = patientFromRow(row);
+            found.emplace(patient.id, std::move(patient));
+        }
+    }
+
+    // Answer in request order; ids that were not found are reported rather than thrown
+    batch.patients.reserve(found.size());
+    for (int patient_id : patient_ids) {
+        auto it = found.find(patient_id);
+        if (it != found.end()) {
+            batch.patients.push_back(it->second);
+        } else {
+            batch.missing_ids.push_back(patient_id);
+        }
+    }
+    return batch;
+}
+
+std::vector<Patient> PatientService::listPatients(int after_id, std::size_t limit, const std::string& sort,
+                                                 int user_id, const std::string& ip, const std::string& session) {
+    if (after_id < 0) {
+        throw std::invalid_argument("Invalid patient ID");
+    }
+    if (limit == 0 || limit > 10000) {
+        throw std::invalid_argument("Invalid page size");
+    }
+
+    auto conn = db_manager->acquireConnection();
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    pqxx::result result;
+    if (sort == "id") {
+        result = txn->exec_prepared("list_patients_by_id", after_id, limit);
+    } else if (sort == "name") {
+        result = after_id == 0
+            ? txn->exec_prepared("list_patients_by_name_first", limit)
+            : txn->exec_prepared("list_patients_by_name_after", after_id, limit);
+    } else {
+        throw std::invalid_argument("Invalid sort order: " + sort);
+    }
+
+    std::vector<Patient> patients;
+    patients.reserve(result.size());
+    for (const auto& row : result) {
+        patients.push_back(patientFromRow(row));
+    }
+    return patients;
+}
+
+std::vector<Patient> PatientService::search(const std::string& query, std::size_t limit,
+                                           int user_id, const std::string& ip, const std::string& session) {
+    if (limit == 0 || limit > 1000) {
+        throw std::invalid_argument("Invalid result limit");
+    }
+    auto first = query.find_first_not_of(" \t");
+    if (first == std::string::npos) {
+        return {};
+    }
+    std::string term = query.substr(first, query.find_last_not_of(" \t") - first + 1);
+
+    // A purely numeric term may also be a patient id; 0 never matches since ids start at 1
+    int id_match = 0;
+    if (term.size() <= 9 && std::all_of(term.begin(), term.end(), [](unsigned char c) { return std::isdigit(c); })) {
+        id_match = std::stoi(term);
+    }
+
+    auto conn = db_manager->acquireConnection();
+    std::string pattern = "%" + conn->esc_like(term) + "%";
+    ScopedAuditTransaction txn(*conn, user_id, ip, session);
+    auto result = txn->exec_prepared("search_patients", term, id_match, pattern, limit);
+
+    std::vector<Patient> patients;
+    patients.reserve(result.size());
+    for (const auto& row : result) {
+        patients.push_back(patientFromRow(row));
+    }
+    return patients;
+}
+
+std::vector<Patient> PatientCursor::next() {
+    std::vector<Patient> patients;
+    auto result = cursor->fetch();
+    patients.reserve(result.size());
+    for (const auto& row : result) {
+        patients.push_back(patientFromRow(row));
+    }
+    return patients;
+}
+
+std::unique_ptr<PatientCursor> PatientService::iterPatients(const std::string& name_filter, std::size_t batch_size,
+                                                            int user_id, const std::string& ip,
+                                                            const std::string& session) {
+    auto conn = db_manager->acquireConnection();
+    std::string query = std::string("SELECT ") + kPatientColumns + " FROM patients";
+    if (!name_filter.empty()) {
+        query += " WHERE (first_name || ' ' || last_name) ILIKE " +
+                 conn->quote("%" + conn->esc_like(name_filter) + "%");
+    }
+    query += " ORDER BY id";
+    return std::make_unique<PatientCursor>(
+        std::make_unique<ServerCursor>(std::move(conn), query, batch_size, user_id, ip, session));
+}
@@ -11,15 +11,62 @@
  */
 
 #include "../database/db_manager.h"
+#include "../database/server_cursor.h"
 #include "../models/patient.h"
+#include <cstddef>
 #include <memory>
 #include <string>
+#include <vector>
+
+struct PatientImportError {
+    std::size_t index;  // Position of the row in the imported sequence
+    std::string message;
+};
+
+struct PatientImportResult {
+    std::size_t inserted = 0;
+    std::vector<PatientImportError> errors;
+};
+
+struct PatientBatch {
+    std::vector<Patient> patients;  // In request order
+    std::vector<int> missing_ids;
+};
+
+// Batches of patients read through a server-side cursor
+class PatientCursor {
+public:
+    explicit PatientCursor(std::unique_ptr<ServerCursor> cursor) : cursor(std::move(cursor)) {}
+    // Returns an empty vector once every matching patient has been read
+    std::vector<Patient> next();
+    void close() { cursor->close(); }
+
+private:
+    std::unique_ptr<ServerCursor> cursor;
+};
 
 class PatientService {
 public:
     PatientService(std::shared_ptr<DBManager> db);
     int createPatient(const Patient& patient, int user_id, const std::string& ip, const std::string& session);
+    // Validates every row, then COPYs the valid ones in batches of batch_size rows
+    PatientImportResult createPatientsBulk(const std::vector<Patient>& patients, int user_id,
+                                           const std::string& ip, const std::string& session,
+                                           std::size_t batch_size = 10000);
     Patient getPatient(int patient_id, int user_id, const std::string& ip, const std::string& session);
+    // Fetches all ids in one round-trip; unknown ids end up in missing_ids
+    PatientBatch getPatients(const std::vector<int>& patient_ids, int user_id,
+                             const std::string& ip, const std::string& session);
+    // Keyset pagination: the page of up to limit patients that follows after_id (0 = first page)
+    // in the given sort order, either "id" or "name" (last name, first name, id)
+    std::vector<Patient> listPatients(int after_id, std::size_t limit, const std::string& sort,
+                                      int user_id, const std::string& ip, const std::string& session);
+    // Ranked matches on name, mobile, email or exact id, best match first
+    std::vector<Patient> search(const std::string& query, std::size_t limit,
+                                int user_id, const std::string& ip, const std::string& session);
+    // Streams patients ordered by id; name_filter matches "first last" case-insensitively
+    std::unique_ptr<PatientCursor> iterPatients(const std::string& name_filter, std::size_t batch_size,
+                                                int user_id, const std::string& ip, const std::string& session);
 
 private:
     std::shared_ptr<DBManager> db_manager;
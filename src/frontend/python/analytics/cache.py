@@ -0,0 +1,341 @@
+"""
+Analytics Cache Module for MediSys Hospital Management System
+
+This module provides a result cache shared by the analytics classes. Query
+results are kept per (table, entity, variant) as date-range segments, so a
+request that overlaps ranges fetched earlier only queries the days that are
+missing. Entries are evicted least recently used first once the entry or row
+budget is exceeded, and are dropped when the entity's watermark on updated_at
+moves or when the audit log reports a change to one of its rows.
+
+Author: Mazharuddin Mohammed
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from .columnar import query_frame
+
+DAY = pd.Timedelta(days=1)
+
+# How far below the newest audit_log id a missing id is still looked for, in case its transaction commits late
+AUDIT_RESCAN_IDS = 10000
+
+# Audited analytics tables and the column that identifies the entity a row belongs to
+OWNER_COLUMNS = {
+    "doctor_kpi": "doctor_id",
+    "department_kpi": "department_id",
+    "medical_analytics": "patient_id",
+}
+
+
+def _owner_case(side):
+    cases = " ".join(f"WHEN '{table}' THEN details -> '{side}' ->> '{column}'"
+                     for table, column in OWNER_COLUMNS.items())
+    return f"CASE entity_type {cases} END"
+
+
+# Every entity type is read so sync_audit_log knows which ids exist, but only the
+# owners of the analytics rows are taken out of details
+AUDIT_EVENTS_QUERY = f"""
+SELECT id, entity_type, {_owner_case("old")} AS old_owner, {_owner_case("new")} AS new_owner
+FROM audit_log
+WHERE id > $1 OR id = ANY($2::integer[])
+ORDER BY id
+"""
+
+
+def _day(value):
+    return pd.Timestamp(value).normalize()
+
+
+def _slice(df, start_date, end_date, date_column):
+    """Rows with start_date <= date_column <= end_date, as their own frame"""
+    dates = pd.to_datetime(df[date_column])
+    mask = (dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))
+    return df.loc[mask].reset_index(drop=True)
+
+
+def _concat(frames):
+    non_empty = [frame for frame in frames if not frame.empty]
+    if not non_empty:
+        return frames[0]
+    if len(non_empty) == 1:
+        return non_empty[0]
+    return pd.concat(non_empty, ignore_index=True)
+
+
+def read_range(fetch, start_date, end_date, date_column="metric_date"):
+    """
+    Run a range fetch without caching.
+
+    Args:
+        fetch: Callable taking (first_day, stop_day) and returning the rows with
+            first_day <= date_column < stop_day, ordered by date_column.
+        start_date: Start of the range (inclusive).
+        end_date: End of the range (inclusive).
+        date_column (str): Column the range applies to.
+
+    Returns:
+        pandas.DataFrame: The rows between start_date and end_date.
+    """
+    df = fetch(_day(start_date), _day(end_date) + DAY)
+    return _slice(df, start_date, end_date, date_column)
+
+
+def table_watermark(db, table, id_column, entity_id):
+    """
+    Return a value that changes whenever an entity's rows are inserted, updated or deleted.
+
+    Args:
+        db: medisys_bindings.DBManager instance for database access.
+        table (str): Table holding the entity's rows.
+        id_column (str): Column identifying the entity.
+        entity_id (int): Entity ID.
+
+    Returns:
+        tuple: Row count and latest updated_at, as strings.
+    """
+    query = f"SELECT count(*) AS row_count, max(updated_at) AS updated_at FROM {table} WHERE {id_column} = $1"
+    df = query_frame(db, query, (entity_id,))
+    return tuple(str(value) for value in df.iloc[0])
+
+
+class AnalyticsCache:
+    def __init__(self, max_entries=256, max_rows=2000000, watermark_interval=1.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Most (table, entity, variant) entries kept.
+            max_rows (int): Most rows kept across all entries.
+            watermark_interval (float): Seconds a watermark check stays valid for an entity;
+                0 checks on every request.
+        """
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.watermark_interval = watermark_interval
+        self._lock = threading.Lock()
+        # key -> sorted, disjoint list of (first_day, last_day, frame) segments
+        self._entries = OrderedDict()
+        # (table, entity_id) -> (watermark, checked_at)
+        self._watermarks = {}
+        self._rows = 0
+        self._last_audit_id = None
+        # audit_log ids below _last_audit_id that were not committed at the last sync
+        self._missing_audit_ids = set()
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get_range(self, key, start_date, end_date, fetch, watermark=None, date_column="metric_date"):
+        """
+        Return the rows of an entity between two dates, querying only the days not cached yet.
+
+        Args:
+            key (tuple): (table, entity_id, ...) identifying the query; the first two items
+                are what invalidate() and the watermark match on.
+            start_date: Start of the range (inclusive).
+            end_date: End of the range (inclusive).
+            fetch: Callable taking (first_day, stop_day) and returning the rows with
+                first_day <= date_column < stop_day, ordered by date_column.
+            watermark: Optional callable returning the entity's current watermark.
+            date_column (str): Column the range applies to.
+
+        Returns:
+            pandas.DataFrame: The rows between start_date and end_date.
+        """
+        first_day, last_day = _day(start_date), _day(end_date)
+        if last_day < first_day:
+            return read_range(fetch, start_date, end_date, date_column)
+        if watermark is not None:
+            self._check_watermark(key[:2], watermark)
+
+        with self._lock:
+            segments = self._entries.get(key, [])
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            invalidations = self.invalidations
+        gaps = self._gaps(segments, first_day, last_day)
+
+        fetched = [(gap_first, gap_last, fetch(gap_first, gap_last + DAY)) for gap_first, gap_last in gaps]
+        with self._lock:
+            if not gaps:
+                self.hits += 1
+            elif gaps == [(first_day, last_day)]:
+                self.misses += 1
+            else:
+                self.partial_hits += 1
+            # Rows fetched before an invalidation may already be stale, so they are not kept
+            if fetched and self.invalidations == invalidations:
+                self._store(key, self._merge(self._entries.get(key, []), fetched, date_column))
+        # The snapshot and the gaps cover the range even if the entry was evicted meanwhile
+        merged = self._merge(segments, fetched, date_column)
+        covering = next(frame for first, last, frame in merged if first <= first_day and last >= last_day)
+        return _slice(covering, start_date, end_date, date_column)
+
+    def invalidate(self, table, entity_id=None):
+        """Drop every cached entry for an entity, or for the whole table when entity_id is None"""
+        with self._lock:
+            for key in [key for key in self._entries
+                        if key[0] == table and (entity_id is None or key[1] == entity_id)]:
+                self._rows -= self._entry_rows(self._entries.pop(key))
+                self.invalidations += 1
+            for scope in [scope for scope in self._watermarks
+                          if scope[0] == table and (entity_id is None or scope[1] == entity_id)]:
+                del self._watermarks[scope]
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._watermarks.clear()
+            self._rows = 0
+
+    def apply_audit_event(self, entity_type, details):
+        """
+        Invalidate the entity an audit_log entry refers to.
+
+        Args:
+            entity_type (str): audit_log.entity_type, the table that changed.
+            details: audit_log.details as a dict or JSON string, holding the old and/or new row.
+        """
+        owner_column = OWNER_COLUMNS.get(entity_type)
+        if owner_column is None:
+            return
+        if isinstance(details, str):
+            details = json.loads(details)
+        self._invalidate_owners(entity_type, [((details or {}).get(side) or {}).get(owner_column)
+                                              for side in ("old", "new")])
+
+    def _invalidate_owners(self, entity_type, owners):
+        owners = {owner for owner in owners if not pd.isna(owner)}
+        if not owners:
+            # Update entries only carry changed columns, so the owner may be unknown
+            self.invalidate(entity_type)
+        for owner in owners:
+            self.invalidate(entity_type, int(owner))
+
+    def sync_audit_log(self, db):
+        """
+        Apply the analytics changes recorded in audit_log since the last sync.
+
+        The first sync only records where the log ends and clears the cache, since
+        changes made before it cannot be told apart. audit_log ids come from a
+        sequence when a row is inserted, but transactions commit in any order, so an
+        id below the newest one can still appear later. Each sync reads the ids above
+        the newest it has seen and the ones it found missing, which it keeps looking
+        for while they are within AUDIT_RESCAN_IDS of the newest, so a sync with no
+        new events reads no rows.
+
+        Args:
+            db: medisys_bindings.DBManager instance for database access.
+
+        Returns:
+            int: Number of audit events applied.
+        """
+        if self._last_audit_id is None:
+            df = query_frame(db, "SELECT COALESCE(max(id), 0) AS last_id FROM audit_log")
+            # Ids in the window that are missing now may still commit; the others are covered by the clear
+            self._last_audit_id = max(int(df.iloc[0]["last_id"]) - AUDIT_RESCAN_IDS, 0)
+            self._read_audit_log(db)
+            self.clear()
+            return 0
+
+        applied = 0
+        for event in self._read_audit_log(db).itertuples(index=False):
+            if event.entity_type in OWNER_COLUMNS:
+                self._invalidate_owners(event.entity_type, (event.old_owner, event.new_owner))
+                applied += 1
+        return applied
+
+    def _read_audit_log(self, db):
+        """Read the audit events not seen yet and move the newest id and the missing ids along"""
+        missing = "{" + ",".join(str(event_id) for event_id in sorted(self._missing_audit_ids)) + "}"
+        df = query_frame(db, AUDIT_EVENTS_QUERY, (self._last_audit_id, missing))
+        seen = set(int(event_id) for event_id in df["id"])
+        if seen:
+            last_id = max(self._last_audit_id, max(seen))
+            self._missing_audit_ids.update(range(self._last_audit_id + 1, last_id + 1))
+            self._last_audit_id = last_id
+        self._missing_audit_ids = {event_id for event_id in self._missing_audit_ids - seen
+                                   if event_id > self._last_audit_id - AUDIT_RESCAN_IDS}
+        return df
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "partial_hits": self.partial_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "rows": self._rows,
+            }
+
+    def _check_watermark(self, scope, watermark):
+        with self._lock:
+            cached = self._watermarks.get(scope)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < self.watermark_interval:
+            return
+        current = watermark()
+        if cached is not None and cached[0] != current:
+            self.invalidate(*scope)
+        with self._lock:
+            self._watermarks[scope] = (current, now)
+
+    @staticmethod
+    def _gaps(segments, first_day, last_day):
+        gaps = []
+        cursor = first_day
+        for first, last, _ in segments:
+            if last < cursor:
+                continue
+            if first > last_day:
+                break
+            if first > cursor:
+                gaps.append((cursor, first - DAY))
+            cursor = max(cursor, last + DAY)
+        if cursor <= last_day:
+            gaps.append((cursor, last_day))
+        return gaps
+
+    @staticmethod
+    def _merge(segments, fetched, date_column):
+        # Ordering by first day and joining neighbours keeps rows in date order
+        merged = []
+        for first, last, frame in sorted(list(segments) + fetched, key=lambda segment: segment[0]):
+            if merged and first <= merged[-1][1] + DAY:
+                prev_first, prev_last, prev_frame = merged[-1]
+                if last <= prev_last:
+                    continue
+                if first <= prev_last:
+                    # Another thread filled part of this gap first; keep only the newer days
+                    frame = frame.loc[pd.to_datetime(frame[date_column]) >= prev_last + DAY]
+                merged[-1] = (prev_first, last, _concat([prev_frame, frame]))
+            else:
+                merged.append((first, last, frame))
+        return merged
+
+    @staticmethod
+    def _entry_rows(segments):
+        return sum(len(frame) for _, _, frame in segments)
+
+    def _store(self, key, segments):
+        # Caller holds the lock
+        self._rows -= self._entry_rows(self._entries.get(key, []))
+        self._entries[key] = segments
+        self._entries.move_to_end(key)
+        self._rows += self._entry_rows(segments)
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+            _, evicted = self._entries.popitem(last=False)
+            self._rows -= self._entry_rows(evicted)
+            self.evictions += 1
@@ -0,0 +1,47 @@
+"""
+Columnar Query Module for MediSys Hospital Management System
+
+This module turns the column buffers returned by DBManager.query_columns into
+pandas DataFrames. The backend parses every cell in C++ and hands each column
+to NumPy as one typed array, so building the frame only wraps those arrays:
+numbers, dates and timestamps are used as they are, and text columns arrive
+dictionary encoded and become Categoricals without a Python string per row.
+
+Author: Mazharuddin Mohammed
+"""
+
+import pandas as pd
+
+
+def columns_to_frame(columns):
+    """
+    Wrap the result of DBManager.query_columns in a DataFrame without copying the arrays.
+
+    Args:
+        columns (dict): Column name to a NumPy array, or to (codes, values) for text columns.
+
+    Returns:
+        pandas.DataFrame: One column per result column, in query order.
+    """
+    data = {}
+    for name, values in columns.items():
+        if isinstance(values, tuple):
+            codes, categories = values
+            values = pd.Categorical.from_codes(codes, categories=categories)
+        data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def query_frame(db, query, params=()):
+    """
+    Run a read-only query and return its rows as a DataFrame.
+
+    Args:
+        db: medisys_bindings.DBManager instance for database access.
+        query (str): SQL with $1, $2, ... placeholders.
+        params (tuple): Parameter values; None is NULL.
+
+    Returns:
+        pandas.DataFrame: The query's rows.
+    """
+    return columns_to_frame(db.query_columns(query, list(params)))
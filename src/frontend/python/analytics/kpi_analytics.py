@@ -4,73 +4,131 @@ KPI Analytics Module for MediSys Hospital Management System
 This module provides functionality for analyzing and visualizing Key Performance
 Indicators (KPIs) for doctors and departments. It includes methods for retrieving
 KPI data from the database and generating visualizations for performance metrics.
+Long date ranges are read from the weekly, monthly or quarterly rollup tables so
+a chart never has to load more than a bounded number of points per metric, and
+results can be kept in a shared AnalyticsCache.
 
 Author: Mazharuddin Mohammed
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import medisys_bindings
+from .cache import read_range, table_watermark
+from .columnar import query_frame
+from .plotting import plot_metrics
 from datetime import datetime
 
+# Rollup granularities maintained by the database, finest first, with their length in days
+ROLLUP_GRANULARITIES = [("week", 7), ("month", 30.44), ("quarter", 91.31)]
+# Pandas periods that start where PostgreSQL's date_trunc does
+PERIOD_FREQUENCIES = {"week": "W-SUN", "month": "M", "quarter": "Q"}
+
+
 class KPIAnalytics:
-    def __init__(self, db):
+    def __init__(self, db, max_points=366, cache=None):
+        """
+        Initialize KPI analytics.
+
+        Args:
+            db: medisys_bindings.DBManager instance for database access.
+            max_points (int): Most points per metric a chart should plot; longer ranges
+                are read from the rollup tables.
+            cache (AnalyticsCache, optional): Cache shared with the other analytics classes;
+                without one every call queries the database.
+        """
         self.db = db
+        self.max_points = max_points
+        self.cache = cache
 
-    def get_doctor_kpi(self, doctor_id, start_date, end_date):
-        query = """
-        SELECT metric_name, metric_value, metric_date
-        FROM doctor_kpi
-        WHERE doctor_id = %s AND metric_date BETWEEN %s AND %s
-        ORDER BY metric_date
+    def choose_granularity(self, start_date, end_date, max_points=None):
         """
-        conn = self.db.get_connection()
-        df = pd.read_sql_query(query, conn, params=(doctor_id, start_date, end_date))
-        return df
+        Pick the finest data source whose number of periods in the range fits the point budget.
+
+        Args:
+            start_date: Start of the range (YYYY-MM-DD string or date).
+            end_date: End of the range (YYYY-MM-DD string or date).
+            max_points (int, optional): Point budget per metric; defaults to self.max_points.
+
+        Returns:
+            str: "day" for the raw rows, otherwise "week", "month" or "quarter".
+        """
+        max_points = max_points or self.max_points
+        days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+        if days <= max_points:
+            return "day"
+        for granularity, period_days in ROLLUP_GRANULARITIES:
+            if days / period_days <= max_points:
+                return granularity
+        return ROLLUP_GRANULARITIES[-1][0]
+
+    def _get_kpi(self, table, id_column, entity_id, start_date, end_date, granularity):
+        if granularity == "day":
+            source, date_column, columns = table, "metric_date", "metric_value, metric_date"
+            first_date, granularity_filter, granularity_params = start_date, "", ()
+        else:
+            if granularity not in dict(ROLLUP_GRANULARITIES):
+                raise ValueError(f"Unknown granularity: {granularity}")
+            # Periods that overlap the range, with metric_value as the period's mean
+            source, date_column = f"{table}_rollup", "period_start"
+            columns = "value_sum / value_count AS metric_value, period_start AS metric_date"
+            first_date = pd.Timestamp(start_date).to_period(PERIOD_FREQUENCIES[granularity]).start_time
+            granularity_filter, granularity_params = " AND granularity = $2", (granularity,)
+        first_date_param = 2 + len(granularity_params)
+        query = f"""
+        SELECT metric_name, {columns}
+        FROM {source}
+        WHERE {id_column} = $1{granularity_filter}
+          AND {date_column} >= ${first_date_param} AND {date_column} < ${first_date_param + 1}
+        ORDER BY {date_column}
+        """
+
+        def fetch(first_day, stop_day):
+            params = (entity_id, *granularity_params, first_day.date(), stop_day.date())
+            return query_frame(self.db, query, params)
+
+        if self.cache is None:
+            return read_range(fetch, first_date, end_date)
+        return self.cache.get_range((table, entity_id, granularity), first_date, end_date, fetch,
+                                    watermark=lambda: table_watermark(self.db, table, id_column, entity_id))
+
+    def get_doctor_kpi(self, doctor_id, start_date, end_date, granularity="day"):
+        """
+        Fetch a doctor's KPI values for a date range.
+
+        Args:
+            doctor_id (int): Doctor ID.
+            start_date: Start of the range (YYYY-MM-DD string or date).
+            end_date: End of the range (YYYY-MM-DD string or date).
+            granularity (str): "day" for the raw rows, or "week", "month" or "quarter" to
+                read per-period means from the rollups.
+
+        Returns:
+            pandas.DataFrame: metric_name, metric_value and metric_date columns.
+        """
+        return self._get_kpi("doctor_kpi", "doctor_id", doctor_id, start_date, end_date, granularity)
 
     def plot_doctor_kpi(self, doctor_id, start_date, end_date, output_path):
-        df = self.get_doctor_kpi(doctor_id, start_date, end_date)
-        if df.empty:
-            return
-
-        plt.figure(figsize=(10, 6))
-        for metric in df['metric_name'].unique():
-            metric_data = df[df['metric_name'] == metric]
-            plt.plot(metric_data['metric_date'], metric_data['metric_value'], label=metric)
-
-        plt.title(f"Doctor KPI Metrics (ID: {doctor_id})")
-        plt.xlabel("Date")
-        plt.ylabel("Value")
-        plt.legend()
-        plt.grid(True)
-        plt.savefig(output_path)
-        plt.close()
-
-    def get_department_kpi(self, department_id, start_date, end_date):
-        query = """
-        SELECT metric_name, metric_value, metric_date
-        FROM department_kpi
-        WHERE department_id = %s AND metric_date BETWEEN %s AND %s
-        ORDER BY metric_date
+        df = self.get_doctor_kpi(doctor_id, start_date, end_date,
+                                 self.choose_granularity(start_date, end_date))
+        plot_metrics(df, f"Doctor KPI Metrics (ID: {doctor_id})", output_path)
+
+    def get_department_kpi(self, department_id, start_date, end_date, granularity="day"):
+        """
+        Fetch a department's KPI values for a date range.
+
+        Args:
+            department_id (int): Department ID.
+            start_date: Start of the range (YYYY-MM-DD string or date).
+            end_date: End of the range (YYYY-MM-DD string or date).
+            granularity (str): "day" for the raw rows, or "week", "month" or "quarter" to
+                read per-period means from the rollups.
+
+        Returns:
+            pandas.DataFrame: metric_name, metric_value and metric_date columns.
         """
-        conn = self.db.get_connection()
-        df = pd.read_sql_query(query, conn, params=(department_id, start_date, end_date))
-        return df
+        return self._get_kpi("department_kpi", "department_id", department_id, start_date, end_date, granularity)
 
     def plot_department_kpi(self, department_id, start_date, end_date, output_path):
-        df = self.get_department_kpi(department_id, start_date, end_date)
-        if df.empty:
-            return
-
-        plt.figure(figsize=(10, 6))
-        for metric in df['metric_name'].unique():
-            metric_data = df[df['metric_name'] == metric]
-            plt.plot(metric_data['metric_date'], metric_data['metric_value'], label=metric)
-
-        plt.title(f"Department KPI Metrics (ID: {department_id})")
-        plt.xlabel("Date")
-        plt.ylabel("Value")
-        plt.legend()
-        plt.grid(True)
-        plt.savefig(output_path)
-        plt.close()
\ No newline at end of file
+        df = self.get_department_kpi(department_id, start_date, end_date,
+                                     self.choose_granularity(start_date, end_date))
+        plot_metrics(df, f"Department KPI Metrics (ID: {department_id})", output_path)
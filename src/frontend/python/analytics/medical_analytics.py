@@ -4,52 +4,98 @@ Medical Analytics Module for MediSys Hospital Management System
 This module provides functionality for analyzing and visualizing medical metrics
 for patients. It includes methods for retrieving patient medical data from the
 database, generating visualizations, and analyzing trends in patient health metrics.
+Results can be kept in an AnalyticsCache shared with the KPI analytics, and
+trend summaries are computed in SQL, for one patient or a whole ward at once.
 
 Author: Mazharuddin Mohammed
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import medisys_bindings
+from .cache import DAY, read_range, table_watermark
+from .columnar import query_frame
+from .plotting import plot_metrics
 from datetime import datetime
 
 class MedicalAnalytics:
-    def __init__(self, db):
+    def __init__(self, db, cache=None):
+        """
+        Initialize medical analytics.
+
+        Args:
+            db: medisys_bindings.DBManager instance for database access.
+            cache (AnalyticsCache, optional): Cache shared with the other analytics classes;
+                without one every call queries the database.
+        """
         self.db = db
+        self.cache = cache
 
     def get_patient_metrics(self, patient_id, start_date, end_date):
         query = """
         SELECT metric_name, metric_value, metric_date, trend
         FROM medical_analytics
-        WHERE patient_id = %s AND metric_date BETWEEN %s AND %s
+        WHERE patient_id = $1 AND metric_date >= $2 AND metric_date < $3
         ORDER BY metric_date
         """
-        conn = self.db.get_connection()
-        df = pd.read_sql_query(query, conn, params=(patient_id, start_date, end_date))
-        return df
+
+        def fetch(first_day, stop_day):
+            params = (patient_id, first_day.to_pydatetime(), stop_day.to_pydatetime())
+            return query_frame(self.db, query, params)
+
+        if self.cache is None:
+            return read_range(fetch, start_date, end_date)
+        return self.cache.get_range(("medical_analytics", patient_id), start_date, end_date, fetch,
+                                    watermark=lambda: table_watermark(self.db, "medical_analytics",
+                                                                      "patient_id", patient_id))
 
     def plot_patient_metrics(self, patient_id, start_date, end_date, output_path):
         df = self.get_patient_metrics(patient_id, start_date, end_date)
-        if df.empty:
-            return
-
-        plt.figure(figsize=(10, 6))
-        for metric in df['metric_name'].unique():
-            metric_data = df[df['metric_name'] == metric]
-            plt.plot(metric_data['metric_date'], metric_data['metric_value'], label=metric)
-
-        plt.title(f"Patient Medical Metrics (ID: {patient_id})")
-        plt.xlabel("Date")
-        plt.ylabel("Value")
-        plt.legend()
-        plt.grid(True)
-        plt.savefig(output_path)
-        plt.close()
+        plot_metrics(df, f"Patient Medical Metrics (ID: {patient_id})", output_path)
 
     def get_trend_summary(self, patient_id, start_date, end_date):
-        df = self.get_patient_metrics(patient_id, start_date, end_date)
-        if df.empty:
-            return {}
+        """
+        Return the most recent trend of each of a patient's metrics in a date range.
 
-        trends = df.groupby('metric_name')['trend'].last().to_dict()
-        return trends
\ No newline at end of file
+        Args:
+            patient_id (int): Patient ID.
+            start_date: Start of the range (YYYY-MM-DD string or date).
+            end_date: End of the range (YYYY-MM-DD string or date).
+
+        Returns:
+            dict: Metric name to trend; metrics that never recorded a trend are left out.
+        """
+        return self.get_trend_summaries([patient_id], start_date, end_date)[patient_id]
+
+    def get_trend_summaries(self, patient_ids, start_date, end_date):
+        """
+        Return the latest trend per metric for many patients with a single query.
+
+        Args:
+            patient_ids (list): Patient IDs, e.g. everyone on a ward.
+            start_date: Start of the range (YYYY-MM-DD string or date).
+            end_date: End of the range (YYYY-MM-DD string or date).
+
+        Returns:
+            dict: Patient ID to a dict of metric name to trend; patients without
+            trends map to an empty dict.
+        """
+        summaries = {patient_id: {} for patient_id in patient_ids}
+        if not summaries:
+            return summaries
+
+        placeholders = ", ".join(f"${position}" for position in range(1, len(summaries) + 1))
+        start_param = len(summaries) + 1
+        query = f"""
+        SELECT DISTINCT ON (patient_id, metric_name) patient_id, metric_name, trend
+        FROM medical_analytics
+        WHERE patient_id IN ({placeholders}) AND metric_date >= ${start_param} AND metric_date < ${start_param + 1}
+          AND trend IS NOT NULL
+        ORDER BY patient_id, metric_name, metric_date DESC, id DESC
+        """
+        # Same half-open day bounds as get_patient_metrics, so end_date is included whatever its time
+        first_day = pd.Timestamp(start_date).normalize()
+        stop_day = pd.Timestamp(end_date).normalize() + DAY
+        df = query_frame(self.db, query, (*summaries, first_day.to_pydatetime(), stop_day.to_pydatetime()))
+        for patient_id, metric_name, trend in df.itertuples(index=False):
+            summaries[int(patient_id)][metric_name] = trend
+        return summaries
@@ -0,0 +1,46 @@
+"""
+Plotting Module for MediSys Hospital Management System
+
+This module renders metric time series from the analytics queries to image
+files. Charts are drawn on their own Figure with the Agg canvas rather than
+through pyplot, so nothing is shared between calls and reports can be
+rendered from worker threads while the GUI is running.
+
+Author: Mazharuddin Mohammed
+"""
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+def plot_metrics(df, title, output_path, figsize=(10, 6)):
+    """
+    Draw one line per metric and save the chart.
+
+    Args:
+        df (pandas.DataFrame): Rows with metric_name, metric_date and metric_value columns,
+            ordered by metric_date.
+        title (str): Chart title.
+        output_path (str): File to write; the format follows the extension.
+        figsize (tuple): Figure size in inches.
+
+    Returns:
+        bool: False if there was nothing to plot, True otherwise.
+    """
+    if df.empty:
+        return False
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    # One pass splits the rows by metric, keeping the order metrics first appear in
+    for metric, metric_data in df.groupby('metric_name', sort=False, observed=True):
+        ax.plot(metric_data['metric_date'], metric_data['metric_value'], label=metric)
+
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Value")
+    ax.legend()
+    ax.grid(True)
+    fig.savefig(output_path)
+    return True
@@ -4,6 +4,8 @@ Audit Report Generator Module for MediSys Hospital Management System
 This module provides functionality for generating detailed audit reports in PDF format.
 It retrieves audit log data from the database and creates professional reports with
 filtering options, proper formatting, and visual elements like logos and banners.
+Reports are streamed page by page, so their size is not limited by memory, and
+large exports can be rendered in date shards across worker processes.
 
 Author: Mazharuddin Mohammed
 """
@@ -12,15 +14,49 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from datetime import datetime
-import pandas as pd
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import chain, islice
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from pypdf import PdfWriter
 import medisys_bindings
+from .pdf_assets import define_form
+
+logger = logging.getLogger(__name__)
+
+# Table columns and their widths; together they span the 7.5 inch text width
+COLUMNS = [("Username", 0.75*inch), ("Action", 1.1*inch), ("Entity Type", 0.8*inch), ("Entity ID", 0.55*inch),
+           ("Details", 1.5*inch), ("IP Address", 0.85*inch), ("Session ID", 0.85*inch), ("Timestamp", 1.1*inch)]
+COLUMN_EDGES = [0.5*inch]
+for _, column_width in COLUMNS:
+    COLUMN_EDGES.append(COLUMN_EDGES[-1] + column_width)
+COLUMN_CENTERS = [(left + right) / 2 for left, right in zip(COLUMN_EDGES, COLUMN_EDGES[1:])]
+HEADER_FONT_SIZE = 8
+ROW_FONT_SIZE = 7
+# Characters that fit in a cell at the row font size, leaving some padding
+COLUMN_CHARS = [int((column_width - 4) / (ROW_FONT_SIZE * 0.5)) for _, column_width in COLUMNS]
+
+# Page layout: every page has the same number of rows, except the first which also carries the title
+HEADER_HEIGHT = 16
+ROW_HEIGHT = 12
+TITLE_BASELINE = letter[1] - 2.4*inch
+FIRST_TABLE_TOP = TITLE_BASELINE - 1.2*inch
+TABLE_TOP = letter[1] - 2.1*inch
+TABLE_BOTTOM = 0.7*inch
+FIRST_PAGE_ROWS = int((FIRST_TABLE_TOP - TABLE_BOTTOM - HEADER_HEIGHT) // ROW_HEIGHT)
+ROWS_PER_PAGE = int((TABLE_TOP - TABLE_BOTTOM - HEADER_HEIGHT) // ROW_HEIGHT)
+HEADER_FORM = "MediSysHeader"
+SHARD_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
 
 class AuditReportGenerator:
     def __init__(self, db, logo_path="src/frontend/python/resources/images/logo.jpg",
-                 banner_path="src/frontend/python/resources/images/banner.jpg"):
+                 banner_path="src/frontend/python/resources/images/banner.jpg", audit_writer=None,
+                 audit_service=None):
         """
         Initialize the audit report generator.
 
@@ -28,169 +64,343 @@ class AuditReportGenerator:
             db: medisys_bindings.DBManager instance for database access.
             logo_path (str): Path to MediSys logo image.
             banner_path (str): Path to MediSys banner image.
+            audit_writer (medisys_bindings.AuditWriter, optional): Shared writer for audit
+                events; one is created for this generator when it first logs if not given,
+                and close() flushes and closes it.
+            audit_service (medisys_bindings.AuditService, optional): Service the report rows
+                are streamed from; one is created for this generator if not given.
         """
         self.db = db
+        self.audit_writer = audit_writer
+        self._owns_audit_writer = False
+        self.audit_service = audit_service or medisys_bindings.AuditService(db)
         self.logo_path = logo_path
         self.banner_path = banner_path
-        self.styles = getSampleStyleSheet()
+        self.last_render_stats = None
+
+    def close(self):
+        """Flush and close the audit writer this generator created; a shared writer is left open"""
+        if self._owns_audit_writer:
+            self.audit_writer.close()
+            self.audit_writer = None
+            self._owns_audit_writer = False
 
-    def fetch_audit_data(self, start_date, end_date, user_id=None, entity_type=None):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def generate_report(self, output_path, start_date, end_date, user_id=None,
+                       entity_type=None, admin_user_id=0, ip_address="unknown", session_id="unknown",
+                       batch_size=5000):
         """
-        Fetch audit log data from the database with optional filters.
+        Generate a PDF audit report with logo and banner.
+
+        Audit rows are streamed from a server-side cursor and drawn straight onto the
+        canvas in fixed-size chunks, one chunk per page, so only one batch of rows is
+        held in memory whatever the size of the report.
 
         Args:
+            output_path (str): Path to save the PDF.
             start_date (str): Start date in YYYY-MM-DD format.
             end_date (str): End date in YYYY-MM-DD format.
             user_id (int, optional): Filter by user ID.
-            entity_type (str, optional): Filter by entity type (e.g., 'patient', 'transaction').
+            entity_type (str, optional): Filter by entity type.
+            admin_user_id (int): ID of the admin generating the report (for audit logging); 0 is
+                logged as no user.
+            ip_address (str): IP address of the admin (for audit logging).
+            session_id (str): Session ID of the admin (for audit logging).
+            batch_size (int): Rows fetched from the cursor at a time.
 
         Returns:
-            pandas.DataFrame: Audit log data.
-        """
-        query = """
-        SELECT u.username, al.action, al.entity_type, al.entity_id,
-               al.details, al.ip_address, al.session_id, al.created_at
-        FROM audit_log al
-        LEFT JOIN users u ON al.user_id = u.id
-        WHERE al.created_at BETWEEN %s AND %s
+            int: Number of pages written. Per-page render times of the report are left
+            in last_render_stats.
         """
-        params = [start_date, end_date]
+        self._log_report(start_date, end_date, user_id, entity_type, admin_user_id, ip_address, session_id)
 
-        if user_id:
-            query += " AND al.user_id = %s"
-            params.append(user_id)
-        if entity_type:
-            query += " AND al.entity_type = %s"
-            params.append(entity_type)
+        cursor = self.audit_service.iter_audit_log(start_date, end_date, user_id, entity_type, batch_size,
+                                                   admin_user_id, ip_address, session_id)
+        with cursor:
+            entries = (entry for batch in cursor for entry in batch)
+            first = next(entries, None)
+            if first is None:
+                raise ValueError("No audit data found for the specified criteria")
+            self.last_render_stats = self._render(output_path, chain([first], entries), datetime.now(),
+                                                  title=(start_date, end_date, user_id, entity_type))
 
-        query += " ORDER BY al.created_at DESC"
+        self._log_render_stats(self.last_render_stats)
+        return self.last_render_stats["pages"]
 
-        conn = self.db.get_connection()
-        df = pd.read_sql_query(query, conn, params=params)
-        return df
-
-    def generate_report(self, output_path, start_date, end_date, user_id=None,
-                       entity_type=None, admin_user_id=0, ip_address="unknown", session_id="unknown"):
+    def generate_report_parallel(self, output_path, conn_str, start_date, end_date, user_id=None,
+                                 entity_type=None, admin_user_id=0, ip_address="unknown", session_id="unknown",
+                                 workers=None, shards=None, batch_size=5000):
         """
-        Generate a PDF audit report with logo and banner.
+        Generate the same report as generate_report, rendering date shards in parallel.
+
+        The date range is split into equal time shards. Each shard is counted first so
+        its page numbers are known up front, then rendered in a worker process with its
+        own database connection, and the parts are merged into one document. A shard
+        ends on a short page when its rows do not fill the last one.
 
         Args:
             output_path (str): Path to save the PDF.
+            conn_str (str): Connection string the worker processes connect with.
             start_date (str): Start date in YYYY-MM-DD format.
             end_date (str): End date in YYYY-MM-DD format.
             user_id (int, optional): Filter by user ID.
             entity_type (str, optional): Filter by entity type.
-            admin_user_id (int): ID of the admin generating the report (for audit logging).
+            admin_user_id (int): ID of the admin generating the report (for audit logging); 0 is
+                logged as no user.
             ip_address (str): IP address of the admin (for audit logging).
             session_id (str): Session ID of the admin (for audit logging).
+            workers (int, optional): Worker processes; defaults to the number of CPUs.
+            shards (int, optional): Date shards; defaults to the number of workers.
+            batch_size (int): Rows fetched from each shard's cursor at a time.
+
+        Returns:
+            int: Number of pages written.
         """
-        # Log report generation action
-        self.db.set_audit_context(admin_user_id, ip_address, session_id)
-        conn = self.db.get_connection()
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT log_audit_action(%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                admin_user_id,
-                "generate_audit_report",
-                "audit_report",
-                0,
-                {"start_date": start_date, "end_date": end_date,
-                 "user_id": user_id, "entity_type": entity_type},
-                ip_address,
-                session_id
-            ))
-            conn.commit()
-
-        # Fetch audit data
-        df = self.fetch_audit_data(start_date, end_date, user_id, entity_type)
-        if df.empty:
+        workers = workers or os.cpu_count() or 1
+        shards = shards or workers
+        generated = datetime.now()
+        self._log_report(start_date, end_date, user_id, entity_type, admin_user_id, ip_address, session_id)
+
+        # Rows logged after this point are left out, so the counts match what the workers render
+        bounds = shard_bounds(start_date, end_date, shards, until=generated)
+        counts = [self.audit_service.count_audit_log(shard_start, shard_end, user_id, entity_type,
+                                                     admin_user_id, ip_address, session_id)
+                  for shard_start, shard_end in bounds]
+        if not sum(counts):
             raise ValueError("No audit data found for the specified criteria")
 
-        # Setup PDF document
-        doc = SimpleDocTemplate(output_path, pagesize=letter,
-                               leftMargin=0.5*inch, rightMargin=0.5*inch,
-                               topMargin=1.5*inch, bottomMargin=0.5*inch)
-        elements = []
-
-        # Header with logo and banner
-        c = canvas.Canvas("temp.pdf")  # Temporary canvas for header
-        c.drawImage(self.banner_path, 0.5*inch, letter[1] - 1.5*inch,
-                    width=7.5*inch, height=1*inch)
-        c.drawImage(self.logo_path, 0.5*inch, letter[1] - 2*inch,
-                    width=0.5*inch, height=0.5*inch)
-        c.showPage()
+        title = (start_date, end_date, user_id, entity_type)
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        with tempfile.TemporaryDirectory(dir=output_dir) as parts_dir:
+            jobs = []
+            first_page = 1
+            for index, ((shard_start, shard_end), count) in enumerate(zip(bounds, counts)):
+                # The first shard always renders, since it carries the title
+                if index and not count:
+                    continue
+                part_path = os.path.join(parts_dir, f"part_{index:04d}.pdf")
+                jobs.append((conn_str, self.logo_path, self.banner_path, part_path, shard_start, shard_end,
+                             user_id, entity_type, first_page, title if index == 0 else None, generated,
+                             count, batch_size, admin_user_id, ip_address, session_id))
+                first_page += report_pages(count, index == 0)
+
+            # Spawned, not forked, so workers never share this process's database connections
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                part_stats = list(pool.map(_render_shard, *zip(*jobs)))
+
+            merge_start = time.perf_counter()
+            writer = PdfWriter()
+            for job in jobs:
+                writer.append(job[3])
+            with open(output_path, "wb") as f:
+                writer.write(f)
+
+        pages = sum(stats["pages"] for stats in part_stats)
+        self.last_render_stats = {
+            "pages": pages,
+            "mean_page_ms": sum(stats["mean_page_ms"] * stats["pages"] for stats in part_stats) / pages,
+            "max_page_ms": max(stats["max_page_ms"] for stats in part_stats),
+            "save_ms": (time.perf_counter() - merge_start) * 1000,
+        }
+        self._log_render_stats(self.last_render_stats)
+        return pages
+
+    def _log_report(self, start_date, end_date, user_id, entity_type, admin_user_id, ip_address, session_id):
+        # Log report generation action; the writer batches it in the background
+        if self.audit_writer is None:
+            self.audit_writer = medisys_bindings.AuditWriter(self.db)
+            self._owns_audit_writer = True
+        # 0 means no acting user; audit_log.user_id references users(id), so it is logged as NULL
+        self.audit_writer.log(admin_user_id or None, "generate_audit_report", "audit_report", 0,
+                              {"start_date": start_date, "end_date": end_date,
+                               "user_id": user_id, "entity_type": entity_type},
+                              ip_address, session_id)
+
+    def _render(self, output_path, entries, generated, first_page=1, title=None):
+        """
+        Draw audit entries onto a new PDF, one fixed-size chunk per page.
+
+        Args:
+            output_path (str): Path to save the PDF.
+            entries: Iterator over medisys_bindings.AuditEntry rows, in report order.
+            generated (datetime): Time the report was started.
+            first_page (int): Number printed on the first page.
+            title (tuple, optional): (start_date, end_date, user_id, entity_type) to print
+                above the table on the first page.
+
+        Returns:
+            dict: Page count, mean and max page render time and save time.
+        """
+        # Page streams are compressed when the file is written
+        c = canvas.Canvas(output_path, pagesize=letter, pageCompression=1)
+        define_form(c, HEADER_FORM, [
+            (self.banner_path, 0.5*inch, letter[1] - 1.5*inch, 7.5*inch, 1*inch),
+            (self.logo_path, 0.5*inch, letter[1] - 2*inch, 0.5*inch, 0.5*inch),
+        ])
+        page_times = []
+        chunk = list(islice(entries, FIRST_PAGE_ROWS if title else ROWS_PER_PAGE))
+        while True:
+            page_start = time.perf_counter()
+            self._draw_page_frame(c, first_page + len(page_times), generated)
+            if title and not page_times:
+                self._draw_title(c, *title, generated)
+                self._draw_table(c, FIRST_TABLE_TOP, chunk)
+            else:
+                self._draw_table(c, TABLE_TOP, chunk)
+            c.showPage()
+            page_times.append(time.perf_counter() - page_start)
+            chunk = list(islice(entries, ROWS_PER_PAGE))
+            if not chunk:
+                break
+        save_start = time.perf_counter()
         c.save()
+        return {
+            "pages": len(page_times),
+            "mean_page_ms": sum(page_times) / len(page_times) * 1000,
+            "max_page_ms": max(page_times) * 1000,
+            "save_ms": (time.perf_counter() - save_start) * 1000,
+        }
 
-        # Title
-        title = Paragraph("MediSys Audit Report", self.styles['Title'])
-        elements.append(title)
-        elements.append(Spacer(1, 0.2*inch))
+    @staticmethod
+    def _log_render_stats(stats):
+        """Log how long the pages of the last report took to render"""
+        logger.info("Audit report: %d pages, %.2fms/page mean, %.2fms max, save=%.1fms",
+                    stats["pages"], stats["mean_page_ms"], stats["max_page_ms"], stats["save_ms"])
 
-        # Report details
-        details = Paragraph(
-            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>"
-            f"Period: {start_date} to {end_date}<br/>"
-            f"Filters: User ID = {user_id or 'All'}, Entity Type = {entity_type or 'All'}",
-            self.styles['Normal']
-        )
-        elements.append(details)
-        elements.append(Spacer(1, 0.2*inch))
-
-        # Table data
-        data = [["Username", "Action", "Entity Type", "Entity ID", "Details",
-                 "IP Address", "Session ID", "Timestamp"]]
-        for _, row in df.iterrows():
-            details_str = str(row['details'])[:50] + "..." if len(str(row['details'])) > 50 else str(row['details'])
-            data.append([
-                row['username'] or "Unknown",
-                row['action'],
-                row['entity_type'],
-                str(row['entity_id']),
-                details_str,
-                row['ip_address'] or "N/A",
-                row['session_id'] or "N/A",
-                row['created_at'].strftime("%Y-%m-%d %H:%M:%S")
-            ])
-
-        # Create table
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ]))
-        elements.append(table)
-
-        # Build PDF
-        doc.build(elements, onFirstPage=self._add_header_footer,
-                  onLaterPages=self._add_header_footer)
-
-    def _add_header_footer(self, canvas, doc):
+    def _draw_page_frame(self, c, page_number, generated):
         """
-        Add header (logo and banner) and footer (page number) to each page.
+        Draw the header (logo and banner) and footer (page number) of a page.
 
         Args:
-            canvas: ReportLab canvas object.
-            doc: ReportLab document object.
+            c: ReportLab canvas object.
+            page_number (int): Number printed in the footer.
+            generated (datetime): Time the report was started.
         """
-        # Header
-        canvas.drawImage(self.banner_path, 0.5*inch, letter[1] - 1.5*inch,
-                         width=7.5*inch, height=1*inch)
-        canvas.drawImage(self.logo_path, 0.5*inch, letter[1] - 2*inch,
-                         width=0.5*inch, height=0.5*inch)
+        # Header: banner and logo, embedded once per document
+        c.doForm(HEADER_FORM)
 
         # Footer
-        canvas.saveState()
-        canvas.setFont('Helvetica', 10)
-        page_number = f"Page {doc.page}"
-        canvas.drawString(0.5*inch, 0.3*inch, page_number)
-        canvas.drawRightString(letter[0] - 0.5*inch, 0.3*inch,
-                              f"Generated by MediSys on {datetime.now().strftime('%Y-%m-%d')}")
-        canvas.restoreState()
\ No newline at end of file
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica', 10)
+        c.drawString(0.5*inch, 0.3*inch, f"Page {page_number}")
+        c.drawRightString(letter[0] - 0.5*inch, 0.3*inch,
+                          f"Generated by MediSys on {generated.strftime('%Y-%m-%d')}")
+
+    def _draw_title(self, c, start_date, end_date, user_id, entity_type, generated):
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica-Bold', 18)
+        c.drawCentredString(letter[0] / 2, TITLE_BASELINE, "MediSys Audit Report")
+        c.setFont('Helvetica', 10)
+        lines = [
+            f"Generated: {generated.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Period: {start_date} to {end_date}",
+            f"Filters: User ID = {user_id or 'All'}, Entity Type = {entity_type or 'All'}",
+        ]
+        for i, line in enumerate(lines):
+            c.drawString(0.5*inch, TITLE_BASELINE - 0.35*inch - i * 12, line)
+
+    def _draw_table(self, c, top, entries):
+        """
+        Draw one page's chunk of audit entries as a gridded table below top.
+
+        Args:
+            c: ReportLab canvas object.
+            top (float): Y coordinate of the table's top edge.
+            entries (list): medisys_bindings.AuditEntry rows for this page.
+        """
+        left, width = COLUMN_EDGES[0], COLUMN_EDGES[-1] - COLUMN_EDGES[0]
+        bottom = top - HEADER_HEIGHT - ROW_HEIGHT * len(entries)
+
+        c.setFillColor(colors.grey)
+        c.rect(left, top - HEADER_HEIGHT, width, HEADER_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.beige)
+        c.rect(left, bottom, width, top - HEADER_HEIGHT - bottom, stroke=0, fill=1)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(0.5)
+        c.grid(COLUMN_EDGES, [top] + [top - HEADER_HEIGHT - i * ROW_HEIGHT for i in range(len(entries) + 1)])
+
+        c.setFillColor(colors.whitesmoke)
+        c.setFont('Helvetica-Bold', HEADER_FONT_SIZE)
+        for (name, _), center in zip(COLUMNS, COLUMN_CENTERS):
+            c.drawCentredString(center, top - HEADER_HEIGHT + 5, name)
+
+        # All cells go into one text object instead of one per drawString call
+        text = c.beginText()
+        text.setFont('Helvetica', ROW_FONT_SIZE)
+        text.setFillColor(colors.black)
+        y = top - HEADER_HEIGHT - ROW_HEIGHT + 3.5
+        for entry in entries:
+            for cell, center, max_chars in zip(self._row_cells(entry), COLUMN_CENTERS, COLUMN_CHARS):
+                if len(cell) > max_chars:
+                    cell = cell[:max_chars - 3] + "..."
+                text.setTextOrigin(center - stringWidth(cell, 'Helvetica', ROW_FONT_SIZE) / 2, y)
+                text.textOut(cell)
+            y -= ROW_HEIGHT
+        c.drawText(text)
+
+    @staticmethod
+    def _row_cells(entry):
+        details = entry.details[:50] + "..." if len(entry.details) > 50 else entry.details
+        return [
+            entry.username or "Unknown",
+            entry.action,
+            entry.entity_type,
+            str(entry.entity_id),
+            details,
+            entry.ip_address or "N/A",
+            entry.session_id or "N/A",
+            entry.created_at,
+        ]
+
+
+def report_pages(rows, has_title):
+    """Number of pages _render produces for a number of rows"""
+    if has_title:
+        return 1 + -(-max(0, rows - FIRST_PAGE_ROWS) // ROWS_PER_PAGE)
+    return max(1, -(-rows // ROWS_PER_PAGE))
+
+
+def shard_bounds(start_date, end_date, shards, until=None):
+    """
+    Split a report's date range into equal, non-overlapping time shards, newest first.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format.
+        end_date (str): End date in YYYY-MM-DD format; as in the single-process report,
+            it is read as midnight at the start of that day.
+        shards (int): Number of shards.
+        until (datetime, optional): Upper limit for the range, e.g. when the report started.
+
+    Returns:
+        list: (start, end) timestamp strings; each end is a microsecond before the
+        next shard's start, so the BETWEEN filters do not overlap.
+    """
+    start = datetime.fromisoformat(str(start_date))
+    end = datetime.fromisoformat(str(end_date))
+    if until is not None:
+        end = max(start, min(end, until))
+    step = (end - start) / shards
+    edges = [start + step * i for i in range(shards)] + [end]
+    bounds = []
+    for i in range(shards):
+        shard_end = edges[i + 1] if i == shards - 1 else edges[i + 1] - timedelta(microseconds=1)
+        bounds.append((edges[i].strftime(SHARD_TIME_FORMAT), shard_end.strftime(SHARD_TIME_FORMAT)))
+    return bounds[::-1]
+
+
+def _render_shard(conn_str, logo_path, banner_path, part_path, shard_start, shard_end, user_id, entity_type,
+                  first_page, title, generated, max_rows, batch_size, admin_user_id, ip_address, session_id):
+    """Worker for generate_report_parallel: render one shard to its own PDF"""
+    db = medisys_bindings.DBManager(conn_str)
+    generator = AuditReportGenerator(db, logo_path, banner_path)
+    cursor = generator.audit_service.iter_audit_log(shard_start, shard_end, user_id, entity_type, batch_size,
+                                                    admin_user_id, ip_address, session_id)
+    with cursor:
+        entries = islice((entry for batch in cursor for entry in batch), max_rows)
+        return generator._render(part_path, entries, generated, first_page, title)
@@ -5,28 +5,195 @@ This module provides functionality for generating patient invoices in PDF format
 It creates professional-looking invoices with transaction details, patient information,
 and proper formatting including the MediSys banner.
 
+generate_invoices runs a whole billing period: it streams the unbilled payments
+from BillingService, renders them in worker processes that each decode the
+banner once, and records every transaction it wrote an invoice for, so the
+next run picks up where this one stopped. Progress goes to an optional
+callback and the start and end of a run to the module logger.
+
 Author: Mazharuddin Mohammed
 """
 
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from decimal import Decimal
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from pypdf import PdfWriter
+import medisys_bindings
+from .pdf_assets import define_form, image_reader
+
+logger = logging.getLogger(__name__)
+
+BANNER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "resources", "images", "banner.jpg"))
+BANNER_FORM = "invoice_banner"
 
-def generate_invoice(patient_name, transaction_id, amount, description, output_path):
+def generate_invoice(patient_name, transaction_id, amount, description, output_path, banner_path=BANNER_PATH):
     c = canvas.Canvas(output_path, pagesize=letter)
-    width, height = letter
+    _define_banner(c, banner_path)
+    _draw_invoice(c, (transaction_id, patient_name, amount, description), datetime.now())
+    c.save()
+
+def generate_invoices(db, output_path, start_date, end_date, combined=False, workers=None, chunk_size=500,
+                      batch_size=5000, billing_run=None, banner_path=BANNER_PATH, user_id=0,
+                      ip_address="unknown", session_id="unknown", progress=None):
+    """
+    Generate invoices for every unbilled payment in a billing period.
+
+    The parent process reads the payments through a server-side cursor and hands
+    them to the workers in chunks, keeping only a few chunks in flight, so writing
+    a directory keeps memory flat however large the period is. Transactions are
+    recorded as invoiced once their PDFs are on disk: per chunk when writing a
+    directory, and after the merge when writing a single document.
+
+    A single document is limited by memory: the workers render it in parts, but
+    pypdf holds every page of the merged document until it is written, so the
+    parent grows with the number of invoices. Large periods should be written
+    as a directory.
+
+    Args:
+        db: Database manager instance.
+        output_path (str): Directory for one PDF per invoice, or the PDF file when combined.
+        start_date (str): First day of the period, YYYY-MM-DD.
+        end_date (str): Day after the period, YYYY-MM-DD.
+        combined (bool): Write all invoices, one per page, into a single PDF.
+        workers (int, optional): Worker processes; defaults to the number of CPUs.
+        chunk_size (int): Invoices rendered per worker task.
+        batch_size (int): Transactions fetched from the cursor at a time.
+        billing_run (str, optional): Name recorded with the invoices; defaults to the period and start time.
+        banner_path (str): Path to the banner image.
+        user_id (int): ID of the user running the billing (for audit logging); 0 is logged as no user.
+        ip_address (str): IP address of the user (for audit logging).
+        session_id (str): Session ID of the user (for audit logging).
+        progress (callable, optional): Called with (rendered, total) after each chunk.
+
+    Returns:
+        dict: invoices written, seconds taken and invoices per second.
+    """
+    workers = workers or os.cpu_count() or 1
+    issued = datetime.now()
+    billing_run = billing_run or f"{start_date}/{end_date} {issued:%Y-%m-%d %H:%M:%S}"
+    service = medisys_bindings.BillingService(db)
+    total = service.count_unbilled(start_date, end_date, user_id, ip_address, session_id)
+    logger.info("Billing run %s: %d unbilled transactions", billing_run, total)
+
+    start = time.perf_counter()
+    rendered = [0]
+
+    def report(count):
+        rendered[0] += count
+        if progress is not None:
+            progress(rendered[0], total)
+
+    def mark(transaction_ids):
+        service.mark_invoiced(transaction_ids, billing_run, user_id, ip_address, session_id)
+
+    if not combined:
+        os.makedirs(output_path, exist_ok=True)
+    parts = []
+    parts_dir = (tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path)))
+                 if combined else nullcontext(output_path))
+    with parts_dir as target_dir:
+        # Spawned, not forked, so workers never share this process's database connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=image_reader, initargs=(banner_path,)) as pool:
+            pending = deque()
+            cursor = service.iter_unbilled(start_date, end_date, batch_size, user_id, ip_address, session_id)
+            with cursor:
+                for index, chunk in enumerate(_chunks(cursor, chunk_size)):
+                    target = os.path.join(target_dir, f"part_{index:06d}.pdf") if combined else target_dir
+                    pending.append(pool.submit(_render_invoices, chunk, target, combined, banner_path, issued))
+                    # Two chunks per worker keeps them busy while the rest wait in the cursor
+                    while len(pending) >= 2 * workers:
+                        _finish(pending.popleft(), combined, parts, report, mark)
+            while pending:
+                _finish(pending.popleft(), combined, parts, report, mark)
+
+        if parts:
+            writer = PdfWriter()
+            for part_path, _ in parts:
+                writer.append(part_path)
+            with open(output_path, "wb") as f:
+                writer.write(f)
+            for _, transaction_ids in parts:
+                mark(transaction_ids)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "invoices": rendered[0],
+        "seconds": seconds,
+        "invoices_per_sec": rendered[0] / seconds if seconds else 0.0,
+    }
+    logger.info("Billing run %s: %d invoices in %.1f s (%.0f/s)", billing_run, stats["invoices"], seconds,
+                stats["invoices_per_sec"])
+    return stats
+
+def invoice_filename(transaction_id):
+    return f"invoice_{transaction_id}.pdf"
+
+def _finish(future, combined, parts, report, mark):
+    """Wait for a worker task; directory chunks are marked right away, parts after the merge"""
+    part_path, transaction_ids = future.result()
+    report(len(transaction_ids))
+    if combined:
+        parts.append((part_path, transaction_ids))
+    else:
+        mark(transaction_ids)
+
+def _chunks(cursor, chunk_size):
+    """Regroup cursor batches into picklable chunks of invoice fields"""
+    chunk = []
+    for batch in cursor:
+        for transaction in batch:
+            chunk.append((transaction.transaction_id, transaction.patient_name, Decimal(transaction.amount),
+                          transaction.description))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def _render_invoices(invoices, target, combined, banner_path, issued):
+    """Worker for generate_invoices: render a chunk as one PDF or as one file per invoice"""
+    if combined:
+        c = canvas.Canvas(target, pagesize=letter, pageCompression=1)
+        _define_banner(c, banner_path)
+        for invoice in invoices:
+            _draw_invoice(c, invoice, issued)
+        c.save()
+    else:
+        for invoice in invoices:
+            c = canvas.Canvas(os.path.join(target, invoice_filename(invoice[0])), pagesize=letter, pageCompression=1)
+            _define_banner(c, banner_path)
+            _draw_invoice(c, invoice, issued)
+            c.save()
+    return target, [invoice[0] for invoice in invoices]
+
+def _define_banner(c, banner_path):
+    _, height = letter
+    define_form(c, BANNER_FORM, [(banner_path, 0.5 * inch, height - 1.5 * inch, 7 * inch, 1 * inch)])
+
+def _draw_invoice(c, invoice, issued):
+    transaction_id, patient_name, amount, description = invoice
+    _, height = letter
 
     # Add banner
-    c.drawImage("src/frontend/python/resources/images/banner.jpg", 0.5 * inch, height - 1.5 * inch, width=7 * inch, height=1 * inch)
+    c.doForm(BANNER_FORM)
 
     # Invoice details
     c.setFont("Helvetica", 12)
     c.drawString(0.5 * inch, height - 2.5 * inch, f"Invoice #{transaction_id}")
-    c.drawString(0.5 * inch, height - 2.75 * inch, f"Date: {datetime.now().strftime('%Y-%m-%d')}")
+    c.drawString(0.5 * inch, height - 2.75 * inch, f"Date: {issued.strftime('%Y-%m-%d')}")
     c.drawString(0.5 * inch, height - 3 * inch, f"Patient: {patient_name}")
     c.drawString(0.5 * inch, height - 3.25 * inch, f"Amount: ${amount:.2f}")
     c.drawString(0.5 * inch, height - 3.5 * inch, f"Description: {description}")
 
     c.showPage()
-    c.save()
\ No newline at end of file
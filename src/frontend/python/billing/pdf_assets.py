@@ -0,0 +1,86 @@
+"""
+PDF Assets Module for MediSys Hospital Management System
+
+This module keeps the images that appear on every generated PDF (logo and
+banner) decoded in memory for the life of the process. Each document embeds
+them once as a form XObject, and every page then draws that form, so neither
+the image files nor their pixel data are processed again per page or per
+report.
+
+Author: Mazharuddin Mohammed
+"""
+
+import os
+import threading
+from io import BytesIO
+
+from reportlab import rl_config
+from reportlab.lib.utils import ImageReader
+
+_images = {}
+_images_lock = threading.Lock()
+# rl_config.useA85 is process-wide; interleaved save/restore pairs could leave it switched off
+_a85_lock = threading.Lock()
+
+
+class CachedImage(ImageReader):
+    """ImageReader that keeps the file's bytes so JPEGs are embedded as-is, not re-encoded"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        with open(path, "rb") as f:
+            self._raw = f.read()
+
+    def jpeg_fh(self):
+        return BytesIO(self._raw) if self._raw[:2] == b"\xff\xd8" else None
+
+
+def image_reader(path):
+    """
+    Return the process-wide ImageReader for an image file, decoding it on first use.
+
+    Args:
+        path (str): Path to the image.
+
+    Returns:
+        CachedImage: Reader with its pixel data already decoded.
+    """
+    key = os.path.abspath(path)
+    with _images_lock:
+        reader = _images.get(key)
+        if reader is None:
+            reader = CachedImage(key)
+            # Decode now; later drawImage calls reuse the pixel data
+            reader.getRGBData()
+            _images[key] = reader
+        return reader
+
+
+def define_form(c, name, images):
+    """
+    Draw images into a named form XObject of the current document.
+
+    Args:
+        c: ReportLab canvas object.
+        name (str): Form name, later drawn with c.doForm(name).
+        images (list): (path, x, y, width, height) tuples in page coordinates.
+    """
+    c.beginForm(name)
+    # Embed the image streams as binary. With ASCII85 on, every document would
+    # re-encode the same JPEG bytes, which dominates small one-page documents.
+    # Another thread's canvas may write binary streams meanwhile, which is still valid PDF.
+    with _a85_lock:
+        use_a85 = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            for path, x, y, width, height in images:
+                c.drawImage(image_reader(path), x, y, width=width, height=height)
+        finally:
+            rl_config.useA85 = use_a85
+    c.endForm()
+
+
+def clear_cache():
+    """Forget every cached image, e.g. after the files were replaced on disk"""
+    with _images_lock:
+        _images.clear()
@@ -4,17 +4,21 @@ Login Window Module for MediSys Hospital Management System
 This module implements the login window that authenticates users and provides
 access to the appropriate modules based on user role. It handles authentication
 through the C++ backend and sets up the audit context for tracking user actions.
+Authentication runs on a worker thread so the window stays responsive while the
+backend talks to the database.
 
 Author: Mazharuddin Mohammed
 """
 
+import logging
 import sys
+import time
 import uuid
 import os
 
 from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QLineEdit, QPushButton, QLabel, QHBoxLayout
 from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
 
 # Try to import medisys_bindings from different locations
 try:
@@ -35,6 +39,54 @@ except ImportError:
             print("Python path:", sys.path)
             sys.exit(1)
 
+logger = logging.getLogger(__name__)
+
+class LoginSignals(QObject):
+    """Signals emitted by a LoginTask back to the GUI thread"""
+    succeeded = Signal(int, object)  # user_id, phase timings in ms
+    failed = Signal(str, object)     # error message, phase timings in ms
+
+
+class LoginTask(QRunnable):
+    """Authenticates a user and sets the audit context on a worker thread"""
+
+    def __init__(self, window, username, password):
+        super().__init__()
+        self.window = window
+        self.username = username
+        self.password = password
+        self.submitted_at = time.perf_counter()
+        self.signals = LoginSignals()
+
+    def run(self):
+        timings = {"queued": (time.perf_counter() - self.submitted_at) * 1000}
+        try:
+            start = time.perf_counter()
+            auth_service = self.window.get_auth_service()
+            timings["auth_service"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            user_id = auth_service.authenticate(self.username, self.password)
+            timings["authenticate"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            ip_address = "192.168.1.1"  # TODO: Get from network context
+            session_id = "session_" + str(uuid.uuid4())
+            try:
+                # Make sure user_id is valid before setting audit context
+                if user_id and user_id > 0:
+                    self.window.db.set_audit_context(user_id, ip_address, session_id)
+                else:
+                    logger.warning("Invalid user_id for audit context")
+            except Exception as audit_error:
+                logger.warning("Could not set audit context: %s", audit_error)
+            timings["audit_context"] = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            self.signals.failed.emit(str(e), timings)
+            return
+        self.signals.succeeded.emit(user_id, timings)
+
+
 class LoginWindow(QMainWindow):
     def __init__(self, db):
         super().__init__()
@@ -78,6 +130,19 @@ class LoginWindow(QMainWindow):
         # Enable Enter key for login
         self.password_input.returnPressed.connect(self.handle_login)
 
+        # One worker thread so login attempts are handled in order; the AuthService
+        # is created on first use there and reused for every later attempt
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.auth_service = None
+        self.login_task = None
+
+    def get_auth_service(self):
+        """Return the shared AuthService, creating it on first use (called on the worker thread)"""
+        if self.auth_service is None:
+            self.auth_service = medisys_bindings.AuthService(self.db)
+        return self.auth_service
+
     def handle_login(self):
         username = self.username_input.text().strip()
         password = self.password_input.text()
@@ -87,46 +152,43 @@ class LoginWindow(QMainWindow):
         if len(username) > 50 or len(password) > 255:
             self.error_label.setText("Input too long")
             return
+        if self.login_task is not None:
+            return  # A login attempt is already in flight
+
+        self.login_button.setEnabled(False)
+        self.error_label.setText("Signing in...")
+        self.login_task = LoginTask(self, username, password)
+        self.login_task.signals.succeeded.connect(self.on_login_succeeded)
+        self.login_task.signals.failed.connect(self.on_login_failed)
+        self.thread_pool.start(self.login_task)
+
+    def on_login_failed(self, message, timings):
+        self.login_task = None
+        self.log_timings(timings)
+        print(f"Login error: {message}")
+        self.error_label.setText(f"Login failed: {message}")
+        self.password_input.clear()
+        self.login_button.setEnabled(True)
+
+    def on_login_succeeded(self, user_id, timings):
+        username = self.login_task.username
+        self.login_task = None
+        start = time.perf_counter()
         try:
-            auth_service = medisys_bindings.AuthService(self.db)
-            auth_result = auth_service.authenticate(username, password)
-
-            # In a real implementation, auth_result would be a dictionary with user info
-            # For now, we'll just get the user_id and assume a role based on the username
-            if isinstance(auth_result, dict):
-                user_id = auth_result.get("user_id")
-                # Role should come from the auth_result, but for now we'll determine it from the username
+            # Role should come from the backend, but for now we'll determine it from the username
+            if username.lower() == "admin":
+                user_role = "admin"
+            elif username.lower().startswith("doc"):
+                user_role = "doctor"
+            elif username.lower().startswith("pat"):
+                user_role = "patient"
             else:
-                # If auth_result is just the user_id (current implementation)
-                user_id = auth_result
-                # For testing, we'll determine role based on username
-                if username.lower() == "admin":
-                    auth_result = {"role": "admin", "user_id": user_id}
-                elif username.lower().startswith("doc"):
-                    auth_result = {"role": "doctor", "user_id": user_id}
-                elif username.lower().startswith("pat"):
-                    auth_result = {"role": "patient", "user_id": user_id}
-                else:
-                    auth_result = {"role": "admin", "user_id": user_id}  # Default to admin
-
-            ip_address = "192.168.1.1"  # TODO: Get from network context
-            session_id = "session_" + str(uuid.uuid4())
-
-            try:
-                # Make sure user_id is valid before setting audit context
-                if user_id and user_id > 0:
-                    self.db.set_audit_context(user_id, ip_address, session_id)
-                else:
-                    print("Warning: Invalid user_id for audit context")
-            except Exception as audit_error:
-                print(f"Warning: Could not set audit context: {audit_error}")
+                user_role = "admin"  # Default to admin
 
             self.error_label.setText("Login successful")
             self.password_input.clear()
 
             # Open appropriate window based on user role
-            user_role = auth_result.get("role", "").lower()
-
             if user_role == "admin":
                 from gui.admin_window import AdminWindow
                 self.next_window = AdminWindow(db=self.db, user_id=user_id)
@@ -136,14 +198,19 @@ class LoginWindow(QMainWindow):
             elif user_role == "patient":
                 from gui.patient_window import PatientWindow
                 self.next_window = PatientWindow()
-            else:
-                # Default to admin window if role is unknown
-                from gui.admin_window import AdminWindow
-                self.next_window = AdminWindow(db=self.db, user_id=user_id)
 
             self.next_window.show()
+            timings["open_window"] = (time.perf_counter() - start) * 1000
+            self.log_timings(timings)
             self.close()
         except Exception as e:
             print(f"Login error: {e}")
             self.error_label.setText(f"Login failed: {str(e)}")
-            self.password_input.clear()
\ No newline at end of file
+            self.login_button.setEnabled(True)
+
+    @staticmethod
+    def log_timings(timings):
+        """Log how long each login phase took"""
+        if logger.isEnabledFor(logging.DEBUG):
+            phases = ", ".join(f"{phase}={elapsed:.1f}ms" for phase, elapsed in timings.items())
+            logger.debug("Login timings: %s", phases)
@@ -0,0 +1,101 @@
+"""
+Patient Table Model Module for MediSys Hospital Management System
+
+This module implements a lazily populated table model for patient lists. Rows
+are requested page by page through a keyset fetch function as the view scrolls,
+so opening the patients table only materializes the rows that are shown.
+
+Author: Mazharuddin Mohammed
+"""
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class PatientTableModel(QAbstractTableModel):
+    COLUMNS = ["Photo", "ID", "Name", "DOB", "Gender", "Contact", "Insurance"]
+    KEYS = [None, "id", "name", "dob", "gender", "contact", "insurance"]
+
+    def __init__(self, fetch_page, page_size=200, parent=None):
+        """
+        Initialize the model.
+
+        Args:
+            fetch_page: Callable taking (after_id, limit) and returning a list of patient
+                dicts that follow the patient with ID after_id (0 for the first page).
+            page_size (int): Number of rows requested per fetch.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._rows = []
+        self._last_id = 0
+        self._exhausted = False
+
+    def reset(self, fetch_page=None):
+        """Drop all loaded rows, optionally switching to a new page source"""
+        self.beginResetModel()
+        if fetch_page is not None:
+            self._fetch_page = fetch_page
+        self._rows = []
+        self._last_id = 0
+        self._exhausted = False
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        patient = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return "Yes" if patient.get("photo") else "No"
+            return str(patient.get(self.KEYS[index.column()], ""))
+        if role == Qt.TextAlignmentRole and index.column() == 0:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        page = self._fetch_page(self._last_id, self._page_size)
+        if len(page) < self._page_size:
+            self._exhausted = True
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+        self._last_id = page[-1]["id"]
+
+    def patient_at(self, row):
+        """Return a copy of the patient dict shown in the given row"""
+        return dict(self._rows[row])
+
+    def append_patient(self, patient):
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append(patient)
+        self.endInsertRows()
+
+    def update_patient(self, row, patient):
+        self._rows[row].update(patient)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+    def remove_patient(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
@@ -12,11 +12,84 @@ from PySide6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, Q
                              QTableView, QPushButton, QFormLayout, QLineEdit, QTextEdit,
                              QMessageBox, QDialog, QDialogButtonBox, QComboBox, QDateEdit,
                              QFileDialog)
-from PySide6.QtGui import QStandardItemModel, QStandardItem, QPixmap, QImage
+from PySide6.QtGui import QPixmap, QImage
 from PySide6.QtCore import Qt, QDate, QSize, QBuffer, QIODevice, QByteArray
+from datetime import datetime
 import os
 import base64
 
+from gui.patient_table_model import PatientTableModel
+
+try:
+    import medisys_bindings
+except ImportError:
+    medisys_bindings = None
+
+# Shown when the window is opened without a database connection
+SAMPLE_PATIENTS = [
+    {
+        "id": 1,
+        "name": "John Doe",
+        "dob": "1975-05-15",
+        "gender": "Male",
+        "contact": "555-123-4567",
+        "email": "john.doe@example.com",
+        "address": "123 Main St, Anytown, USA",
+        "emergency_contact": "Jane Doe: 555-987-6543",
+        "insurance": "Blue Cross #12345678",
+        "photo": None  # No photo
+    },
+    {
+        "id": 2,
+        "name": "Jane Smith",
+        "dob": "1982-08-22",
+        "gender": "Female",
+        "contact": "555-234-5678",
+        "email": "jane.smith@example.com",
+        "address": "456 Oak Ave, Somewhere, USA",
+        "emergency_contact": "John Smith: 555-876-5432",
+        "insurance": "Aetna #23456789",
+        "photo": None  # No photo
+    },
+    {
+        "id": 3,
+        "name": "Robert Johnson",
+        "dob": "1965-11-30",
+        "gender": "Male",
+        "contact": "555-345-6789",
+        "email": "robert.johnson@example.com",
+        "address": "789 Pine St, Nowhere, USA",
+        "emergency_contact": "Mary Johnson: 555-765-4321",
+        "insurance": "Medicare #34567890",
+        "photo": None  # No photo
+    },
+    {
+        "id": 4,
+        "name": "Emily Davis",
+        "dob": "1990-02-14",
+        "gender": "Female",
+        "contact": "555-456-7890",
+        "email": "emily.davis@example.com",
+        "address": "101 Elm St, Elsewhere, USA",
+        "emergency_contact": "Michael Davis: 555-654-3210",
+        "insurance": "Cigna #45678901",
+        "photo": None  # No photo
+    },
+    {
+        "id": 5,
+        "name": "Michael Brown",
+        "dob": "1978-07-04",
+        "gender": "Male",
+        "contact": "555-567-8901",
+        "email": "michael.brown@example.com",
+        "address": "202 Maple Ave, Anywhere, USA",
+        "emergency_contact": "Sarah Brown: 555-543-2109",
+        "insurance": "UnitedHealth #56789012",
+        "photo": None  # No photo
+    }
+]
+
+
 class PatientForm(QDialog):
     def __init__(self, parent=None, patient_data=None):
         super().__init__(parent)
@@ -195,10 +268,16 @@ class PatientForm(QDialog):
         }
 
 class PatientsWindow(QMainWindow):
+    # Maximum number of ranked matches shown for a search
+    SEARCH_LIMIT = 200
+
     def __init__(self, db=None, user_id=None):
         super().__init__()
         self.db = db
         self.user_id = user_id
+        self.patient_service = None
+        if db is not None and medisys_bindings is not None:
+            self.patient_service = medisys_bindings.PatientService(db)
         self.setWindowTitle("MediSys - Patients Management")
         self.setMinimumSize(1000, 600)
 
@@ -229,10 +308,7 @@ class PatientsWindow(QMainWindow):
 
         # Patients table
         self.patients_table = QTableView()
-        self.patients_model = QStandardItemModel(0, 7)  # Added column for photo indicator
-        self.patients_model.setHorizontalHeaderLabels([
-            "Photo", "ID", "Name", "DOB", "Gender", "Contact", "Insurance"
-        ])
+        self.patients_model = PatientTableModel(self.fetch_patient_page)
         self.patients_table.setModel(self.patients_model)
         self.patients_table.setSelectionBehavior(QTableView.SelectRows)
         self.patients_table.setSelectionMode(QTableView.SingleSelection)
@@ -269,199 +345,64 @@ class PatientsWindow(QMainWindow):
         self.load_patients()
 
     def load_patients(self):
-        """Load patients from database or use sample data"""
-        # Clear existing data
-        self.patients_model.removeRows(0, self.patients_model.rowCount())
-
-        # In a real application, we would load from the database
-        # For now, we'll use sample data
-        sample_patients = [
-            {
-                "id": 1,
-                "name": "John Doe",
-                "dob": "1975-05-15",
-                "gender": "Male",
-                "contact": "555-123-4567",
-                "email": "john.doe@example.com",
-                "address": "123 Main St, Anytown, USA",
-                "emergency_contact": "Jane Doe: 555-987-6543",
-                "insurance": "Blue Cross #12345678",
-                "photo": None  # No photo
-            },
-            {
-                "id": 2,
-                "name": "Jane Smith",
-                "dob": "1982-08-22",
-                "gender": "Female",
-                "contact": "555-234-5678",
-                "email": "jane.smith@example.com",
-                "address": "456 Oak Ave, Somewhere, USA",
-                "emergency_contact": "John Smith: 555-876-5432",
-                "insurance": "Aetna #23456789",
-                "photo": None  # No photo
-            },
-            {
-                "id": 3,
-                "name": "Robert Johnson",
-                "dob": "1965-11-30",
-                "gender": "Male",
-                "contact": "555-345-6789",
-                "email": "robert.johnson@example.com",
-                "address": "789 Pine St, Nowhere, USA",
-                "emergency_contact": "Mary Johnson: 555-765-4321",
-                "insurance": "Medicare #34567890",
-                "photo": None  # No photo
-            },
-            {
-                "id": 4,
-                "name": "Emily Davis",
-                "dob": "1990-02-14",
-                "gender": "Female",
-                "contact": "555-456-7890",
-                "email": "emily.davis@example.com",
-                "address": "101 Elm St, Elsewhere, USA",
-                "emergency_contact": "Michael Davis: 555-654-3210",
-                "insurance": "Cigna #45678901",
-                "photo": None  # No photo
-            },
-            {
-                "id": 5,
-                "name": "Michael Brown",
-                "dob": "1978-07-04",
-                "gender": "Male",
-                "contact": "555-567-8901",
-                "email": "michael.brown@example.com",
-                "address": "202 Maple Ave, Anywhere, USA",
-                "emergency_contact": "Sarah Brown: 555-543-2109",
-                "insurance": "UnitedHealth #56789012",
-                "photo": None  # No photo
-            }
-        ]
-
-        # Add patients to the model
-        for patient in sample_patients:
-            # Create photo status item
-            photo_item = QStandardItem()
-            if patient.get("photo"):
-                photo_item.setText("Yes")
-            else:
-                photo_item.setText("No")
-            photo_item.setTextAlignment(Qt.AlignCenter)
-
-            row_items = [
-                photo_item,
-                QStandardItem(str(patient["id"])),
-                QStandardItem(patient["name"]),
-                QStandardItem(patient["dob"]),
-                QStandardItem(patient["gender"]),
-                QStandardItem(patient["contact"]),
-                QStandardItem(patient["insurance"])
-            ]
-            self.patients_model.appendRow(row_items)
+        """Reload the patient list; pages are fetched lazily as the table scrolls"""
+        self.patients_model.reset(self.fetch_patient_page)
+        self.patients_model.fetchMore()
 
         # Resize columns to content
         self.patients_table.resizeColumnsToContents()
 
+    def fetch_patient_page(self, after_id, limit):
+        """Return the page of patients that follows after_id, sorted by name"""
+        if self.patient_service is not None:
+            patients = self.patient_service.list_patients(after_id, limit, "name", self.user_id or 0)
+            return [self._patient_to_dict(patient) for patient in patients]
+
+        # Without a database, page through the sample data by ID
+        return [patient for patient in SAMPLE_PATIENTS if patient["id"] > after_id][:limit]
+
+    @staticmethod
+    def _patient_to_dict(patient):
+        """Convert a medisys_bindings.Patient into the dict shape used by the table and form"""
+        return {
+            "id": patient.id,
+            "name": f"{patient.first_name} {patient.last_name}",
+            "dob": datetime.fromtimestamp(patient.dob).strftime("%Y-%m-%d"),
+            "gender": patient.gender.capitalize(),
+            "contact": patient.mobile,
+            "email": patient.email,
+            "address": patient.address,
+            "emergency_contact": f"{patient.emergency_contact_name}: {patient.emergency_contact_mobile}"
+                                 if patient.emergency_contact_name else "",
+            "insurance": "",
+            "photo": None
+        }
+
     def search_patients(self):
         """Search patients based on input"""
-        search_text = self.search_input.text().lower()
+        search_text = self.search_input.text().strip()
         if not search_text:
             self.load_patients()
             return
 
-        # Clear existing data
-        self.patients_model.removeRows(0, self.patients_model.rowCount())
-
-        # In a real application, we would search the database
-        # For now, we'll filter our sample data
-        sample_patients = [
-            {
-                "id": 1,
-                "name": "John Doe",
-                "dob": "1975-05-15",
-                "gender": "Male",
-                "contact": "555-123-4567",
-                "email": "john.doe@example.com",
-                "address": "123 Main St, Anytown, USA",
-                "emergency_contact": "Jane Doe: 555-987-6543",
-                "insurance": "Blue Cross #12345678"
-            },
-            {
-                "id": 2,
-                "name": "Jane Smith",
-                "dob": "1982-08-22",
-                "gender": "Female",
-                "contact": "555-234-5678",
-                "email": "jane.smith@example.com",
-                "address": "456 Oak Ave, Somewhere, USA",
-                "emergency_contact": "John Smith: 555-876-5432",
-                "insurance": "Aetna #23456789"
-            },
-            {
-                "id": 3,
-                "name": "Robert Johnson",
-                "dob": "1965-11-30",
-                "gender": "Male",
-                "contact": "555-345-6789",
-                "email": "robert.johnson@example.com",
-                "address": "789 Pine St, Nowhere, USA",
-                "emergency_contact": "Mary Johnson: 555-765-4321",
-                "insurance": "Medicare #34567890"
-            },
-            {
-                "id": 4,
-                "name": "Emily Davis",
-                "dob": "1990-02-14",
-                "gender": "Female",
-                "contact": "555-456-7890",
-                "email": "emily.davis@example.com",
-                "address": "101 Elm St, Elsewhere, USA",
-                "emergency_contact": "Michael Davis: 555-654-3210",
-                "insurance": "Cigna #45678901"
-            },
-            {
-                "id": 5,
-                "name": "Michael Brown",
-                "dob": "1978-07-04",
-                "gender": "Male",
-                "contact": "555-567-8901",
-                "email": "michael.brown@example.com",
-                "address": "202 Maple Ave, Anywhere, USA",
-                "emergency_contact": "Sarah Brown: 555-543-2109",
-                "insurance": "UnitedHealth #56789012"
-            }
-        ]
-
-        # Filter patients
-        filtered_patients = []
-        for patient in sample_patients:
-            if (search_text in str(patient["id"]).lower() or
-                search_text in patient["name"].lower() or
-                search_text in patient["contact"].lower() or
-                search_text in patient["email"].lower() or
-                search_text in patient["insurance"].lower()):
-                filtered_patients.append(patient)
-
-        # Add filtered patients to the model
-        for patient in filtered_patients:
-            # Create photo status item
-            photo_item = QStandardItem()
-            if patient.get("photo"):
-                photo_item.setText("Yes")
-            else:
-                photo_item.setText("No")
-            photo_item.setTextAlignment(Qt.AlignCenter)
-
-            row_items = [
-                photo_item,
-                QStandardItem(str(patient["id"])),
-                QStandardItem(patient["name"]),
-                QStandardItem(patient["dob"]),
-                QStandardItem(patient["gender"]),
-                QStandardItem(patient["contact"]),
-                QStandardItem(patient["insurance"])
-            ]
-            self.patients_model.appendRow(row_items)
+        if self.patient_service is not None:
+            # Ranked, index-backed search on the server; results arrive as a single page
+            matches = [self._patient_to_dict(patient) for patient in
+                       self.patient_service.search(search_text, self.SEARCH_LIMIT, self.user_id or 0)]
+        else:
+            # Without a database, filter the sample data
+            search_text = search_text.lower()
+            matches = []
+            for patient in SAMPLE_PATIENTS:
+                if (search_text in str(patient["id"]).lower() or
+                    search_text in patient["name"].lower() or
+                    search_text in patient["contact"].lower() or
+                    search_text in patient["email"].lower() or
+                    search_text in patient["insurance"].lower()):
+                    matches.append(patient)
+
+        self.patients_model.reset(lambda after_id, limit: matches[:limit] if after_id == 0 else [])
+        self.patients_model.fetchMore()
 
         # Resize columns to content
         self.patients_table.resizeColumnsToContents()
@@ -478,27 +419,10 @@ class PatientsWindow(QMainWindow):
                 return
 
             # Generate new ID (in a real app, this would be done by the database)
-            new_id = self.patients_model.rowCount() + 1
-
-            # Create photo status item
-            photo_item = QStandardItem()
-            if patient_data.get("photo"):
-                photo_item.setText("Yes")
-            else:
-                photo_item.setText("No")
-            photo_item.setTextAlignment(Qt.AlignCenter)
+            patient_data["id"] = self.patients_model.rowCount() + 1
 
             # Add to model
-            row_items = [
-                photo_item,
-                QStandardItem(str(new_id)),
-                QStandardItem(patient_data["name"]),
-                QStandardItem(patient_data["dob"]),
-                QStandardItem(patient_data["gender"]),
-                QStandardItem(patient_data["contact"]),
-                QStandardItem(patient_data["insurance"])
-            ]
-            self.patients_model.appendRow(row_items)
+            self.patients_model.append_patient(patient_data)
 
             QMessageBox.information(self, "Success", f"Patient '{patient_data['name']}' added successfully.")
 
@@ -513,24 +437,8 @@ class PatientsWindow(QMainWindow):
         row = selected_indexes[0].row()
 
         # Get patient data from the model
-        patient_data = {
-            "id": self.patients_model.item(row, 1).text(),  # ID is now in column 1
-            "name": self.patients_model.item(row, 2).text(),
-            "dob": self.patients_model.item(row, 3).text(),
-            "gender": self.patients_model.item(row, 4).text(),
-            "contact": self.patients_model.item(row, 5).text(),
-            "insurance": self.patients_model.item(row, 6).text(),
-            "email": "",  # Not shown in the table
-            "address": "",  # Not shown in the table
-            "emergency_contact": "",  # Not shown in the table
-            "photo": None  # Will be updated if available
-        }
-
-        # Check if this patient has a photo (based on the "Yes" indicator)
-        has_photo = self.patients_model.item(row, 0).text() == "Yes"
-
-        # In a real application, we would retrieve the photo data from the database
-        # For now, we'll just set a flag to indicate whether a photo exists
+        patient_data = self.patients_model.patient_at(row)
+        patient_data["id"] = str(patient_data["id"])
 
         # Open dialog with patient data
         dialog = PatientForm(self, patient_data)
@@ -542,18 +450,9 @@ class PatientsWindow(QMainWindow):
                 QMessageBox.warning(self, "Error", "Patient name is required.")
                 return
 
-            # Update photo status
-            if updated_data.get("photo"):
-                self.patients_model.item(row, 0).setText("Yes")
-            else:
-                self.patients_model.item(row, 0).setText("No")
-
-            # Update model
-            self.patients_model.item(row, 2).setText(updated_data["name"])
-            self.patients_model.item(row, 3).setText(updated_data["dob"])
-            self.patients_model.item(row, 4).setText(updated_data["gender"])
-            self.patients_model.item(row, 5).setText(updated_data["contact"])
-            self.patients_model.item(row, 6).setText(updated_data["insurance"])
+            # Update model, keeping the original ID
+            updated_data.pop("id", None)
+            self.patients_model.update_patient(row, updated_data)
 
             QMessageBox.information(self, "Success", f"Patient '{updated_data['name']}' updated successfully.")
 
@@ -568,7 +467,7 @@ class PatientsWindow(QMainWindow):
         row = selected_indexes[0].row()
 
         # Get patient name
-        patient_name = self.patients_model.item(row, 2).text()
+        patient_name = self.patients_model.patient_at(row)["name"]
 
         # Confirm deletion
         reply = QMessageBox.question(self, "Confirm Deletion",
@@ -577,7 +476,7 @@ class PatientsWindow(QMainWindow):
 
         if reply == QMessageBox.Yes:
             # Remove from model
-            self.patients_model.removeRow(row)
+            self.patients_model.remove_patient(row)
 
             QMessageBox.information(self, "Success", f"Patient '{patient_name}' deleted successfully.")
 
@@ -592,7 +491,7 @@ class PatientsWindow(QMainWindow):
         row = selected_indexes[0].row()
 
         # Get patient name
-        patient_name = self.patients_model.item(row, 2).text()
+        patient_name = self.patients_model.patient_at(row)["name"]
 
         # In a real application, we would load the medical history from the database
         # For now, just show a message
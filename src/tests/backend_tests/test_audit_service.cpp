@@ -0,0 +1,61 @@
+#include <catch2/catch.hpp>
+#include "../../backend/core/services/audit_service.h"
+#include "../../backend/core/database/db_manager.h"
+
+TEST_CASE("AuditService streams audit entries newest first", "[AuditService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    AuditService service(db);
+
+    {
+        pqxx::work txn(db->getConnection());
+        for (int i = 0; i < 3; ++i) {
+            txn.exec("SELECT log_audit_action(NULL, 'cursor_test', 'audit_test', " + std::to_string(i) +
+                     ", '{}'::jsonb, '127.0.0.1', 'test_session')");
+        }
+        txn.commit();
+    }
+
+    AuditLogFilter filter;
+    filter.start_date = "2000-01-01";
+    filter.end_date = "2999-12-31";
+    filter.entity_type = "audit_test";
+    auto cursor = service.iterAuditLog(filter, 2, 1, "127.0.0.1", "test_session");
+
+    std::size_t total = 0;
+    std::string previous = "9999";
+    for (auto batch = cursor->next(); !batch.empty(); batch = cursor->next()) {
+        REQUIRE(batch.size() <= 2);
+        for (const auto& entry : batch) {
+            REQUIRE(entry.entity_type == "audit_test");
+            REQUIRE(entry.created_at <= previous);
+            previous = entry.created_at;
+        }
+        total += batch.size();
+    }
+    REQUIRE(total >= 3);
+}
+
+TEST_CASE("AuditService counts the entries a filter matches", "[AuditService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    AuditService service(db);
+
+    AuditLogFilter filter;
+    filter.start_date = "2000-01-01";
+    filter.end_date = "2999-12-31";
+    filter.entity_type = "audit_count_test";
+    std::size_t before = service.countAuditLog(filter, 1, "127.0.0.1", "test_session");
+    {
+        pqxx::work txn(db->getConnection());
+        for (int i = 0; i < 4; ++i) {
+            txn.exec("SELECT log_audit_action(NULL, 'count_test', 'audit_count_test', " + std::to_string(i) +
+                     ", '{}'::jsonb, '127.0.0.1', 'test_session')");
+        }
+        txn.commit();
+    }
+    REQUIRE(service.countAuditLog(filter, 1, "127.0.0.1", "test_session") == before + 4);
+
+    filter.end_date = "";
+    REQUIRE_THROWS_AS(service.countAuditLog(filter, 1, "127.0.0.1", "test_session"), std::invalid_argument);
+}
@@ -0,0 +1,54 @@
+#include <catch2/catch.hpp>
+#include "../../backend/core/database/audit_writer.h"
+#include "../../backend/core/database/db_manager.h"
+
+static int countEvents(DBManager& db, const std::string& session_id) {
+    pqxx::work txn(db.getConnection());
+    auto result = txn.exec_params("SELECT COUNT(*) FROM audit_log WHERE session_id = $1", session_id);
+    return result[0][0].as<int>();
+}
+
+static AuditEvent makeEvent(const std::string& session_id) {
+    AuditEvent event;
+    event.action = "writer_test";
+    event.entity_type = "audit_writer";
+    event.details = "{\"source\":\"test\"}";
+    event.session_id = session_id;
+    return event;
+}
+
+TEST_CASE("AuditWriter writes queued events on flush", "[AuditWriter]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    AuditWriterOptions options;
+    options.batch_size = 10;
+    options.flush_interval = std::chrono::milliseconds(60000);
+    AuditWriter writer(db, options);
+
+    for (int i = 0; i < 25; ++i) {
+        writer.log(makeEvent("writer_flush"));
+    }
+    writer.flush();
+    REQUIRE(countEvents(*db, "writer_flush") == 25);
+    AuditWriterStats stats = writer.stats();
+    REQUIRE(stats.queued == 0);
+    REQUIRE(stats.written == 25);
+    REQUIRE(stats.batches >= 3);
+}
+
+TEST_CASE("AuditWriter drops only the events the database rejects", "[AuditWriter]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    AuditWriter writer(db);
+
+    writer.log(makeEvent("writer_reject"));
+    AuditEvent bad = makeEvent("writer_reject");
+    bad.details = "not json";
+    writer.log(bad);
+    writer.log(makeEvent("writer_reject"));
+    writer.close();
+
+    REQUIRE(countEvents(*db, "writer_reject") == 2);
+    REQUIRE(writer.stats().rejected == 1);
+    REQUIRE_THROWS_AS(writer.log(makeEvent("writer_reject")), std::runtime_error);
+}
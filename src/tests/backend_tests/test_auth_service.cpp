@@ -27,4 +27,24 @@ TEST_CASE("AuthService rejects invalid password", "[AuthService]") {
     txn.commit();
 
     REQUIRE_THROWS_AS(auth.authenticate("testuser", "wrongpass"), std::runtime_error);
-}
\ No newline at end of file
+}
+
+TEST_CASE("AuthService keeps auditing failed logins after the system user is recreated", "[AuthService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    AuthService auth(db);
+
+    REQUIRE_THROWS_AS(auth.authenticate("nosuchuser", "whatever"), std::runtime_error);
+    {
+        pqxx::work txn(db->getConnection());
+        REQUIRE(txn.exec("SELECT 1 FROM users WHERE username = 'system'").size() == 1);
+        txn.exec("DELETE FROM users WHERE username = 'system'");
+        txn.commit();
+    }
+
+    // Once the stale id is dropped, the next failed login recreates the system user
+    auth.invalidateSystemUserCache();
+    REQUIRE_THROWS_AS(auth.authenticate("nosuchuser", "whatever"), std::runtime_error);
+    pqxx::work txn(db->getConnection());
+    REQUIRE(txn.exec("SELECT 1 FROM users WHERE username = 'system'").size() == 1);
+}
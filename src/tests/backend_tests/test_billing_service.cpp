@@ -0,0 +1,45 @@
+#include <catch2/catch.hpp>
+#include "../../backend/core/services/billing_service.h"
+#include "../../backend/core/database/db_manager.h"
+
+TEST_CASE("BillingService streams unbilled payments until they are invoiced", "[BillingService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    BillingService service(db);
+
+    BillingPeriod period{"1999-01-01", "1999-02-01"};
+    std::size_t before = service.countUnbilled(period, 1, "127.0.0.1", "test_session");
+    {
+        pqxx::work txn(db->getConnection());
+        int patient_id = txn.exec(
+            "INSERT INTO patients (first_name, last_name, dob) VALUES ('Billing', 'Test', '1980-01-01') "
+            "RETURNING id")[0][0].as<int>();
+        for (int i = 0; i < 3; ++i) {
+            txn.exec("INSERT INTO transactions (patient_id, amount, transaction_type, description, created_at) "
+                     "VALUES (" + std::to_string(patient_id) + ", 10.25, 'payment', 'billing test', "
+                     "'1999-01-1" + std::to_string(i) + "')");
+        }
+        txn.exec("INSERT INTO transactions (patient_id, amount, transaction_type, created_at) "
+                 "VALUES (" + std::to_string(patient_id) + ", 5.00, 'refund', '1999-01-15')");
+        txn.commit();
+    }
+    REQUIRE(service.countUnbilled(period, 1, "127.0.0.1", "test_session") == before + 3);
+
+    std::vector<int> ids;
+    auto cursor = service.iterUnbilled(period, 2, 1, "127.0.0.1", "test_session");
+    for (auto batch = cursor->next(); !batch.empty(); batch = cursor->next()) {
+        REQUIRE(batch.size() <= 2);
+        for (const auto& transaction : batch) {
+            if (transaction.description == "billing test") {
+                REQUIRE(transaction.patient_name == "Billing Test");
+                REQUIRE(transaction.amount == "10.25");
+            }
+            ids.push_back(transaction.transaction_id);
+        }
+    }
+    REQUIRE(ids.size() == before + 3);
+
+    REQUIRE(service.markInvoiced(ids, "test_run", 1, "127.0.0.1", "test_session") == ids.size());
+    REQUIRE(service.markInvoiced(ids, "test_run", 1, "127.0.0.1", "test_session") == 0);
+    REQUIRE(service.countUnbilled(period, 1, "127.0.0.1", "test_session") == 0);
+}
@@ -0,0 +1,68 @@
+#include <catch2/catch.hpp>
+#include "../../backend/core/database/connection_pool.h"
+
+static const std::string kConnStr = "dbname=medisys_test user=postgres password=secret host=localhost sslmode=disable";
+
+TEST_CASE("ConnectionPool opens min size connections up front", "[ConnectionPool]") {
+    PoolOptions options;
+    options.min_size = 2;
+    options.max_size = 4;
+    auto pool = ConnectionPool::create(kConnStr, options);
+
+    PoolStats stats = pool->stats();
+    REQUIRE(stats.size == 2);
+    REQUIRE(stats.idle == 2);
+    REQUIRE(stats.in_use == 0);
+}
+
+TEST_CASE("ConnectionPool times out when exhausted", "[ConnectionPool]") {
+    PoolOptions options;
+    options.min_size = 0;
+    options.max_size = 1;
+    auto pool = ConnectionPool::create(kConnStr, options);
+
+    auto first = pool->acquire();
+    REQUIRE_THROWS_AS(pool->acquire(std::chrono::milliseconds(50)), std::runtime_error);
+    REQUIRE(pool->stats().timeouts == 1);
+
+    first.release();
+    REQUIRE_NOTHROW(pool->acquire(std::chrono::milliseconds(50)));
+}
+
+TEST_CASE("ConnectionPool prepares registered statements on checkout", "[ConnectionPool]") {
+    PoolOptions options;
+    options.min_size = 1;
+    options.max_size = 2;
+    auto pool = ConnectionPool::create(kConnStr, options);
+    pool->registerStatement("pool_test_add", "SELECT $1::int + 1");
+
+    auto conn = pool->acquire();
+    pqxx::work txn(*conn);
+    auto result = txn.exec_prepared("pool_test_add", 41);
+    REQUIRE(result[0][0].as<int>() == 42);
+}
+
+TEST_CASE("ConnectionPool re-prepares redefined statements on the next checkout", "[ConnectionPool]") {
+    PoolOptions options;
+    options.min_size = 1;
+    options.max_size = 1;
+    auto pool = ConnectionPool::create(kConnStr, options);
+    pool->registerStatement("pool_test_bump", "SELECT $1::int + 1");
+    {
+        auto conn = pool->acquire();
+        pqxx::work txn(*conn);
+        REQUIRE(txn.exec_prepared("pool_test_bump", 41)[0][0].as<int>() == 42);
+    }
+
+    pool->registerStatement("pool_test_bump", "SELECT $1::int + 2");
+    auto conn = pool->acquire();
+    pqxx::work txn(*conn);
+    REQUIRE(txn.exec_prepared("pool_test_bump", 41)[0][0].as<int>() == 43);
+}
+
+TEST_CASE("ConnectionPool rejects invalid sizes", "[ConnectionPool]") {
+    PoolOptions options;
+    options.min_size = 3;
+    options.max_size = 2;
+    REQUIRE_THROWS_AS(ConnectionPool::create(kConnStr, options), std::invalid_argument);
+}
@@ -1,5 +1,6 @@
 #include <catch2/catch.hpp>
 #include "../../backend/core/database/db_manager.h"
+#include <cmath>
 
 TEST_CASE("DBManager initializes schema", "[DBManager]") {
     DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
@@ -17,4 +18,149 @@ TEST_CASE("DBManager sets audit context", "[DBManager]") {
     pqxx::work txn(db.getConnection());
     auto result = txn.exec("SELECT current_setting('medisys.user_id')");
     REQUIRE(result[0][0].as<std::string>() == "1");
-}
\ No newline at end of file
+}
+
+TEST_CASE("ScopedAuditTransaction keeps audit context local to the transaction", "[DBManager]") {
+    DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    auto conn = db.acquireConnection();
+
+    {
+        ScopedAuditTransaction txn(*conn, 7, "10.0.0.7", "session_scoped");
+        auto result = txn->exec("SELECT current_setting('medisys.user_id'), current_setting('medisys.session_id')");
+        REQUIRE(result[0][0].as<std::string>() == "7");
+        REQUIRE(result[0][1].as<std::string>() == "session_scoped");
+        txn.commit();
+    }
+
+    pqxx::work txn(*conn);
+    auto result = txn.exec("SELECT COALESCE(current_setting('medisys.user_id', true), '')");
+    REQUIRE(result[0][0].as<std::string>() != "7");
+}
+
+TEST_CASE("DBManager keeps monthly audit_log partitions ahead of time", "[DBManager]") {
+    DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db.initializeSchema();
+
+    pqxx::work txn(db.getConnection());
+    auto partitioned = txn.exec("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                                "WHERE partrelid = 'audit_log'::regclass)");
+    REQUIRE(partitioned[0][0].as<bool>());
+    auto current = txn.exec("SELECT to_regclass('audit_log_p' || to_char(CURRENT_DATE, 'YYYY_MM')) IS NOT NULL");
+    REQUIRE(current[0][0].as<bool>());
+
+    // New rows land in their month's partition, and the summary view still reads them
+    txn.exec("SELECT log_audit_action(NULL, 'partition_test', 'audit_log', 0, '{}'::jsonb, 'unknown', 'partition_test')");
+    auto routed = txn.exec("SELECT tableoid::regclass::text FROM audit_log WHERE session_id = 'partition_test'");
+    REQUIRE(routed[0][0].as<std::string>().rfind("audit_log_p", 0) == 0);
+    REQUIRE(txn.exec("SELECT 1 FROM audit_summary WHERE session_id = 'partition_test'").size() == 1);
+}
+
+TEST_CASE("doctor_patient follows visits as they are added, moved and removed", "[DBManager]") {
+    DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db.initializeSchema();
+
+    pqxx::work txn(db.getConnection());
+    int user_id = txn.exec("INSERT INTO users (username, password_hash, role) "
+                           "VALUES ('mapping_doctor', 'not_for_login', 'doctor') RETURNING id")[0][0].as<int>();
+    int doctor_id = txn.exec_params("INSERT INTO doctors (user_id, first_name, last_name, license_number) "
+                                    "VALUES ($1, 'Mapping', 'Doctor', $2) RETURNING id",
+                                    user_id, "MAP" + std::to_string(user_id))[0][0].as<int>();
+    int patient_id = txn.exec("INSERT INTO patients (first_name, last_name, dob) "
+                              "VALUES ('Mapped', 'Patient', '1980-01-01') RETURNING id")[0][0].as<int>();
+    auto visits = [&]() {
+        auto result = txn.exec_params("SELECT visit_count FROM doctor_patient WHERE doctor_id = $1 AND patient_id = $2",
+                                      doctor_id, patient_id);
+        return result.empty() ? 0 : result[0][0].as<int>();
+    };
+
+    txn.exec_params("INSERT INTO visits (patient_id, doctor_id, visit_date) VALUES ($1, $2, now()), ($1, $2, now())",
+                    patient_id, doctor_id);
+    REQUIRE(visits() == 2);
+
+    txn.exec_params("UPDATE visits SET doctor_id = NULL WHERE id = (SELECT MIN(id) FROM visits WHERE patient_id = $1)",
+                    patient_id);
+    REQUIRE(visits() == 1);
+
+    txn.exec_params("DELETE FROM visits WHERE patient_id = $1", patient_id);
+    REQUIRE(visits() == 0);
+    txn.abort();
+}
+
+TEST_CASE("doctor roles only see their own doctor_patient pairs", "[DBManager]") {
+    DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db.initializeSchema();
+
+    pqxx::work txn(db.getConnection());
+    int patient_id = txn.exec("INSERT INTO patients (first_name, last_name, dob) "
+                              "VALUES ('Mapped', 'Patient', '1980-01-01') RETURNING id")[0][0].as<int>();
+    std::vector<int> user_ids, doctor_ids;
+    for (const std::string name : {"own_doctor", "other_doctor"}) {
+        int user_id = txn.exec_params("INSERT INTO users (username, password_hash, role) "
+                                      "VALUES ($1, 'not_for_login', 'doctor') RETURNING id", name)[0][0].as<int>();
+        int doctor_id = txn.exec_params("INSERT INTO doctors (user_id, first_name, last_name, license_number) "
+                                        "VALUES ($1, 'Mapping', 'Doctor', $2) RETURNING id",
+                                        user_id, "MAP" + std::to_string(user_id))[0][0].as<int>();
+        txn.exec_params("INSERT INTO visits (patient_id, doctor_id, visit_date) VALUES ($1, $2, now())",
+                        patient_id, doctor_id);
+        user_ids.push_back(user_id);
+        doctor_ids.push_back(doctor_id);
+    }
+
+    // Roles are named after the doctor's user id; CREATE ROLE is undone by the abort
+    std::string role = txn.quote_name(std::to_string(user_ids[0]));
+    txn.exec("CREATE ROLE " + role + " IN ROLE doctor_role");
+    txn.exec("SET LOCAL ROLE " + role);
+    auto visible = txn.exec("SELECT doctor_id FROM doctor_patient");
+    txn.exec("RESET ROLE");
+    REQUIRE(visible.size() == 1);
+    REQUIRE(visible[0][0].as<int>() == doctor_ids[0]);
+
+    // The mapping is only written by the definer trigger functions
+    REQUIRE(txn.exec("SELECT bool_and(prosecdef) FROM pg_proc "
+                     "WHERE proname IN ('doctor_patient_apply', 'doctor_patient_sync')")[0][0].as<bool>());
+    REQUIRE_FALSE(txn.exec("SELECT has_function_privilege('doctor_role', 'doctor_patient_apply(jsonb, jsonb)', "
+                           "'EXECUTE')")[0][0].as<bool>());
+    txn.abort();
+}
+
+TEST_CASE("DBManager returns query results column by column", "[DBManager]") {
+    DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+
+    auto result = db.queryColumns(
+        "SELECT n, n * 1.5 AS half, (n % 2 = 0) AS even, DATE '1970-01-02' + n AS day, "
+        "TIMESTAMP '1970-01-01 00:00:01.25' AS ts, CASE WHEN n < 3 THEN 'low' END AS label "
+        "FROM generate_series(1, $1::int) n",
+        {std::string("4")});
+    REQUIRE(result.rows == 4);
+    REQUIRE(result.columns.size() == 6);
+
+    REQUIRE(result.columns[0].type == ColumnType::Int64);
+    REQUIRE(result.columns[0].ints == std::vector<std::int64_t>{1, 2, 3, 4});
+    REQUIRE(result.columns[1].type == ColumnType::Float64);
+    REQUIRE(result.columns[1].floats[1] == 3.0);
+    REQUIRE(result.columns[2].type == ColumnType::Bool);
+    REQUIRE(result.columns[2].bools == std::vector<std::uint8_t>{0, 1, 0, 1});
+    REQUIRE(result.columns[3].type == ColumnType::Date);
+    REQUIRE(result.columns[3].ints[0] == 2 * 86400);
+    REQUIRE(result.columns[4].type == ColumnType::Timestamp);
+    REQUIRE(result.columns[4].ints[0] == 1250000);
+
+    const Column& label = result.columns[5];
+    REQUIRE(label.type == ColumnType::Text);
+    REQUIRE(label.dictionary == std::vector<std::string>{"low"});
+    REQUIRE(label.codes == std::vector<std::int32_t>{0, 0, -1, -1});
+
+    auto with_null = db.queryColumns("SELECT NULLIF(n, 2) AS n FROM generate_series(1, 3) n", {});
+    REQUIRE(with_null.columns[0].type == ColumnType::Float64);
+    REQUIRE(std::isnan(with_null.columns[0].floats[1]));
+}
+
+TEST_CASE("ScopedAuditTransaction records no acting user as NULL", "[DBManager]") {
+    DBManager db("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    auto conn = db.acquireConnection();
+
+    ScopedAuditTransaction txn(*conn, 0, "127.0.0.1", "session_anonymous");
+    auto result = txn->exec("SELECT NULLIF(current_setting('medisys.user_id', true), '')::INTEGER IS NULL");
+    REQUIRE(result[0][0].as<bool>());
+    txn.commit();
+}
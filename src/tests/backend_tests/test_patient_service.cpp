@@ -0,0 +1,137 @@
+#include <catch2/catch.hpp>
+#include "../../backend/core/services/patient_service.h"
+#include "../../backend/core/database/db_manager.h"
+#include <algorithm>
+#include <set>
+
+static Patient makePatient(const std::string& first_name, const std::string& last_name) {
+    Patient patient{};
+    patient.first_name = first_name;
+    patient.last_name = last_name;
+    patient.dob = 315532800; // 1980-01-01
+    patient.gender = "female";
+    patient.mobile = "5551234567";
+    patient.email = "patient@example.com";
+    return patient;
+}
+
+TEST_CASE("PatientService bulk import reports invalid rows", "[PatientService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    PatientService service(db);
+
+    std::vector<Patient> patients = {
+        makePatient("Alice", "Bulk"),
+        makePatient("B0b", "Bulk"),
+        makePatient("Carol", "Bulk"),
+    };
+    patients[2].gender = "unknown";
+    patients.push_back(makePatient("Dave", "Bulk"));
+
+    PatientImportResult result = service.createPatientsBulk(patients, 1, "127.0.0.1", "test_session", 1);
+    REQUIRE(result.inserted == 2);
+    REQUIRE(result.errors.size() == 2);
+    REQUIRE(result.errors[0].index == 1);
+    REQUIRE(result.errors[0].message == "Invalid name");
+    REQUIRE(result.errors[1].index == 2);
+    REQUIRE(result.errors[1].message == "Invalid gender");
+}
+
+TEST_CASE("PatientService fetches many patients in request order", "[PatientService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    PatientService service(db);
+
+    int first_id = service.createPatient(makePatient("Erin", "Batch"), 1, "127.0.0.1", "test_session");
+    int second_id = service.createPatient(makePatient("Frank", "Batch"), 1, "127.0.0.1", "test_session");
+
+    PatientBatch batch = service.getPatients({second_id, -1, first_id, 999999999}, 1, "127.0.0.1", "test_session");
+    REQUIRE(batch.patients.size() == 2);
+    REQUIRE(batch.patients[0].id == second_id);
+    REQUIRE(batch.patients[1].id == first_id);
+    REQUIRE(batch.missing_ids == std::vector<int>{-1, 999999999});
+}
+
+TEST_CASE("PatientService streams patients in bounded batches", "[PatientService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    PatientService service(db);
+
+    std::vector<Patient> patients;
+    for (int i = 0; i < 5; ++i) {
+        patients.push_back(makePatient("Grace", "Streamed"));
+    }
+    REQUIRE(service.createPatientsBulk(patients, 1, "127.0.0.1", "test_session").inserted == 5);
+
+    auto cursor = service.iterPatients("grace streamed", 2, 1, "127.0.0.1", "test_session");
+    std::size_t total = 0;
+    int last_id = 0;
+    for (auto batch = cursor->next(); !batch.empty(); batch = cursor->next()) {
+        REQUIRE(batch.size() <= 2);
+        for (const auto& patient : batch) {
+            REQUIRE(patient.id > last_id);
+            last_id = patient.id;
+        }
+        total += batch.size();
+    }
+    REQUIRE(total >= 5);
+}
+
+TEST_CASE("PatientService pages through patients by name", "[PatientService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    PatientService service(db);
+
+    service.createPatientsBulk({makePatient("Hank", "Keyset"), makePatient("Ivy", "Keyset"),
+                                makePatient("Jack", "Keyset")}, 1, "127.0.0.1", "test_session");
+
+    std::vector<Patient> seen;
+    int after_id = 0;
+    for (auto page = service.listPatients(0, 2, "name", 1, "127.0.0.1", "test_session"); !page.empty();
+         page = service.listPatients(after_id, 2, "name", 1, "127.0.0.1", "test_session")) {
+        REQUIRE(page.size() <= 2);
+        seen.insert(seen.end(), page.begin(), page.end());
+        after_id = page.back().id;
+    }
+    // Every patient is visited once, and the rows we inserted come back in name order
+    std::vector<std::pair<std::string, int>> keyset_rows;
+    std::set<int> ids;
+    for (const auto& patient : seen) {
+        REQUIRE(ids.insert(patient.id).second);
+        if (patient.last_name == "Keyset") {
+            keyset_rows.emplace_back(patient.first_name, patient.id);
+        }
+    }
+    REQUIRE(keyset_rows.size() >= 3);
+    REQUIRE(std::is_sorted(keyset_rows.begin(), keyset_rows.end()));
+    REQUIRE_THROWS_AS(service.listPatients(0, 2, "dob", 1, "127.0.0.1", "test_session"), std::invalid_argument);
+}
+
+TEST_CASE("PatientService search ranks id, substring and fuzzy matches", "[PatientService]") {
+    auto db = std::make_shared<DBManager>("dbname=medisys_test user=postgres password=secret host=localhost sslmode=verify-full");
+    db->initializeSchema();
+    PatientService service(db);
+
+    Patient patient = makePatient("Quentin", "Searchable");
+    patient.email = "quentin.searchable@example.com";
+    int patient_id = service.createPatient(patient, 1, "127.0.0.1", "test_session");
+
+    auto by_name = service.search("quentin search", 10, 1, "127.0.0.1", "test_session");
+    REQUIRE(!by_name.empty());
+    REQUIRE(by_name.front().id == patient_id);
+
+    auto by_email = service.search("quentin.searchable@", 10, 1, "127.0.0.1", "test_session");
+    REQUIRE(!by_email.empty());
+    REQUIRE(by_email.front().id == patient_id);
+
+    // A misspelt name still matches through trigram similarity
+    auto fuzzy = service.search("Quentn Searchable", 10, 1, "127.0.0.1", "test_session");
+    REQUIRE(std::any_of(fuzzy.begin(), fuzzy.end(), [&](const Patient& p) { return p.id == patient_id; }));
+
+    auto by_id = service.search(std::to_string(patient_id), 10, 1, "127.0.0.1", "test_session");
+    REQUIRE(!by_id.empty());
+    REQUIRE(by_id.front().id == patient_id);
+
+    REQUIRE(service.search("   ", 10, 1, "127.0.0.1", "test_session").empty());
+    REQUIRE_THROWS_AS(service.search("quentin", 0, 1, "127.0.0.1", "test_session"), std::invalid_argument);
+}
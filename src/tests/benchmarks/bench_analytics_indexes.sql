@@ -0,0 +1,67 @@
+-- Analytics Index Benchmark for MediSys Hospital Management System
+--
+-- Loads synthetic KPI, medical metric and visit data into two copies of each
+-- table: one without indexes and one with the index set from migration 005
+-- (copied with LIKE ... INCLUDING INDEXES). The analytics queries and the RLS
+-- visit lookup are then run against both with EXPLAIN ANALYZE so the plans and
+-- timings can be compared. Everything runs in a transaction that is rolled back.
+--
+-- Usage (after the schema and migrations have been applied):
+--     psql -d medisys_test -f src/tests/benchmarks/bench_analytics_indexes.sql
+--
+-- Author: Mazharuddin Mohammed
+
+\timing on
+BEGIN;
+
+-- 500 doctors x 10 metrics x 2 years of daily values = 3.65M rows
+CREATE TEMP TABLE bench_doctor_kpi_plain (LIKE doctor_kpi INCLUDING DEFAULTS);
+INSERT INTO bench_doctor_kpi_plain (doctor_id, department_id, metric_name, metric_value, metric_date)
+SELECT d, d % 20, 'metric_' || m, random() * 100, DATE '2023-01-01' + day
+FROM generate_series(1, 500) d, generate_series(1, 10) m, generate_series(0, 729) day;
+CREATE TEMP TABLE bench_doctor_kpi_indexed (LIKE doctor_kpi INCLUDING DEFAULTS INCLUDING INDEXES);
+INSERT INTO bench_doctor_kpi_indexed SELECT * FROM bench_doctor_kpi_plain;
+
+-- 20k patients x 5 metrics x 20 readings = 2M rows
+CREATE TEMP TABLE bench_medical_analytics_plain (LIKE medical_analytics INCLUDING DEFAULTS);
+INSERT INTO bench_medical_analytics_plain (patient_id, metric_name, metric_value, metric_date, trend)
+SELECT p, 'metric_' || m, random() * 100, TIMESTAMP '2023-01-01' + r * INTERVAL '30 days', 'stable'
+FROM generate_series(1, 20000) p, generate_series(1, 5) m, generate_series(0, 19) r;
+CREATE TEMP TABLE bench_medical_analytics_indexed (LIKE medical_analytics INCLUDING DEFAULTS INCLUDING INDEXES);
+INSERT INTO bench_medical_analytics_indexed SELECT * FROM bench_medical_analytics_plain;
+
+-- 1M visits spread over 200 doctors and 50k patients
+CREATE TEMP TABLE bench_visits_plain (LIKE visits INCLUDING DEFAULTS);
+INSERT INTO bench_visits_plain (patient_id, doctor_id, visit_date)
+SELECT (g * 7919) % 50000 + 1, g % 200 + 1, TIMESTAMP '2023-01-01' + (g % 730) * INTERVAL '1 day'
+FROM generate_series(1, 1000000) g;
+CREATE TEMP TABLE bench_visits_indexed (LIKE visits INCLUDING DEFAULTS INCLUDING INDEXES);
+INSERT INTO bench_visits_indexed SELECT * FROM bench_visits_plain;
+
+ANALYZE bench_doctor_kpi_plain, bench_doctor_kpi_indexed,
+        bench_medical_analytics_plain, bench_medical_analytics_indexed,
+        bench_visits_plain, bench_visits_indexed;
+
+\echo '== get_doctor_kpi: one doctor, one quarter =='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT metric_name, metric_value, metric_date FROM bench_doctor_kpi_plain
+WHERE doctor_id = 42 AND metric_date BETWEEN '2024-01-01' AND '2024-03-31' ORDER BY metric_date;
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT metric_name, metric_value, metric_date FROM bench_doctor_kpi_indexed
+WHERE doctor_id = 42 AND metric_date BETWEEN '2024-01-01' AND '2024-03-31' ORDER BY metric_date;
+
+\echo '== get_patient_metrics: one patient, one year =='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT metric_name, metric_value, metric_date, trend FROM bench_medical_analytics_plain
+WHERE patient_id = 4242 AND metric_date BETWEEN '2023-06-01' AND '2024-06-01' ORDER BY metric_date;
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT metric_name, metric_value, metric_date, trend FROM bench_medical_analytics_indexed
+WHERE patient_id = 4242 AND metric_date BETWEEN '2023-06-01' AND '2024-06-01' ORDER BY metric_date;
+
+\echo '== RLS lookup: patients of one doctor =='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT DISTINCT patient_id FROM bench_visits_plain WHERE doctor_id = 17;
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT DISTINCT patient_id FROM bench_visits_indexed WHERE doctor_id = 17;
+
+ROLLBACK;
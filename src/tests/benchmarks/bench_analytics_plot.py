@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Analytics Plotting Benchmark for MediSys Hospital Management System
+
+This script renders a synthetic KPI frame (50 metrics x 5 years of daily data
+by default) with the shared plot_metrics helper and with the previous pyplot
+loop, which filtered the whole frame once per metric. It also renders several
+charts at once from a thread pool to show the helper is safe off the GUI
+thread. No database is needed.
+
+Usage:
+    python3 src/tests/benchmarks/bench_analytics_plot.py --metrics 50 --years 5 --repeat 5
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Add the frontend package to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../frontend/python')))
+
+from analytics.plotting import plot_metrics
+
+
+def synthetic_frame(metrics, years):
+    """Rows shaped like get_doctor_kpi output, ordered by metric_date."""
+    dates = pd.date_range("2020-01-01", periods=years * 365, freq="D").date
+    names = [f"metric_{i:02d}" for i in range(metrics)]
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        "metric_name": np.tile(names, len(dates)),
+        "metric_value": rng.normal(100, 15, len(dates) * metrics).round(2),
+        "metric_date": np.repeat(dates, metrics),
+    })
+    return df
+
+
+def legacy_plot(df, title, output_path):
+    """The pyplot loop the analytics classes used before plot_metrics."""
+    plt.figure(figsize=(10, 6))
+    for metric in df['metric_name'].unique():
+        metric_data = df[df['metric_name'] == metric]
+        plt.plot(metric_data['metric_date'], metric_data['metric_value'], label=metric)
+
+    plt.title(title)
+    plt.xlabel("Date")
+    plt.ylabel("Value")
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(output_path)
+    plt.close()
+
+
+def legacy_split(df):
+    return [df[df['metric_name'] == metric] for metric in df['metric_name'].unique()]
+
+
+def grouped_split(df):
+    return [group for _, group in df.groupby('metric_name', sort=False)]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KPI chart rendering")
+    parser.add_argument("--metrics", type=int, default=50, help="Number of distinct metrics")
+    parser.add_argument("--years", type=int, default=5, help="Years of daily data per metric")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    parser.add_argument("--threads", type=int, default=4, help="Charts rendered concurrently")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.metrics, args.years)
+    print(f"Rows:              {len(df)} ({args.metrics} metrics x {args.years} years)")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, "chart.png")
+        print(f"Split, mask loop:  {timed(lambda: legacy_split(df), args.repeat):10.1f} ms")
+        print(f"Split, groupby:    {timed(lambda: grouped_split(df), args.repeat):10.1f} ms")
+        print(f"Render, pyplot:    {timed(lambda: legacy_plot(df, 'KPI', path), args.repeat):10.1f} ms")
+        print(f"Render, Agg:       {timed(lambda: plot_metrics(df, 'KPI', path), args.repeat):10.1f} ms")
+
+        def render(i):
+            plot_metrics(df, f"KPI {i}", os.path.join(out_dir, f"chart_{i}.png"))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(render, range(args.threads * args.repeat)))
+        elapsed = time.perf_counter() - start
+        print(f"Threaded Agg:      {args.threads * args.repeat / elapsed:10.2f} charts/s on {args.threads} threads")
+
+
+if __name__ == "__main__":
+    main()
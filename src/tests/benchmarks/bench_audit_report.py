@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Audit Report Benchmark for MediSys Hospital Management System
+
+This script writes a large batch of synthetic audit events through the
+AuditWriter and then renders them with AuditReportGenerator.generate_report,
+which streams the rows from a server-side cursor page by page. The report runs
+in a child process so its peak RSS can be read on its own; the script prints
+that together with pages and rows per second. With --workers the report is
+rendered by generate_report_parallel in date shards across that many processes.
+
+Usage:
+    python3 src/tests/benchmarks/bench_audit_report.py --rows 1000000
+    python3 src/tests/benchmarks/bench_audit_report.py --skip-populate --workers 8
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Add the build and frontend directories to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../build')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../frontend/python')))
+
+import medisys_bindings
+from billing.audit_report_generator import AuditReportGenerator
+
+ENTITY_TYPE = "bench_audit_report"
+IMAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../frontend/python/resources/images'))
+
+
+def connection_string():
+    db_name = os.environ.get('DB_NAME', 'medisys_test')
+    db_user = os.environ.get('DB_USER', 'postgres')
+    db_pass = os.environ.get('DB_PASS', 'secret')
+    db_host = os.environ.get('DB_HOST', 'localhost')
+    return f"dbname={db_name} user={db_user} password={db_pass} host={db_host}"
+
+
+def populate(db, rows):
+    with medisys_bindings.AuditWriter(db, batch_size=5000) as writer:
+        for i in range(rows):
+            writer.log(None, "update_patients", ENTITY_TYPE, i,
+                       {"old": {"mobile": "5550000000"}, "new": {"mobile": f"555{i:07d}"}},
+                       "127.0.0.1", "bench_session")
+            if i % 50000 == 0:
+                print(f"\rPopulating: {i}/{rows}", end="", flush=True)
+        writer.flush()
+    print(f"\rPopulating: {rows}/{rows}")
+
+
+def render(output_path, start_date, end_date, batch_size, workers, results):
+    db = medisys_bindings.DBManager(connection_string())
+    start = time.perf_counter()
+    with AuditReportGenerator(db, os.path.join(IMAGES, "logo.jpg"), os.path.join(IMAGES, "banner.jpg")) as generator:
+        if workers > 1:
+            pages = generator.generate_report_parallel(output_path, connection_string(), start_date, end_date,
+                                                       entity_type=ENTITY_TYPE, workers=workers,
+                                                       batch_size=batch_size)
+        else:
+            pages = generator.generate_report(output_path, start_date, end_date, entity_type=ENTITY_TYPE,
+                                              batch_size=batch_size)
+    results.put((pages, time.perf_counter() - start, generator.last_render_stats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming audit report generation")
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic audit events to write first")
+    parser.add_argument("--skip-populate", action="store_true", help="Reuse events from an earlier run")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows fetched from the cursor at a time")
+    parser.add_argument("--workers", type=int, default=1, help="Render date shards in this many processes")
+    args = parser.parse_args()
+
+    db = medisys_bindings.DBManager(connection_string())
+    db.initialize_schema()
+    if not args.skip_populate:
+        populate(db, args.rows)
+
+    start_date = date.today().isoformat()
+    end_date = (date.today() + timedelta(days=1)).isoformat()
+    with tempfile.TemporaryDirectory() as out_dir:
+        output_path = os.path.join(out_dir, "audit_report.pdf")
+        results = multiprocessing.Queue()
+        child = multiprocessing.Process(target=render,
+                                        args=(output_path, start_date, end_date, args.batch_size, args.workers,
+                                              results))
+        child.start()
+        # The result is a small tuple, so the child can exit before it is read
+        child.join()
+        if child.exitcode != 0:
+            sys.exit(f"Report failed with exit code {child.exitcode}")
+        pages, seconds, render_stats = results.get()
+        # Largest single process; with --workers that is the biggest shard worker or the merge
+        peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        size_mb = os.path.getsize(output_path) / 1024 / 1024
+
+    print(f"Pages:             {pages}")
+    print(f"Render time:       {seconds:.1f} s")
+    print(f"Pages/sec:         {pages / seconds:.1f}")
+    print(f"Page render:       {render_stats['mean_page_ms']:.2f} ms mean, {render_stats['max_page_ms']:.2f} ms max")
+    print(f"Save/merge:        {render_stats['save_ms']:.1f} ms")
+    if not args.skip_populate:
+        print(f"Rows/sec:          {args.rows / seconds:.0f}")
+    print(f"Peak RSS:          {peak_kb / 1024:.0f} MB")
+    print(f"PDF size:          {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
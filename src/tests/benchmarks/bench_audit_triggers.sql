@@ -0,0 +1,51 @@
+-- Audit Trigger Benchmark for MediSys Hospital Management System
+--
+-- Compares the row-level audit trigger (audit_trigger_function) with the
+-- statement-level transition table triggers from migration 003 on a 100k-row
+-- UPDATE that changes one column. Everything runs in one transaction that is
+-- rolled back, so the database is left as it was.
+--
+-- Usage (after the schema and migrations have been applied):
+--     psql -d medisys_test -f src/tests/benchmarks/bench_audit_triggers.sql
+--
+-- Author: Mazharuddin Mohammed
+
+\timing on
+BEGIN;
+
+CREATE TEMP TABLE bench_audit_target (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER,
+    metric_name VARCHAR(100),
+    metric_value DECIMAL(10, 2),
+    notes TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO bench_audit_target (doctor_id, metric_name, metric_value, notes)
+SELECT g % 500, 'metric_' || (g % 20), g / 100.0, repeat('x', 64)
+FROM generate_series(1, 100000) g;
+ANALYZE bench_audit_target;
+
+\echo 'Row-level trigger (FOR EACH ROW, full old/new JSONB per row):'
+CREATE TRIGGER bench_audit_row AFTER UPDATE ON bench_audit_target
+    FOR EACH ROW EXECUTE FUNCTION audit_trigger_function();
+UPDATE bench_audit_target SET metric_value = metric_value + 1;
+DROP TRIGGER bench_audit_row ON bench_audit_target;
+
+\echo 'Statement-level trigger (transition tables, changed columns only):'
+CREATE TRIGGER bench_audit_statement AFTER UPDATE ON bench_audit_target
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_update_statement();
+UPDATE bench_audit_target SET metric_value = metric_value + 1;
+DROP TRIGGER bench_audit_statement ON bench_audit_target;
+
+\echo 'No trigger (baseline):'
+UPDATE bench_audit_target SET metric_value = metric_value + 1;
+
+\echo 'Audit rows written per approach (row-level rows carry the full record twice):'
+SELECT action, COUNT(*) AS audit_rows, pg_size_pretty(SUM(pg_column_size(details))) AS details_size
+FROM audit_log
+WHERE entity_type = 'bench_audit_target'
+GROUP BY action;
+
+ROLLBACK;
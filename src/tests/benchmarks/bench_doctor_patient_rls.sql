@@ -0,0 +1,83 @@
+-- Doctor Patient RLS Benchmark for MediSys Hospital Management System
+--
+-- Times a doctor listing their patients through the patients RLS policy, first
+-- with the original correlated-subquery policy over visits and then with the
+-- doctor_patient mapping policy from migration 006. The synthetic doctor has
+-- 12k visits with 6k patients, among 300k visits for 100 other doctors.
+-- Everything, including the temporary doctor role, is rolled back at the end.
+--
+-- Usage (as a superuser, after the schema and migrations have been applied):
+--     psql -d medisys_test -f src/tests/benchmarks/bench_doctor_patient_rls.sql
+--
+-- Author: Mazharuddin Mohammed
+
+\timing on
+BEGIN;
+
+INSERT INTO departments (name, description) VALUES ('Bench Department', 'RLS benchmark')
+ON CONFLICT (name) DO NOTHING;
+INSERT INTO users (username, password_hash, role)
+SELECT 'bench_doctor_' || g, 'not_for_login', 'doctor' FROM generate_series(0, 100) g;
+INSERT INTO doctors (user_id, department_id, first_name, last_name, specialization, license_number)
+SELECT u.id, d.id, 'Bench', u.username, 'General', 'BENCH' || u.id
+FROM users u, departments d
+WHERE u.username LIKE 'bench\_doctor\_%' AND d.name = 'Bench Department';
+
+CREATE TEMP TABLE bench_patient_ids AS
+WITH inserted AS (
+    INSERT INTO patients (first_name, last_name, dob, gender)
+    SELECT 'Bench', 'Patient' || g, DATE '1980-01-01' + g % 10000, 'other'
+    FROM generate_series(1, 50000) g
+    RETURNING id
+)
+SELECT id, row_number() OVER (ORDER BY id) AS n FROM inserted;
+
+-- bench_doctor_0 gets 12k visits over 6k patients; the others share 300k visits
+INSERT INTO visits (patient_id, doctor_id, visit_date)
+SELECT p.id, doc.id, TIMESTAMP '2023-01-01' + (g % 700) * INTERVAL '1 day'
+FROM generate_series(1, 12000) g
+JOIN bench_patient_ids p ON p.n = g % 6000 + 1
+JOIN doctors doc ON doc.license_number = (SELECT 'BENCH' || id FROM users WHERE username = 'bench_doctor_0');
+INSERT INTO visits (patient_id, doctor_id, visit_date)
+SELECT p.id, doc.id, TIMESTAMP '2023-01-01' + (g % 700) * INTERVAL '1 day'
+FROM generate_series(1, 300000) g
+JOIN bench_patient_ids p ON p.n = (g * 7919) % 50000 + 1
+JOIN doctors doc ON doc.license_number = (SELECT 'BENCH' || id FROM users WHERE username = 'bench_doctor_' || (g % 100 + 1));
+ANALYZE patients, visits, doctor_patient, doctors;
+
+-- Roles are named after the doctor's user id, as the policy expects
+SELECT id AS bench_user_id FROM users WHERE username = 'bench_doctor_0' \gset
+CREATE ROLE :"bench_user_id" IN ROLE doctor_role;
+GRANT SELECT ON patients TO doctor_role;
+
+\echo '== Original policy: correlated IN over visits =='
+DROP POLICY doctor_access ON patients;
+CREATE POLICY doctor_access ON patients FOR ALL TO doctor_role
+    USING (id IN (
+        SELECT patient_id FROM visits WHERE doctor_id = (SELECT id FROM doctors WHERE user_id = current_user::INTEGER)
+    ));
+GRANT SELECT ON visits, doctors TO doctor_role;
+SET LOCAL ROLE :"bench_user_id";
+EXPLAIN (ANALYZE, COSTS OFF) SELECT id, first_name, last_name FROM patients ORDER BY last_name, first_name LIMIT 100;
+SELECT COUNT(*) AS visible_patients FROM patients;
+RESET ROLE;
+
+\echo '== doctor_patient policy =='
+DROP POLICY doctor_access ON patients;
+CREATE POLICY doctor_access ON patients FOR ALL TO doctor_role
+    USING (EXISTS (
+        SELECT 1 FROM doctor_patient dp WHERE dp.doctor_id = current_doctor_id() AND dp.patient_id = patients.id
+    ));
+SET LOCAL ROLE :"bench_user_id";
+EXPLAIN (ANALYZE, COSTS OFF) SELECT id, first_name, last_name FROM patients ORDER BY last_name, first_name LIMIT 100;
+SELECT COUNT(*) AS visible_patients FROM patients;
+RESET ROLE;
+
+\echo '== Trigger overhead: 10k visit inserts, then reassigning them to another doctor =='
+INSERT INTO visits (patient_id, doctor_id, visit_date)
+SELECT p.id, (SELECT MIN(id) FROM doctors WHERE license_number LIKE 'BENCH%'), TIMESTAMP '2024-06-01'
+FROM bench_patient_ids p WHERE p.n <= 10000;
+UPDATE visits SET doctor_id = (SELECT MAX(id) FROM doctors WHERE license_number LIKE 'BENCH%')
+WHERE visit_date = TIMESTAMP '2024-06-01';
+
+ROLLBACK;
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+GIL Release Benchmark for MediSys Hospital Management System
+
+This script checks that backend calls in medisys_bindings do not hold the GIL
+while they wait on PostgreSQL. A pure Python "ticker" thread counts loop
+iterations while several worker threads hammer the backend; if the bindings
+released the GIL, the ticker keeps most of its idle rate and the workers
+finish much faster than the same number of calls made one after another.
+
+Usage:
+    python3 src/tests/benchmarks/bench_gil_release.py --threads 4 --calls 200
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Add the build directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../build')))
+
+import medisys_bindings
+
+
+def connection_string():
+    db_name = os.environ.get('DB_NAME', 'medisys_test')
+    db_user = os.environ.get('DB_USER', 'postgres')
+    db_pass = os.environ.get('DB_PASS', 'secret')
+    db_host = os.environ.get('DB_HOST', 'localhost')
+    return f"dbname={db_name} user={db_user} password={db_pass} host={db_host}"
+
+
+def backend_call(auth_service):
+    """One login attempt, which is a full round trip to PostgreSQL."""
+    try:
+        auth_service.authenticate("admin", "admin")
+    except ValueError:
+        pass
+
+
+def run_ticker(stop_event, counter):
+    """Spin in pure Python so we can see how often it gets the GIL."""
+    ticks = 0
+    while not stop_event.is_set():
+        ticks += 1
+    counter.append(ticks)
+
+
+def measure_ticks(duration, workload=None):
+    stop_event = threading.Event()
+    counter = []
+    ticker = threading.Thread(target=run_ticker, args=(stop_event, counter))
+    ticker.start()
+    start = time.perf_counter()
+    if workload:
+        workload()
+    else:
+        time.sleep(duration)
+    elapsed = time.perf_counter() - start
+    stop_event.set()
+    ticker.join()
+    return counter[0] / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GIL release in medisys_bindings")
+    parser.add_argument("--threads", type=int, default=4, help="Number of backend worker threads")
+    parser.add_argument("--calls", type=int, default=200, help="Backend calls per worker thread")
+    args = parser.parse_args()
+
+    db = medisys_bindings.DBManager(connection_string(), min_pool_size=args.threads,
+                                    max_pool_size=args.threads)
+    db.initialize_schema()
+    auth_service = medisys_bindings.AuthService(db)
+
+    # Sequential baseline
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        backend_call(auth_service)
+    sequential_per_call = (time.perf_counter() - start) / args.calls
+
+    def threaded_workload():
+        def worker():
+            for _ in range(args.calls):
+                backend_call(auth_service)
+        workers = [threading.Thread(target=worker) for _ in range(args.threads)]
+        for worker_thread in workers:
+            worker_thread.start()
+        for worker_thread in workers:
+            worker_thread.join()
+
+    idle_rate, _ = measure_ticks(1.0)
+    busy_rate, threaded_elapsed = measure_ticks(None, threaded_workload)
+
+    total_calls = args.threads * args.calls
+    print(f"Sequential:      {sequential_per_call * 1000:.2f} ms/call")
+    print(f"Threaded:        {total_calls} calls on {args.threads} threads in {threaded_elapsed:.2f} s "
+          f"({total_calls / threaded_elapsed:.0f} calls/s)")
+    print(f"Speedup:         {sequential_per_call * total_calls / threaded_elapsed:.2f}x "
+          f"over running the same calls sequentially")
+    print(f"Python ticker:   {busy_rate / idle_rate * 100:.0f}% of its idle rate while backend calls ran")
+    print(f"Pool stats:      {db.pool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Invoice Batch Benchmark for MediSys Hospital Management System
+
+This script fills a past billing month with synthetic payment transactions and
+runs generate_invoices over it, either into a directory of one PDF per invoice
+or into a single combined PDF. The invoices recorded by earlier runs of the
+benchmark are deleted first so every run bills the whole month. The billing
+run happens in a child process so its peak RSS can be read on its own; the
+script prints that together with invoices per second and the output size.
+With --combined the merge holds the whole document, so peak RSS grows with
+the number of transactions.
+Transactions are inserted with psql, which must be on the PATH.
+
+Usage:
+    python3 src/tests/benchmarks/bench_invoice_batch.py --transactions 50000 --workers 8
+    python3 src/tests/benchmarks/bench_invoice_batch.py --combined
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+# Add the build and frontend directories to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../build')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../frontend/python')))
+
+import medisys_bindings
+from billing.invoice_generator import generate_invoices
+
+BILLING_RUN = "bench_invoice_batch"
+PERIOD_START = "1998-12-01"
+PERIOD_END = "1999-01-01"
+
+
+def connection_string():
+    db_name = os.environ.get('DB_NAME', 'medisys_test')
+    db_user = os.environ.get('DB_USER', 'postgres')
+    db_pass = os.environ.get('DB_PASS', 'secret')
+    db_host = os.environ.get('DB_HOST', 'localhost')
+    return f"dbname={db_name} user={db_user} password={db_pass} host={db_host}"
+
+
+def psql(sql):
+    env = dict(os.environ, PGPASSWORD=os.environ.get('DB_PASS', 'secret'))
+    subprocess.run(["psql", "-q", "-v", "ON_ERROR_STOP=1",
+                    "-h", os.environ.get('DB_HOST', 'localhost'),
+                    "-U", os.environ.get('DB_USER', 'postgres'),
+                    "-d", os.environ.get('DB_NAME', 'medisys_test'),
+                    "-c", sql], env=env, check=True)
+
+
+def populate(transactions):
+    """Top the benchmark month up to the requested number of payments and unbill them"""
+    psql(f"""
+        DELETE FROM invoices WHERE billing_run = '{BILLING_RUN}';
+        INSERT INTO patients (first_name, last_name, dob)
+        SELECT 'Bench', 'Invoice ' || n, DATE '1970-01-01'
+        FROM generate_series(1, 1000) n
+        WHERE NOT EXISTS (SELECT 1 FROM patients WHERE first_name = 'Bench');
+        INSERT INTO transactions (patient_id, amount, transaction_type, description, payment_method, created_at)
+        SELECT b.ids[1 + n % array_length(b.ids, 1)], round((random() * 500)::numeric, 2), 'payment',
+               'Consultation fee', 'card', TIMESTAMP '{PERIOD_START}' + (n % (31 * 86400)) * INTERVAL '1 second'
+        FROM (SELECT array_agg(id ORDER BY id) AS ids FROM patients WHERE first_name = 'Bench') b
+        CROSS JOIN generate_series(1, greatest({transactions} - (
+                 SELECT count(*) FROM transactions
+                 WHERE transaction_type = 'payment'
+                   AND created_at >= '{PERIOD_START}' AND created_at < '{PERIOD_END}'), 0)) n;
+    """)
+
+
+def print_progress(rendered, total):
+    print(f"\rInvoices: {rendered}/{total}", end="\n" if rendered == total else "", flush=True)
+
+
+def run(output_path, combined, workers, chunk_size, results):
+    db = medisys_bindings.DBManager(connection_string())
+    stats = generate_invoices(db, output_path, PERIOD_START, PERIOD_END, combined=combined, workers=workers,
+                              chunk_size=chunk_size, billing_run=BILLING_RUN, progress=print_progress)
+    results.put(stats)
+
+
+def output_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(entry.stat().st_size for entry in os.scandir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch invoice generation")
+    parser.add_argument("--transactions", type=int, default=20000, help="Payments in the billing month")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Invoices per worker task")
+    parser.add_argument("--combined", action="store_true", help="Write one multi-invoice PDF")
+    args = parser.parse_args()
+
+    db = medisys_bindings.DBManager(connection_string())
+    db.initialize_schema()
+    populate(args.transactions)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        output_path = os.path.join(out_dir, "invoices.pdf" if args.combined else "invoices")
+        results = multiprocessing.Queue()
+        child = multiprocessing.Process(target=run,
+                                        args=(output_path, args.combined, args.workers, args.chunk_size, results))
+        child.start()
+        # The stats are a small dict, so the child can exit before they are read
+        child.join()
+        if child.exitcode != 0:
+            sys.exit(f"Billing run failed with exit code {child.exitcode}")
+        stats = results.get()
+        # Largest single process: the billing run itself or one of its workers
+        peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        size_mb = output_size(output_path) / 1024 / 1024
+
+    print(f"Invoices:          {stats['invoices']}")
+    print(f"Run time:          {stats['seconds']:.1f} s")
+    print(f"Invoices/sec:      {stats['invoices_per_sec']:.1f}")
+    print(f"Peak RSS:          {peak_kb / 1024:.0f} MB")
+    print(f"Output size:       {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Login Throughput Benchmark for MediSys Hospital Management System
+
+This script simulates a shift-change login storm: several threads sharing one
+AuthService authenticate as fast as they can with a mix of valid and failed
+attempts. It reports logins per second and per-login latency percentiles, which
+show the effect of the per-service system user cache on both paths, and with
+--audit-writer the effect of queueing login audit events instead of inserting
+them inside each login transaction.
+
+Usage:
+    python3 src/tests/benchmarks/bench_login_throughput.py --threads 8 --logins 500 --fail-ratio 0.2
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+# Add the build directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../build')))
+
+import medisys_bindings
+
+def connection_string():
+    db_name = os.environ.get('DB_NAME', 'medisys_test')
+    db_user = os.environ.get('DB_USER', 'postgres')
+    db_pass = os.environ.get('DB_PASS', 'secret')
+    db_host = os.environ.get('DB_HOST', 'localhost')
+    return f"dbname={db_name} user={db_user} password={db_pass} host={db_host}"
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login throughput under concurrent load")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent login threads")
+    parser.add_argument("--logins", type=int, default=500, help="Login attempts per thread")
+    parser.add_argument("--username", default="admin", help="Account used for successful logins")
+    parser.add_argument("--password", default="admin", help="Password of that account")
+    parser.add_argument("--fail-ratio", type=float, default=0.2, help="Fraction of attempts with a wrong password")
+    parser.add_argument("--audit-writer", action="store_true",
+                        help="Queue login audit events through an AuditWriter instead of inserting them inline")
+    args = parser.parse_args()
+
+    db = medisys_bindings.DBManager(connection_string(), min_pool_size=args.threads,
+                                    max_pool_size=args.threads)
+    db.initialize_schema()
+    audit_writer = medisys_bindings.AuditWriter(db) if args.audit_writer else None
+    auth_service = medisys_bindings.AuthService(db, audit_writer)
+
+    latencies = {"success": [], "failure": []}
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = {"success": [], "failure": []}
+        for _ in range(args.logins):
+            fail = rng.random() < args.fail_ratio
+            start = time.perf_counter()
+            try:
+                auth_service.authenticate(args.username, "wrong" if fail else args.password)
+            except ValueError:
+                pass
+            local["failure" if fail else "success"].append((time.perf_counter() - start) * 1000)
+        with lock:
+            for key, samples in local.items():
+                latencies[key].extend(samples)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    elapsed = time.perf_counter() - start
+    if audit_writer is not None:
+        audit_writer.close()
+
+    total = args.threads * args.logins
+    print(f"Logins:       {total} on {args.threads} threads in {elapsed:.2f} s ({total / elapsed:.0f} logins/s)")
+    for key in ("success", "failure"):
+        samples = sorted(latencies[key])
+        if samples:
+            print(f"{key.capitalize():<13} p50 {percentile(samples, 0.5):.2f} ms, "
+                  f"p95 {percentile(samples, 0.95):.2f} ms over {len(samples)} attempts")
+    if audit_writer is not None:
+        print(f"Audit writer: {audit_writer.stats()}")
+    print(f"Pool stats:   {db.pool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Patient Search Benchmark for MediSys Hospital Management System
+
+This script measures PatientService.search against a large patients table and
+compares it with the in-memory substring filter the patients window used to
+run over a fully loaded patient list. The table is topped up to the requested
+size with synthetic patients through the bulk import path before timing.
+
+Usage:
+    python3 src/tests/benchmarks/bench_patient_search.py --patients 1000000 --repeat 20
+
+Author: Mazharuddin Mohammed
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add the build directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../build')))
+
+import medisys_bindings
+
+FIRST_NAMES = ["Aisha", "Bruno", "Chen", "Dalia", "Emeka", "Farah", "Gustav", "Hana", "Ivan", "Jamal",
+               "Keiko", "Liam", "Mira", "Nikhil", "Olga", "Pablo", "Qadir", "Rosa", "Sven", "Tara"]
+LAST_NAMES = ["Anders", "Bakr", "Castillo", "Dubois", "Eze", "Fischer", "Gupta", "Haddad", "Ivanova",
+              "Jensen", "Kowalski", "Lopez", "Mensah", "Nakamura", "Okafor", "Petrov", "Quinn", "Rossi"]
+QUERIES = ["Nakamura", "hana fisch", "Gustv Haddad", "555019", "okafor.liam", "42"]
+
+
+def connection_string():
+    db_name = os.environ.get('DB_NAME', 'medisys_test')
+    db_user = os.environ.get('DB_USER', 'postgres')
+    db_pass = os.environ.get('DB_PASS', 'secret')
+    db_host = os.environ.get('DB_HOST', 'localhost')
+    return f"dbname={db_name} user={db_user} password={db_pass} host={db_host}"
+
+
+def synthetic_patient(rng, n):
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    return {
+        "first_name": first,
+        "last_name": last,
+        "dob": "1970-01-01",
+        "gender": rng.choice(["male", "female"]),
+        "mobile": f"555{n:07d}",
+        "email": f"{last.lower()}.{first.lower()}{n}@example.com",
+    }
+
+
+def populate(service, target, user_id, batch_size=50000):
+    """Bulk import synthetic patients until the table holds at least target rows."""
+    existing = 0
+    for batch in service.iter_patients(batch_size=batch_size):
+        existing += len(batch)
+    rng = random.Random(42)
+    while existing < target:
+        count = min(batch_size, target - existing)
+        rows = [synthetic_patient(rng, existing + i) for i in range(count)]
+        result = service.create_patients_bulk(rows, user_id, "127.0.0.1", "bench_session", batch_size)
+        if result.inserted == 0:
+            # Nothing got in, so another pass would fail the same way
+            first_error = result.errors[0].message if result.errors else "no rows inserted"
+            sys.exit(f"\nPopulating failed: {first_error}")
+        existing += result.inserted
+        print(f"\rPopulating: {existing}/{target}", end="", flush=True)
+    print()
+    return existing
+
+
+def load_all(service):
+    """What the old search needed: every patient materialized as a dict."""
+    rows = []
+    for batch in service.iter_patients(batch_size=50000):
+        for patient in batch:
+            rows.append({"id": patient.id, "name": f"{patient.first_name} {patient.last_name}",
+                         "contact": patient.mobile, "email": patient.email})
+    return rows
+
+
+def substring_filter(rows, text):
+    text = text.lower()
+    return [row for row in rows if text in str(row["id"]) or text in row["name"].lower() or
+            text in row["contact"].lower() or text in row["email"].lower()]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed patient search")
+    parser.add_argument("--patients", type=int, default=1000000, help="Minimum number of patients in the table")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--limit", type=int, default=200, help="Maximum matches returned per search")
+    parser.add_argument("--user-id", type=int, default=1, help="Existing user the imports are audited as")
+    args = parser.parse_args()
+
+    db = medisys_bindings.DBManager(connection_string())
+    db.initialize_schema()
+    service = medisys_bindings.PatientService(db)
+    total = populate(service, args.patients, args.user_id)
+
+    start = time.perf_counter()
+    rows = load_all(service)
+    load_seconds = time.perf_counter() - start
+    print(f"Patients:          {total}")
+    print(f"Full list load:    {load_seconds:.2f} s (needed once before any in-memory search)")
+    print()
+    print(f"{'query':<16}{'indexed p50':>14}{'indexed p95':>14}{'in-memory p50':>16}{'matches':>10}")
+    for query in QUERIES:
+        indexed_p50, indexed_p95 = timed(lambda: service.search(query, args.limit), args.repeat)
+        memory_p50, _ = timed(lambda: substring_filter(rows, query), max(1, args.repeat // 5))
+        matches = len(service.search(query, args.limit))
+        print(f"{query:<16}{indexed_p50:>11.2f} ms{indexed_p95:>11.2f} ms{memory_p50:>13.2f} ms{matches:>10}")
+    print(f"\nPool stats:        {db.pool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
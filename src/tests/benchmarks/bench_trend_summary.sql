@@ -0,0 +1,56 @@
+-- Trend Summary Benchmark for MediSys Hospital Management System
+--
+-- Compares reading every medical_analytics row of a patient (what the pandas
+-- groupby in get_trend_summary needed) with the DISTINCT ON query that returns
+-- one row per metric, for one patient and for a 40-patient ward. The synthetic
+-- data is 2,000 patients x 20 metrics x 2 years of daily readings and is
+-- rolled back at the end.
+--
+-- Usage (after the schema and migrations have been applied):
+--     psql -d medisys_test -f src/tests/benchmarks/bench_trend_summary.sql
+--
+-- Author: Mazharuddin Mohammed
+
+\timing on
+BEGIN;
+
+CREATE TEMP TABLE bench_patient_ids AS
+WITH inserted AS (
+    INSERT INTO patients (first_name, last_name, dob, gender)
+    SELECT 'Bench', 'Trend' || g, DATE '1960-01-01' + g, 'other'
+    FROM generate_series(1, 2000) g
+    RETURNING id
+)
+SELECT id, row_number() OVER (ORDER BY id) AS n FROM inserted;
+
+INSERT INTO medical_analytics (patient_id, metric_name, metric_value, metric_date, trend)
+SELECT p.id, 'metric_' || m, random() * 100, TIMESTAMP '2024-01-01' + d * INTERVAL '1 day',
+       (ARRAY['improving', 'stable', 'worsening', 'unknown', NULL])[1 + (p.n + m + d) % 5]
+FROM bench_patient_ids p, generate_series(1, 20) m, generate_series(0, 729) d;
+ANALYZE medical_analytics;
+
+SELECT min(id) AS bench_patient FROM bench_patient_ids \gset
+
+\echo '== One patient: every row in the range (old pandas path) =='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT metric_name, metric_value, metric_date, trend
+FROM medical_analytics
+WHERE patient_id = :bench_patient AND metric_date >= '2024-01-01' AND metric_date < '2026-01-01'
+ORDER BY metric_date;
+
+\echo '== One patient: DISTINCT ON =='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT DISTINCT ON (patient_id, metric_name) patient_id, metric_name, trend
+FROM medical_analytics
+WHERE patient_id IN (:bench_patient) AND metric_date >= '2024-01-01' AND metric_date < '2026-01-01' AND trend IS NOT NULL
+ORDER BY patient_id, metric_name, metric_date DESC, id DESC;
+
+\echo '== Ward of 40 patients: DISTINCT ON in one query =='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT DISTINCT ON (patient_id, metric_name) patient_id, metric_name, trend
+FROM medical_analytics
+WHERE patient_id IN (SELECT id FROM bench_patient_ids WHERE n <= 40)
+  AND metric_date >= '2024-01-01' AND metric_date < '2026-01-01' AND trend IS NOT NULL
+ORDER BY patient_id, metric_name, metric_date DESC, id DESC;
+
+ROLLBACK;
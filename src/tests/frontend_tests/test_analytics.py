@@ -32,10 +32,26 @@ class TestAnalytics(unittest.TestCase):
         df = self.kpi_analytics.get_doctor_kpi(1, "2025-01-01", "2025-12-31")
         self.assertTrue(df.empty)
 
+    def test_doctor_kpi_rollup_empty(self):
+        df = self.kpi_analytics.get_doctor_kpi(1, "2020-01-01", "2025-12-31", granularity="month")
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ["metric_name", "metric_value", "metric_date"])
+
+    def test_granularity_follows_point_budget(self):
+        self.assertEqual(self.kpi_analytics.choose_granularity("2025-01-01", "2025-12-31"), "day")
+        self.assertEqual(self.kpi_analytics.choose_granularity("2020-01-01", "2025-12-31"), "week")
+        self.assertEqual(self.kpi_analytics.choose_granularity("2000-01-01", "2025-12-31"), "month")
+        self.assertEqual(self.kpi_analytics.choose_granularity("2025-01-01", "2025-12-31", max_points=12), "month")
+
     def test_medical_metrics_empty(self):
         df = self.medical_analytics.get_patient_metrics(1, "2025-01-01", "2025-12-31")
         self.assertTrue(df.empty)
 
     def test_trend_summary_empty(self):
         trends = self.medical_analytics.get_trend_summary(1, "2025-01-01", "2025-12-31")
-        self.assertEqual(trends, {})
\ No newline at end of file
+        self.assertEqual(trends, {})
+
+    def test_trend_summaries_batch_empty(self):
+        summaries = self.medical_analytics.get_trend_summaries([1, 2], "2025-01-01", "2025-12-31")
+        self.assertEqual(summaries, {1: {}, 2: {}})
+        self.assertEqual(self.medical_analytics.get_trend_summaries([], "2025-01-01", "2025-12-31"), {})
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Analytics Cache Tests for MediSys Hospital Management System
+
+This module contains unit tests for the analytics result cache. It checks that
+overlapping ranges are served from cached segments, that watermark changes and
+audit events invalidate the affected entity, and that entries are evicted once
+the cache is over budget. The fetches are in-memory, so no database is needed.
+
+Author: Mazharuddin Mohammed
+"""
+
+import json
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.frontend.python.analytics.cache import AnalyticsCache, OWNER_COLUMNS
+
+class RecordingFetch:
+    """Serves one metric per day from a frame and records the ranges asked for"""
+
+    def __init__(self, start="2025-01-01", days=365):
+        dates = pd.date_range(start, periods=days, freq="D")
+        self.df = pd.DataFrame({"metric_name": "visits", "metric_value": range(days), "metric_date": dates.date})
+        self.calls = []
+
+    def __call__(self, first_day, stop_day):
+        self.calls.append((first_day.date().isoformat(), stop_day.date().isoformat()))
+        dates = pd.to_datetime(self.df["metric_date"])
+        return self.df[(dates >= first_day) & (dates < stop_day)].reset_index(drop=True)
+
+class FakeAuditLog:
+    """Answers the audit_log queries of sync_audit_log from a list of rows and counts the rows read"""
+
+    def __init__(self):
+        self.rows = []
+        self.rows_read = 0
+
+    def query_columns(self, query, params):
+        if "max(id)" in query:
+            return {"last_id": np.array([max((row[0] for row in self.rows), default=0)])}
+        last_id, missing = params[0], {int(event_id) for event_id in params[1].strip("{}").split(",") if event_id}
+        rows = sorted(row for row in self.rows if row[0] > last_id or row[0] in missing)
+        self.rows_read += len(rows)
+        owners = {side: [(json.loads(row[2]).get(side) or {}).get(OWNER_COLUMNS.get(row[1])) for row in rows]
+                  for side in ("old", "new")}
+        return {
+            "id": np.array([row[0] for row in rows], dtype=np.int64),
+            "entity_type": np.array([row[1] for row in rows], dtype=object),
+            "old_owner": np.array(owners["old"], dtype=object),
+            "new_owner": np.array(owners["new"], dtype=object),
+        }
+
+class TestAnalyticsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = AnalyticsCache(watermark_interval=0)
+        self.fetch = RecordingFetch()
+
+    def test_repeated_range_is_a_hit(self):
+        first = self.cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch)
+        second = self.cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch)
+        self.assertEqual(len(first), 31)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(len(self.fetch.calls), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_overlapping_range_fetches_only_missing_days(self):
+        self.cache.get_range(("doctor_kpi", 1), "2025-01-10", "2025-01-20", self.fetch)
+        df = self.cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch)
+        self.assertEqual(self.fetch.calls[1:], [("2025-01-01", "2025-01-10"), ("2025-01-21", "2025-02-01")])
+        self.assertEqual(list(df["metric_value"]), list(range(31)))
+        self.assertEqual(self.cache.stats()["partial_hits"], 1)
+
+    def test_watermark_change_invalidates_entity(self):
+        watermark = ["v1"]
+        self.cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch, lambda: watermark[0])
+        self.cache.get_range(("doctor_kpi", 2), "2025-01-01", "2025-01-31", self.fetch, lambda: "v1")
+        watermark[0] = "v2"
+        self.cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch, lambda: watermark[0])
+        self.cache.get_range(("doctor_kpi", 2), "2025-01-01", "2025-01-31", self.fetch, lambda: "v1")
+        self.assertEqual(len(self.fetch.calls), 3)
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_audit_event_invalidates_owner(self):
+        self.cache.get_range(("doctor_kpi", 7), "2025-01-01", "2025-01-31", self.fetch)
+        self.cache.get_range(("doctor_kpi", 8), "2025-01-01", "2025-01-31", self.fetch)
+        self.cache.apply_audit_event("doctor_kpi", '{"new": {"id": 3, "doctor_id": 7}}')
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        # An update entry without the owner column drops the whole table
+        self.cache.apply_audit_event("doctor_kpi", {"old": {"metric_value": 1}, "new": {"metric_value": 2}})
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_sync_applies_events_committed_out_of_order(self):
+        db = FakeAuditLog()
+        db.rows.append((1, "doctor_kpi", '{"new": {"doctor_id": 1}}'))
+        self.cache.sync_audit_log(db)
+        self.cache.get_range(("doctor_kpi", 7), "2025-01-01", "2025-01-31", self.fetch)
+        self.cache.get_range(("doctor_kpi", 8), "2025-01-01", "2025-01-31", self.fetch)
+        db.rows.append((3, "doctor_kpi", '{"new": {"doctor_id": 7}}'))
+        self.assertEqual(self.cache.sync_audit_log(db), 1)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        # Id 2 was taken before id 3 but its transaction committed after the last sync
+        db.rows.append((2, "doctor_kpi", '{"new": {"doctor_id": 8}}'))
+        self.assertEqual(self.cache.sync_audit_log(db), 1)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_sync_without_new_events_reads_nothing(self):
+        db = FakeAuditLog()
+        db.rows.extend((event_id, "doctor_kpi", '{"new": {"doctor_id": 1}}') for event_id in range(1, 101))
+        self.cache.sync_audit_log(db)
+        db.rows.append((102, "patients", '{"new": {"id": 5}}'))
+        self.assertEqual(self.cache.sync_audit_log(db), 0)
+        rows_read = db.rows_read
+        self.assertEqual(self.cache.sync_audit_log(db), 0)
+        self.assertEqual(self.cache.sync_audit_log(db), 0)
+        self.assertEqual(db.rows_read, rows_read)
+        # Id 101 is still looked for and applied once its transaction commits
+        db.rows.append((101, "doctor_kpi", '{"new": {"doctor_id": 1}}'))
+        self.assertEqual(self.cache.sync_audit_log(db), 1)
+        self.assertEqual(db.rows_read, rows_read + 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = AnalyticsCache(max_entries=2)
+        cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch)
+        cache.get_range(("doctor_kpi", 2), "2025-01-01", "2025-01-31", self.fetch)
+        cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch)
+        cache.get_range(("doctor_kpi", 3), "2025-01-01", "2025-01-31", self.fetch)
+        cache.get_range(("doctor_kpi", 1), "2025-01-01", "2025-01-31", self.fetch)
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["rows"], 62)
+
+if __name__ == '__main__':
+    unittest.main()
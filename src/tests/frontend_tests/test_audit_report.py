@@ -0,0 +1,51 @@
+"""
+Audit Report Tests for MediSys Hospital Management System
+
+This module contains unit tests for the audit report generator. It renders a
+report from freshly written audit events and checks that generating the
+report is itself recorded in the audit log.
+
+Author: Mazharuddin Mohammed
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.frontend.python.billing.audit_report_generator import AuditReportGenerator
+import medisys_bindings
+
+IMAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../frontend/python/resources/images'))
+ENTITY_TYPE = "test_audit_report"
+
+class TestAuditReport(unittest.TestCase):
+    def setUp(self):
+        self.db = medisys_bindings.DBManager("dbname=medisys_test user=postgres password=secret host=localhost")
+        self.db.initialize_schema()
+        with medisys_bindings.AuditWriter(self.db) as writer:
+            writer.log(None, "update_patients", ENTITY_TYPE, 1, {"new": {"mobile": "5550000000"}})
+
+    def test_report_with_default_admin_is_audited(self):
+        start_date = date.today().isoformat()
+        end_date = (date.today() + timedelta(days=1)).isoformat()
+        with tempfile.TemporaryDirectory() as out_dir:
+            with AuditReportGenerator(self.db, os.path.join(IMAGES, "logo.jpg"),
+                                      os.path.join(IMAGES, "banner.jpg")) as generator:
+                pages = generator.generate_report(os.path.join(out_dir, "audit_report.pdf"), start_date, end_date,
+                                                  entity_type=ENTITY_TYPE)
+        self.assertGreaterEqual(pages, 1)
+
+        columns = self.db.query_columns(
+            "SELECT count(*) AS reports FROM audit_log "
+            "WHERE action = 'generate_audit_report' AND user_id IS NULL "
+            "AND details ->> 'entity_type' = $1 AND created_at >= $2",
+            [ENTITY_TYPE, start_date])
+        self.assertGreaterEqual(int(columns["reports"][0]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
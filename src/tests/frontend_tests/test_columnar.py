@@ -0,0 +1,57 @@
+"""
+Columnar Query Tests for MediSys Hospital Management System
+
+This module contains unit tests for building DataFrames from the column
+buffers returned by DBManager.query_columns. It checks that numeric and
+datetime arrays are wrapped without a copy, that dictionary-encoded text
+becomes a Categorical with NULLs as missing values, and that an empty result
+keeps its columns. The buffers are built in memory, so no database is needed.
+
+Author: Mazharuddin Mohammed
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.frontend.python.analytics.columnar import columns_to_frame
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.columns = {
+            "metric_name": (np.array([0, 1, 0, -1], dtype=np.int32), ["visits", "wait_time"]),
+            "metric_value": np.array([3.0, 12.5, 4.0, np.nan]),
+            "metric_date": np.array([0, 86400, 172800, np.iinfo(np.int64).min], dtype=np.int64).view("datetime64[s]"),
+            "patient_id": np.array([7, 7, 8, 8], dtype=np.int64),
+        }
+
+    def test_numeric_and_datetime_columns_are_not_copied(self):
+        df = columns_to_frame(self.columns)
+        for name in ("metric_value", "metric_date", "patient_id"):
+            self.assertTrue(np.shares_memory(df[name].to_numpy(), self.columns[name]), name)
+        self.assertEqual(df["metric_date"].iloc[1], pd.Timestamp("1970-01-02"))
+        self.assertTrue(pd.isna(df["metric_date"].iloc[3]))
+
+    def test_text_columns_become_categoricals(self):
+        df = columns_to_frame(self.columns)
+        self.assertIsInstance(df["metric_name"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df["metric_name"].iloc[:3]), ["visits", "wait_time", "visits"])
+        self.assertTrue(pd.isna(df["metric_name"].iloc[3]))
+        self.assertEqual(list(df.columns), ["metric_name", "metric_value", "metric_date", "patient_id"])
+
+    def test_empty_result_keeps_columns(self):
+        columns = {
+            "metric_name": (np.array([], dtype=np.int32), []),
+            "metric_value": np.array([], dtype=np.float64),
+        }
+        df = columns_to_frame(columns)
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ["metric_name", "metric_value"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,6 +41,19 @@ class TestLoginWindow(unittest.TestCase):
         self.window.handle_login()
         self.assertEqual(self.window.error_label.text(), "Input too long")
 
+    def test_failed_login_runs_off_gui_thread(self):
+        self.window.username_input.setText("no_such_user")
+        self.window.password_input.setText("wrong")
+        self.window.handle_login()
+        # The slot returns before the backend answers
+        self.assertEqual(self.window.error_label.text(), "Signing in...")
+        self.assertFalse(self.window.login_button.isEnabled())
+
+        self.window.thread_pool.waitForDone()
+        self.app.processEvents()
+        self.assertTrue(self.window.error_label.text().startswith("Login failed"))
+        self.assertTrue(self.window.login_button.isEnabled())
+
     def tearDown(self):
         self.window.close()
 
@@ -0,0 +1,42 @@
+"""
+PDF Assets Tests for MediSys Hospital Management System
+
+This module contains unit tests for the shared PDF assets. It checks that
+header forms can be defined from several threads at once without leaving
+ReportLab's process-wide stream encoding changed.
+
+Author: Mazharuddin Mohammed
+"""
+
+import unittest
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from reportlab import rl_config
+from reportlab.pdfgen import canvas
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.frontend.python.billing.pdf_assets import define_form
+
+BANNER = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../frontend/python/resources/images/banner.jpg'))
+
+def render(_):
+    c = canvas.Canvas(BytesIO())
+    define_form(c, "header", [(BANNER, 0, 0, 100, 20)])
+    c.doForm("header")
+    c.showPage()
+    c.save()
+
+class TestPdfAssets(unittest.TestCase):
+    def test_concurrent_forms_restore_a85(self):
+        use_a85 = rl_config.useA85
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(render, range(200)))
+        self.assertEqual(rl_config.useA85, use_a85)
+
+if __name__ == '__main__':
+    unittest.main()